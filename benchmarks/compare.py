@@ -0,0 +1,72 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage: ``python benchmarks/compare.py before.json after.json [--threshold 10]``.
+Exits with status 1 when any measurement got worse by more than the threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+
+# Measurements where lower is better; the rest are reported but not judged.
+MEASUREMENTS = (
+    "setup_ms",
+    "cycle_cpu_ms",
+    "cycle_wall_ms",
+    "max_loop_block_ms",
+    "fan_out_ms",
+    "requests_per_cycle",
+    "bytes_per_entity",
+)
+
+
+def compare(before: dict, after: dict, threshold: float) -> list[str]:
+    """Print a table of changes and return the regressions."""
+    regressions = []
+    print(f"{'scenario':<45} {'measurement':<20} {'before':>10} {'after':>10} {'change':>8}")
+    for name, old in sorted(before["scenarios"].items()):
+        if (new := after["scenarios"].get(name)) is None:
+            continue
+        for measurement in MEASUREMENTS:
+            if measurement not in old or measurement not in new:
+                continue
+            change = (
+                (new[measurement] - old[measurement]) / old[measurement] * 100
+                if old[measurement]
+                else 0.0
+            )
+            flag = ""
+            if change > threshold:
+                flag = " !"
+                regressions.append(f"{name} {measurement} {change:+.1f}%")
+            print(
+                f"{name:<45} {measurement:<20} {old[measurement]:>10} "
+                f"{new[measurement]:>10} {change:>+7.1f}%{flag}"
+            )
+    return regressions
+
+
+def main() -> int:
+    """Run the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    parser.add_argument(
+        "--threshold", type=float, default=10, help="percent change to flag"
+    )
+    args = parser.parse_args()
+
+    before = json.loads(args.before.read_text())
+    after = json.loads(args.after.read_text())
+    print(f"before: {before['meta']}\nafter:  {after['meta']}\n")
+    regressions = compare(before, after, args.threshold)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
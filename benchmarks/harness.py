@@ -0,0 +1,309 @@
+"""Drive the full setup -> coordinator -> entity pipeline against a local stub API."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass
+import json
+from itertools import product
+import os
+from pathlib import Path
+import platform
+import subprocess
+import threading
+from time import perf_counter, thread_time
+import tracemalloc
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.wswr_weather.const import DOMAIN
+from custom_components.wswr_weather.descriptors import QUANTITY_RULES
+from tests.const import MOCK_RECORD
+from tests.stub import StubWSWRApi
+
+# Results are merged into this JSON file when set, keyed by scenario.
+RESULTS_ENV = "WSWR_BENCHMARK_RESULTS"
+
+# How often the loop monitor expects to run.
+MONITOR_INTERVAL = 0.005
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One point of the benchmark matrix."""
+
+    sensors: int
+    stations: int = 1
+    latency: float = 0
+    error_rate: float = 0
+    cycles: int = 20
+    # Values that move every cycle; None moves all of them.
+    changing: int | None = None
+
+    @property
+    def name(self) -> str:
+        """Return a stable identifier, used to compare results across commits."""
+        name = f"sensors{self.sensors}-stations{self.stations}"
+        if self.latency:
+            name += f"-latency{int(self.latency * 1000)}ms"
+        if self.error_rate:
+            name += f"-errors{int(self.error_rate * 100)}pct"
+        if self.changing is not None:
+            name += f"-changing{self.changing}"
+        return name
+
+
+SCENARIOS = (
+    # Scaling by sensor count.
+    Scenario(sensors=15),
+    Scenario(sensors=60),
+    Scenario(sensors=240),
+    # Scaling by station count.
+    Scenario(sensors=60, stations=10),
+    Scenario(sensors=60, stations=50),
+    # A slow, flaky API.
+    Scenario(sensors=60, stations=10, latency=0.02, error_rate=0.1),
+    # Few values moving among many keys, as with slow-moving quantities.
+    Scenario(sensors=15, changing=5),
+    Scenario(sensors=240, changing=5),
+)
+
+
+def wide_record(sensors: int) -> dict:
+    """Return a record template with the given number of numeric sensor keys."""
+    keys = [
+        f"{quantity}_{period}{unit}{stat}"
+        for quantity, period, unit, stat in product(
+            QUANTITY_RULES, ("01", "10", "24"), ("mn", "hr"), ("avg", "max", "min")
+        )
+    ]
+    if sensors > len(keys):
+        raise ValueError(f"At most {len(keys)} sensors are supported")
+    record = {"id": MOCK_RECORD["id"], "record_time": MOCK_RECORD["record_time"]}
+    record.update(
+        (key, round(index * 0.7 % 100 + 0.1, 1))
+        for index, key in enumerate(keys[:sensors])
+    )
+    return record
+
+
+class ThreadedStub:
+    """Serve a StubWSWRApi from its own thread and event loop.
+
+    Serving requests then costs neither CPU time of the thread running Home
+    Assistant nor time on its event loop, so neither is measured as ours.
+    """
+
+    def __init__(self, changing: int | None = None, **kwargs) -> None:
+        """Initialize, moving changing values (None for all) with each publish."""
+        self.api = StubWSWRApi(**kwargs)
+        self.changing = changing
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="wswr-stub", daemon=True
+        )
+
+    def start(self) -> str:
+        """Start serving and return the endpoint URL."""
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self.api.start(), self._loop).result()
+
+    def publish(self) -> None:
+        """Publish a new record, without blocking the caller's loop.
+
+        Numeric values move, so each cycle updates their sensors.
+        """
+        self._loop.call_soon_threadsafe(self._publish)
+
+    def _publish(self) -> None:
+        """Move the template's values and publish a record from it."""
+        template = dict(self.api.template)
+        moving = [key for key, value in template.items() if isinstance(value, float)]
+        for key in moving[: self.changing]:
+            template[key] = round(template[key] + 0.1, 1)
+        self.api.template = template
+        self.api.publish()
+
+    @property
+    def request_count(self) -> int:
+        """Return the number of requests served."""
+        return len(self.api.requests)
+
+    def stop(self) -> None:
+        """Stop serving and join the thread."""
+        asyncio.run_coroutine_threadsafe(self.api.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class LoopMonitor:
+    """Measure how late a periodic callback runs, i.e. how long the loop blocks."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Initialize."""
+        self._loop = loop
+        self._expected = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+        self.max_lateness = 0.0
+
+    def start(self) -> None:
+        """Start ticking."""
+        self._expected = self._loop.time() + MONITOR_INTERVAL
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def _tick(self) -> None:
+        """Note the lateness of this tick and plan the next one."""
+        now = self._loop.time()
+        self.max_lateness = max(self.max_lateness, now - self._expected)
+        self._expected = now + MONITOR_INTERVAL
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def stop(self) -> None:
+        """Stop ticking."""
+        if self._handle is not None:
+            self._handle.cancel()
+
+
+def _entries(
+    hass: HomeAssistant, stub: ThreadedStub, scenario: Scenario
+) -> list[MockConfigEntry]:
+    """Add one config entry per station, every sensor enabled."""
+    entries = []
+    for station in range(scenario.stations):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=2,
+            data={"api_url": stub.api.station_url(station), "interval": 60},
+            options={"disable_long_tail": False},
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+    return entries
+
+
+async def _async_setup(hass: HomeAssistant, entries: list[MockConfigEntry]) -> None:
+    """Set up every entry and wait for the entities."""
+    await asyncio.gather(
+        *(hass.config_entries.async_setup(entry.entry_id) for entry in entries)
+    )
+    await hass.async_block_till_done()
+
+
+async def async_run_pipeline(hass: HomeAssistant, scenario: Scenario) -> dict:
+    """Set up the scenario's stations and time setup and polling cycles."""
+    stub = ThreadedStub(
+        scenario.changing,
+        latency=scenario.latency,
+        template=wide_record(scenario.sensors),
+        error_rate=scenario.error_rate,
+    )
+    stub.start()
+    try:
+        entries = _entries(hass, stub, scenario)
+
+        start = perf_counter()
+        await _async_setup(hass, entries)
+        setup_time = perf_counter() - start
+        entities = len(hass.states.async_entity_ids("sensor"))
+        coordinators = [
+            hass.data[DOMAIN][entry.entry_id]["coordinator"] for entry in entries
+        ]
+
+        requests_before = stub.request_count
+        # The test loop runs in debug mode, which adds a traceback to every callback.
+        debug = hass.loop.get_debug()
+        hass.loop.set_debug(False)
+        monitor = LoopMonitor(hass.loop)
+        monitor.start()
+        cpu_start = thread_time()
+        wall_start = perf_counter()
+        for _ in range(scenario.cycles):
+            stub.publish()
+            # Let the stub's loop run the publish before polling.
+            await asyncio.sleep(0.001)
+            await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in coordinators)
+            )
+            await hass.async_block_till_done()
+        cpu = thread_time() - cpu_start
+        wall = perf_counter() - wall_start
+        monitor.stop()
+        hass.loop.set_debug(debug)
+        fan_out = sorted(
+            coordinator.stats.fan_out.percentile(50) or 0 for coordinator in coordinators
+        )[len(coordinators) // 2]
+
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+    finally:
+        stub.stop()
+
+    return {
+        "entities": entities,
+        "setup_ms": round(setup_time * 1000, 1),
+        "cycle_cpu_ms": round(cpu / scenario.cycles * 1000, 3),
+        "cycle_wall_ms": round(wall / scenario.cycles * 1000, 3),
+        "max_loop_block_ms": round(monitor.max_lateness * 1000, 3),
+        # Median over the stations of their median fan-out to the entities.
+        "fan_out_ms": round(fan_out * 1000, 3),
+        "requests_per_cycle": round(
+            (stub.request_count - requests_before) / scenario.cycles, 2
+        ),
+    }
+
+
+async def async_measure_memory(hass: HomeAssistant, scenario: Scenario) -> dict:
+    """Return the memory held after setup, per entity."""
+    stub = ThreadedStub(template=wide_record(scenario.sensors))
+    stub.start()
+    try:
+        entries = _entries(hass, stub, scenario)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        await _async_setup(hass, entries)
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        entities = len(hass.states.async_entity_ids("sensor"))
+
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+    finally:
+        stub.stop()
+
+    return {
+        "entities": entities,
+        "setup_kib": round(held / 1024, 1),
+        "bytes_per_entity": round(held / entities),
+    }
+
+
+def _commit() -> str | None:
+    """Return the checked out commit, if this is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record_result(scenario: Scenario, measurements: dict) -> None:
+    """Print measurements and merge them into the results file, if one is set."""
+    print(f"\n{scenario.name}: {measurements}")
+    if not (path := os.environ.get(RESULTS_ENV)):
+        return
+    path = Path(path)
+    results = json.loads(path.read_text()) if path.exists() else {}
+    results["meta"] = {"commit": _commit(), "python": platform.python_version()}
+    scenarios = results.setdefault("scenarios", {})
+    entry = scenarios.setdefault(scenario.name, {"scenario": asdict(scenario)})
+    entry.update(measurements)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,144 @@
+"""Benchmark sensor key classification against the former substring cascade.
+
+Run with ``pytest benchmarks/test_classification.py -s``.
+"""
+from itertools import product
+from time import perf_counter
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import (
+    DEGREE,
+    PERCENTAGE,
+    UnitOfElectricPotential,
+    UnitOfIrradiance,
+    UnitOfLength,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+)
+
+from custom_components.wswr_weather.const import SENSOR_NAME_MAPPING
+from custom_components.wswr_weather.descriptors import (
+    QUANTITY_RULES,
+    describe_sensor_key,
+)
+
+ROUNDS = 20
+
+# Every mapped key plus every quantity/window/statistic combination.
+KEYS = sorted(
+    set(SENSOR_NAME_MAPPING)
+    | {
+        f"{quantity}_{period}{unit}{stat}"
+        for quantity, period, unit, stat in product(
+            QUANTITY_RULES,
+            ("01", "10", "24", "07"),
+            ("mn", "hr", "dy"),
+            ("avg", "max", "min", "acc", "dir", "tim", "chg"),
+        )
+    }
+)
+
+
+def legacy_get_sensor_properties(sensor_key: str):
+    """Infer sensor properties with the substring cascade this replaced."""
+    sensor_key_lower = sensor_key.lower()
+    properties = {}
+    
+    # Prioritize specific suffixes
+    
+    # Wind Gust Time/Direction (avoid matching generic 'windgst' speed first)
+    if "windgst" in sensor_key_lower:
+        if "tim" in sensor_key_lower:
+             # Just a time string, or timestamp if format allows. 
+             # Assuming string for now as per original code implies simple display.
+             return {} 
+        if "dir" in sensor_key_lower:
+             return {"device_class": "wind_direction", "unit": DEGREE}
+
+    # Wind Direction (general)
+    if "winddir" in sensor_key_lower or "wnddirm" in sensor_key_lower:
+        return {"device_class": "wind_direction", "unit": DEGREE}
+
+    # Temperature sensors
+    if sensor_key_lower.startswith("airtemp") or sensor_key_lower.startswith("dewtemp"):
+        properties.update({"device_class": SensorDeviceClass.TEMPERATURE, "unit": UnitOfTemperature.CELSIUS, "state_class": SensorStateClass.MEASUREMENT})
+    
+    # Pressure sensors
+    elif (
+        sensor_key_lower.startswith("pres")
+        or sensor_key_lower.startswith("pressen")
+        or "presqfe" in sensor_key_lower
+        or "presqnh" in sensor_key_lower
+        or "presmsl" in sensor_key_lower
+    ):
+        properties.update({"device_class": SensorDeviceClass.PRESSURE, "unit": UnitOfPressure.HPA, "state_class": SensorStateClass.MEASUREMENT})
+    
+    # Humidity sensors
+    elif sensor_key_lower.startswith("relhumd"):
+        properties.update({"device_class": SensorDeviceClass.HUMIDITY, "unit": PERCENTAGE, "state_class": SensorStateClass.MEASUREMENT})
+    
+    # Rainfall sensors
+    elif sensor_key_lower.startswith("rainfal"):
+        # Accumulators
+        state_class = SensorStateClass.TOTAL_INCREASING if "acc" in sensor_key_lower else SensorStateClass.MEASUREMENT
+        properties.update({"device_class": "precipitation", "unit": UnitOfLength.MILLIMETERS, "state_class": state_class})
+    
+    # Wind Speed / Gust / Lull / Run / Cross Wind
+    elif (
+        sensor_key_lower.startswith("windspd")
+        or sensor_key_lower.startswith("windgst")
+        or sensor_key_lower.startswith("windlul")
+        or "windcw" in sensor_key_lower 
+        or "windccw" in sensor_key_lower
+    ):
+        # Assuming windcw/windccw are also speeds
+        properties.update({"device_class": "wind_speed", "unit": UnitOfSpeed.KNOTS, "state_class": SensorStateClass.MEASUREMENT})
+
+    # Wind Run specifically (Distance)
+    elif "windrun" in sensor_key_lower:
+         # Wind run is distance. Assuming km based on typical metric usage if not kn*hr
+         # If the sensor output is just a number logic might vary, but DISTANCE is safer than SPEED.
+         properties.update({"device_class": "distance", "unit": UnitOfLength.KILOMETERS, "state_class": SensorStateClass.TOTAL_INCREASING})
+
+    # Solar radiation sensors
+    elif sensor_key_lower.startswith("solradn"):
+        properties.update({"device_class": "irradiance", "unit": UnitOfIrradiance.WATTS_PER_SQUARE_METER, "state_class": SensorStateClass.MEASUREMENT})
+    
+    # Voltage sensors
+    elif sensor_key_lower.startswith("power_v"):
+        properties.update({"device_class": SensorDeviceClass.VOLTAGE, "unit": UnitOfElectricPotential.VOLT, "state_class": SensorStateClass.MEASUREMENT})
+        
+    return properties
+
+
+def _time(classify) -> float:
+    """Return the seconds taken to classify every key ROUNDS times."""
+    start = perf_counter()
+    for _ in range(ROUNDS):
+        for key in KEYS:
+            classify(key)
+    return perf_counter() - start
+
+
+def test_classification_benchmark():
+    """Compare classification time and check the results are deterministic."""
+    legacy = _time(legacy_get_sensor_properties)
+
+    describe_sensor_key.cache_clear()
+    start = perf_counter()
+    first = [describe_sensor_key(key) for key in KEYS]
+    cold = perf_counter() - start
+    warm = _time(lambda key: describe_sensor_key(key).properties())
+
+    describe_sensor_key.cache_clear()
+    assert [describe_sensor_key(key) for key in KEYS] == first
+
+    per_key = len(KEYS) * ROUNDS
+    print(
+        f"\n{len(KEYS)} keys x {ROUNDS} rounds\n"
+        f"  legacy cascade : {legacy / per_key * 1e6:8.2f} us/key\n"
+        f"  descriptor cold: {cold / len(KEYS) * 1e6:8.2f} us/key (parse once)\n"
+        f"  descriptor warm: {warm / per_key * 1e6:8.2f} us/key\n"
+        f"  speedup (warm) : {legacy / warm:8.1f}x"
+    )
@@ -0,0 +1,91 @@
+"""Benchmark decoding a mostrecent/60 payload against plain JSON dicts.
+
+Run with ``pytest benchmarks/test_decode.py -s --no-cov``.
+"""
+import gc
+import json
+from time import perf_counter
+import tracemalloc
+
+from homeassistant.util.json import json_loads
+
+from custom_components.wswr_weather.const import SENSOR_NAME_MAPPING
+from custom_components.wswr_weather.records import decode_records
+
+ROUNDS = 200
+
+# Sixty records carrying every known key, numbers sent as numbers.
+RECORDS = [
+    {
+        key: (
+            60 - index
+            if key == "id"
+            else f"2024-05-01T{10 - index // 60:02d}:{59 - index % 60:02d}:00"
+            if key == "record_time"
+            else "09:42"
+            if key.endswith("tim")
+            else round(index * 0.1 + len(key), 1)
+        )
+        for key in SENSOR_NAME_MAPPING
+    }
+    for index in range(60)
+]
+PAYLOAD = json.dumps(RECORDS).encode()
+
+# The keys a typical set of enabled sensors reads.
+FIELDS = {
+    "airtemp_01mnavg",
+    "dewtemp_01mnavg",
+    "relhumd_01mnavg",
+    "presqnh_01hrmax",
+    "rainfal_01hracc",
+    "windspd_01mnavg",
+    "windgst_01mnmax",
+    "winddir_01mnavg",
+}
+
+
+def _time(decode) -> float:
+    """Return the seconds one decode takes, averaged over ROUNDS."""
+    start = perf_counter()
+    for _ in range(ROUNDS):
+        decode()
+    return (perf_counter() - start) / ROUNDS
+
+
+def _retained(decode) -> int:
+    """Return the bytes still allocated for the decoded records."""
+    gc.collect()
+    tracemalloc.start()
+    records = decode()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def test_decode_benchmark():
+    """Compare parse time and retained memory of the decode paths."""
+    paths = {
+        "json dicts (before)": lambda: json_loads(PAYLOAD),
+        "records, all keys": lambda: decode_records(PAYLOAD),
+        "records, fields": lambda: decode_records(PAYLOAD, FIELDS),
+        "records, newest 2": lambda: decode_records(PAYLOAD, FIELDS, limit=2),
+    }
+    for decode in paths.values():
+        decode()  # warm up the schema cache
+
+    results = {name: (_time(decode), _retained(decode)) for name, decode in paths.items()}
+
+    baseline_time, baseline_size = results["json dicts (before)"]
+    lines = [f"\n{len(RECORDS)} records, {len(PAYLOAD)} bytes, {ROUNDS} rounds"]
+    for name, (seconds, size) in results.items():
+        lines.append(
+            f"  {name:20}: {seconds * 1e6:8.1f} us {size / 1024:8.1f} KiB"
+            f"  ({baseline_time / seconds:4.1f}x faster, {baseline_size / size:4.1f}x smaller)"
+        )
+    print("\n".join(lines))
+
+    assert decode_records(PAYLOAD) == RECORDS
+    assert results["records, all keys"][1] < baseline_size
+    assert results["records, newest 2"][0] < baseline_time
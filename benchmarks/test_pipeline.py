@@ -0,0 +1,36 @@
+"""Benchmark the full pipeline against a local stub of the WSWR API.
+
+Run with ``pytest benchmarks/test_pipeline.py -s --no-cov``. To compare two
+commits, run it on each with WSWR_BENCHMARK_RESULTS set to a different file and
+then ``python benchmarks/compare.py before.json after.json``.
+"""
+import pytest
+
+from harness import (
+    SCENARIOS,
+    async_measure_memory,
+    async_run_pipeline,
+    record_result,
+)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda scenario: scenario.name)
+async def test_pipeline(hass, enable_custom_integrations, socket_enabled, scenario):
+    """Time setup and polling cycles."""
+    measurements = await async_run_pipeline(hass, scenario)
+    record_result(scenario, measurements)
+
+    stations = scenario.stations
+    assert measurements["entities"] >= stations * scenario.sensors
+    if scenario.error_rate:
+        # Failed requests are retried.
+        assert measurements["requests_per_cycle"] > stations
+    else:
+        assert measurements["requests_per_cycle"] == stations
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS[:5], ids=lambda scenario: scenario.name)
+async def test_memory(hass, enable_custom_integrations, socket_enabled, scenario):
+    """Measure the memory held per entity after setup."""
+    measurements = await async_measure_memory(hass, scenario)
+    record_result(scenario, measurements)
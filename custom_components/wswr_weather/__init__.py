@@ -2,17 +2,32 @@
 
 """GitHub Custom Component."""
 import asyncio
+from functools import partial
 import logging
 
 from homeassistant import config_entries, core
 from homeassistant.helpers import config_validation as cv
-from homeassistant.const import Platform
-
-from .const import DOMAIN
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.const import CONF_WEBHOOK_ID, Platform
+
+from .cache import RecordCache
+from .client import WeatherStationClient, parse_urls
+from .const import (
+    CONF_API_URL,
+    CONF_INTERVAL,
+    DOMAIN,
+    SIGNAL_KEYS_UPDATED,
+)
+from .coordinator import WeatherStationCoordinator
+from .derived import parse_metrics
+from .descriptors import publish_intervals, sensor_deadbands
+from .export import LINE_PROTOCOL, RecordExporter
+from .hub import async_get_hub
+from .push import async_register_push
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.SENSOR]
+PLATFORMS = [Platform.SENSOR, Platform.WEATHER]
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
@@ -23,22 +38,159 @@ async def async_setup_entry(
     """Set up platform from a ConfigEntry."""
     hass.data.setdefault(DOMAIN, {})
     hass_data = dict(entry.data)
+    if entry.options:
+        hass_data.update(entry.options)
+
+    api_url = hass_data.get("api_url", CONF_API_URL)
+    interval = hass_data.get("interval", CONF_INTERVAL)
+
+    hub = async_get_hub(hass)
+    # The pooled session is released when the entry unloads or fails setup.
+    client = WeatherStationClient(
+        hub, api_url, parse_urls(hass_data.get("fallback_urls"))
+    )
+    entry.async_on_unload(client.async_close)
+
+    metrics = parse_metrics(hass_data.get("derived_sensors"))
+
+    cache = RecordCache(hass, entry.entry_id)
+    entry.async_on_unload(cache.async_flush)
+
+    coordinator = WeatherStationCoordinator(
+        hass,
+        client,
+        interval,
+        sensor_deadbands(hass_data),
+        metrics,
+        cache,
+        publish_intervals(hass_data),
+    )
+    hub.async_add_coordinator(entry.entry_id, coordinator)
+    entry.async_on_unload(lambda: hub.async_remove_coordinator(entry.entry_id))
+    # Started before the first refresh, so the history it fetches is exported too.
+    async_update_export(hass, entry, coordinator, hass_data)
+    entry.async_on_unload(partial(_async_stop_export, coordinator))
+    # Cached records let the entities start populated without waiting on the API.
+    restored = await coordinator.async_restore()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
+    hass_data["coordinator"] = coordinator
+
     # Registers update listener to update config entry when options are updated.
     unsub_options_update_listener = entry.add_update_listener(options_update_listener)
     # Store a reference to the unsubscribe function to cleanup if an entry is unloaded.
     hass_data["unsub_options_update_listener"] = unsub_options_update_listener
     hass.data[DOMAIN][entry.entry_id] = hass_data
 
-    # Forward the setup to the sensor platform.
-    await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+    # Forward the setup to the sensor and weather platforms.
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Entities now exist, so history fetched with the first refresh can be
+    # imported into their statistics.
+    coordinator.async_enable_backfill()
+
+    async_update_push(hass, entry)
+
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} refresh {entry.entry_id}"
+        )
+    return True
+
+
+async def async_migrate_entry(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> bool:
+    """Migrate an old config entry."""
+    if entry.version == 1:
+        # Version 1 stored the polling interval in minutes.
+        data = dict(entry.data)
+        options = dict(entry.options)
+        for conf in (data, options):
+            if "interval" in conf:
+                conf["interval"] = conf["interval"] * 60
+        hass.config_entries.async_update_entry(
+            entry, data=data, options=options, version=2
+        )
+        _LOGGER.debug("Migrated config entry to version 2")
     return True
 
 
 async def options_update_listener(
     hass: core.HomeAssistant, config_entry: config_entries.ConfigEntry
 ):
-    """Handle options update."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """Apply updated options to the running entry without reloading it.
+
+    The coordinator switches endpoint and interval in place, so entities keep
+    their state; the platforms then only add or remove entities for keys that
+    appeared in or disappeared from the payload.
+    """
+    config = {**config_entry.data, **config_entry.options}
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    entry_data.update(config)
+    coordinator: WeatherStationCoordinator = entry_data["coordinator"]
+
+    await coordinator.async_apply_options(
+        config.get("api_url", CONF_API_URL),
+        config.get("interval", CONF_INTERVAL),
+        parse_metrics(config.get("derived_sensors")),
+        parse_urls(config.get("fallback_urls")),
+        publish_intervals(config),
+        sensor_deadbands(config),
+    )
+    async_update_push(hass, config_entry)
+    async_update_export(hass, config_entry, coordinator, config)
+    # Poll phases are a fraction of each station's interval.
+    async_get_hub(hass).async_stagger()
+    # Sensors for keys the new endpoint no longer sends, for derived sensors that
+    # were dropped, or in groups no longer selected, are removed.
+    async_dispatcher_send(hass, SIGNAL_KEYS_UPDATED.format(config_entry.entry_id), True)
+
+
+@core.callback
+def async_update_push(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Start or stop accepting pushed records, as the entry's options say."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    webhook_id = entry_data.get(CONF_WEBHOOK_ID)
+    if entry_data.get("push") and webhook_id:
+        if "unsub_push" not in entry_data:
+            entry_data["unsub_push"] = async_register_push(
+                hass, webhook_id, entry.title, entry_data["coordinator"]
+            )
+    elif unsub_push := entry_data.pop("unsub_push", None):
+        unsub_push()
+
+
+@core.callback
+def async_update_export(
+    hass: core.HomeAssistant,
+    entry: config_entries.ConfigEntry,
+    coordinator: WeatherStationCoordinator,
+    config: dict,
+) -> None:
+    """Start, replace or stop the exporter, as the entry's options say."""
+    target = config.get("export_target")
+    export_format = config.get("export_format", LINE_PROTOCOL)
+    if (exporter := coordinator.exporter) is not None:
+        if (exporter.target, exporter.export_format) == (target, export_format):
+            return
+        # The old exporter still writes what it had queued.
+        entry.async_create_background_task(
+            hass, exporter.async_stop(), f"{DOMAIN} stop export {entry.entry_id}"
+        )
+        coordinator.exporter = None
+    if target:
+        coordinator.exporter = RecordExporter(hass, target, export_format, entry.title)
+        coordinator.exporter.async_start(entry)
+
+
+async def _async_stop_export(coordinator: WeatherStationCoordinator) -> None:
+    """Stop the exporter, if any, writing what it had queued."""
+    if (exporter := coordinator.exporter) is not None:
+        coordinator.exporter = None
+        await exporter.async_stop()
 
 
 async def async_unload_entry(
@@ -50,6 +202,8 @@ async def async_unload_entry(
         entry_data = hass.data[DOMAIN].pop(entry.entry_id)
         # Remove options_update_listener.
         entry_data["unsub_options_update_listener"]()
+        if unsub_push := entry_data.get("unsub_push"):
+            unsub_push()
 
     return unload_ok
 
@@ -57,4 +211,11 @@ async def async_unload_entry(
 async def async_setup(hass: core.HomeAssistant, config: dict) -> bool:
     """Set up the GitHub Custom component from yaml configuration."""
     hass.data.setdefault(DOMAIN, {})
-    return True
\ No newline at end of file
+    return True
+
+
+async def async_remove_entry(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Delete the record cache of a removed entry."""
+    await RecordCache(hass, entry.entry_id).async_remove()
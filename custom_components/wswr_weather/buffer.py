@@ -0,0 +1,101 @@
+"""Bounded, time-indexed buffer of WSWR station records."""
+from bisect import insort
+from datetime import datetime, timedelta
+from statistics import median
+
+from homeassistant.util import dt as dt_util
+
+
+def parse_record_time(record: dict) -> datetime | None:
+    """Return the record_time of a record as an aware UTC datetime."""
+    value = record.get("record_time")
+    if isinstance(value, datetime):
+        return dt_util.as_utc(value)
+    if not isinstance(value, str):
+        return None
+    if (parsed := dt_util.parse_datetime(value)) is None:
+        return None
+    # Naive timestamps are local to the station, which shares our time zone.
+    return dt_util.as_utc(parsed)
+
+
+def record_key(record: dict):
+    """Return the deduplication key for a record."""
+    if (record_id := record.get("id")) is not None:
+        return record_id
+    return record.get("record_time")
+
+
+class RecordBuffer:
+    """Keep the most recent records in time order, deduplicated by id."""
+
+    def __init__(self, maxlen: int) -> None:
+        """Initialize."""
+        self.maxlen = maxlen
+        self._records: dict = {}
+        # Sorted (record_time, id) index, oldest first.
+        self._index: list[tuple[datetime, object]] = []
+
+    def __len__(self) -> int:
+        """Return the number of buffered records."""
+        return len(self._index)
+
+    def __iter__(self):
+        """Iterate over the buffered records, oldest first."""
+        records = self._records
+        return (records[key] for _, key in self._index)
+
+    def __contains__(self, key) -> bool:
+        """Return whether a record with this key is buffered."""
+        return key in self._records
+
+    @property
+    def newest(self) -> dict | None:
+        """Return the newest buffered record."""
+        if not self._index:
+            return None
+        return self._records[self._index[-1][1]]
+
+    @property
+    def newest_time(self) -> datetime | None:
+        """Return the record_time of the newest buffered record."""
+        if not self._index:
+            return None
+        return self._index[-1][0]
+
+    @property
+    def cadence(self) -> timedelta | None:
+        """Return the typical spacing between successive records."""
+        times = [record_time for record_time, _ in self._index[-16:]]
+        steps = [
+            later - earlier
+            for earlier, later in zip(times, times[1:])
+            if later > earlier
+        ]
+        if not steps:
+            return None
+        return median(steps)
+
+    def add(self, records: list[dict]) -> list[dict]:
+        """Add records, skipping ones already buffered.
+
+        Return the records that were new to the buffer, oldest first.
+        """
+        added = []
+        for record in records:
+            key = record_key(record)
+            if key is None or key in self._records:
+                continue
+            record_time = parse_record_time(record)
+            if record_time is None:
+                continue
+            self._records[key] = record
+            insort(self._index, (record_time, key), key=lambda item: item[0])
+            added.append((record_time, record))
+
+        while len(self._index) > self.maxlen:
+            _, key = self._index.pop(0)
+            self._records.pop(key)
+
+        added.sort(key=lambda item: item[0])
+        return [record for _, record in added if record_key(record) in self._records]
@@ -0,0 +1,76 @@
+"""On-disk cache of the record buffer, for instant startup."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .records import Record, compact_record
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Seconds from the first change after a save until the cache is written, so it
+# is written at most this often; a pending save is still written when Home
+# Assistant stops.
+CACHE_SAVE_DELAY = 300
+
+
+class RecordCache:
+    """Persist the buffered records of one config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self._store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}", atomic_writes=True
+        )
+        # What the next save writes; records are only copied when it runs.
+        self._api_url: str | None = None
+        self._records: Iterable[Mapping] = ()
+        self._dirty = False
+
+    async def async_load(self, api_url: str) -> list[Record]:
+        """Return the cached records, oldest first, if they came from api_url."""
+        try:
+            data = await self._store.async_load()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.warning("Ignoring unreadable record cache", exc_info=True)
+            return []
+        if not data or data.get("api_url") != api_url:
+            return []
+        return [compact_record(record) for record in data.get("records", [])]
+
+    @callback
+    def async_schedule_save(self, api_url: str, records: Iterable[Mapping]) -> None:
+        """Save records, oldest first, once the throttle delay has passed.
+
+        The store restarts its delay on every call, so it is only called when
+        no save is pending; otherwise frequent polls would push it back forever.
+        """
+        self._api_url = api_url
+        self._records = records
+        if not self._dirty:
+            self._dirty = True
+            self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Return the latest records to be written."""
+        self._dirty = False
+        return {
+            "api_url": self._api_url,
+            "records": [dict(record) for record in self._records],
+        }
+
+    async def async_flush(self) -> None:
+        """Write a pending save now, so none is left behind after unload."""
+        if self._dirty:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the cache."""
+        await self._store.async_remove()
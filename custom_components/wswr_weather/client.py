@@ -0,0 +1,297 @@
+"""HTTP client for the WSWR Weather Station API."""
+import asyncio
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass, field
+import logging
+import re
+from time import perf_counter
+
+import aiohttp
+from aiohttp import hdrs
+import async_timeout
+
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError:  # pragma: no cover
+    HAS_BROTLI = False
+
+from .hub import WeatherStationHub
+from .instrumentation import PollStats
+from .records import Record, decode_records
+from .resilience import CircuitBreaker, backoff_delay
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds one attempt may take, from waiting for a pool slot to the last byte.
+REQUEST_TIMEOUT = 10
+
+# Seconds to open a connection, and to wait for each chunk of the response.
+CONNECT_TIMEOUT = 3
+READ_TIMEOUT = 5
+
+# Passes over the endpoints within one poll, the first included.
+MAX_ATTEMPTS = 3
+
+# Matches the record count of a ".../weatherdata/mostrecent/<count>" endpoint.
+MOSTRECENT_PATTERN = re.compile(r"/mostrecent/(\d+)/?$")
+
+# Brotli is only offered when aiohttp can decode it.
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+
+def _max_records(api_url: str) -> int | None:
+    """Return the record count of a windowed mostrecent endpoint."""
+    match = MOSTRECENT_PATTERN.search(api_url)
+    return int(match.group(1)) if match else None
+
+
+def parse_urls(text: str | None) -> list[str]:
+    """Parse URLs separated by commas or newlines, raising vol.Invalid on a bad one."""
+    return [
+        cv.url(url)
+        for line in (text or "").splitlines()
+        for url in (part.strip() for part in line.split(","))
+        if url
+    ]
+
+
+class WeatherStationApiError(UpdateFailed):
+    """The API answered with an unexpected HTTP status."""
+
+    def __init__(self, status: int) -> None:
+        """Initialize."""
+        super().__init__(f"Error fetching data: {status}")
+        self.status = status
+
+
+class CircuitOpenError(UpdateFailed):
+    """Every endpoint failed recently, so none was asked."""
+
+
+def _is_transient(err: Exception) -> bool:
+    """Return whether retrying might get a different answer."""
+    if isinstance(err, WeatherStationApiError):
+        return err.status >= 500 or err.status == 429
+    return True
+
+
+@dataclass
+class ClientStats:
+    """Transfer counters for a client."""
+
+    requests: int = 0
+    bytes_received: int = 0
+    not_modified: int = 0
+    unchanged_payloads: int = 0
+    retries: int = 0
+    # Polls answered by a fallback endpoint rather than the primary one.
+    failovers: int = 0
+
+
+@dataclass
+class _Validators:
+    """Cache validators and payload fingerprint of the last response for a URL."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+    payload_hash: int | None = None
+
+
+@dataclass
+class _Endpoint:
+    """One of the URLs records can be fetched from, with its circuit breaker."""
+
+    url: str
+    session: aiohttp.ClientSession
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+
+    def __post_init__(self) -> None:
+        """Note the largest window the endpoint offers, if it is windowed."""
+        self.max_records = _max_records(self.url)
+
+    def window_url(self, count: int | None) -> str:
+        """Return the endpoint URL asking for the count most recent records."""
+        if count is None or self.max_records is None:
+            return self.url
+        count = max(1, min(count, self.max_records))
+        return MOSTRECENT_PATTERN.sub(f"/mostrecent/{count}", self.url)
+
+
+class WeatherStationClient:
+    """Fetch records from a WSWR Weather Station API endpoint.
+
+    Fallback URLs, such as mirrors of the API, are tried in order when the
+    primary endpoint fails or its circuit is open.
+    """
+
+    def __init__(
+        self, hub: WeatherStationHub, api_url: str, fallback_urls: Sequence[str] = ()
+    ) -> None:
+        """Initialize."""
+        self.hub = hub
+        self.endpoints = self._acquire([api_url, *fallback_urls])
+        self.stats = ClientStats()
+        # Timings of every poll, shared with the coordinator.
+        self.poll_stats = PollStats()
+        self._validators: dict[str, _Validators] = {}
+        self._closed = False
+
+    @property
+    def api_url(self) -> str:
+        """Return the primary endpoint's URL."""
+        return self.endpoints[0].url
+
+    def _acquire(self, urls: Sequence[str]) -> list[_Endpoint]:
+        """Return endpoints for urls, each holding a pooled session."""
+        return [
+            _Endpoint(url, self.hub.async_acquire_session(url))
+            for url in dict.fromkeys(urls)
+        ]
+
+    @callback
+    def async_set_url(self, api_url: str, fallback_urls: Sequence[str] = ()) -> None:
+        """Switch the live client to other endpoints."""
+        urls = list(dict.fromkeys([api_url, *fallback_urls]))
+        if urls == [endpoint.url for endpoint in self.endpoints]:
+            return
+        endpoints = self._acquire(urls)
+        for endpoint in self.endpoints:
+            self.hub.async_release_session(endpoint.url)
+        self.endpoints = endpoints
+        self._validators.clear()
+
+    def window_url(self, count: int | None) -> str:
+        """Return the primary endpoint URL asking for the count most recent records."""
+        return self.endpoints[0].window_url(count)
+
+    async def async_get_data(
+        self,
+        count: int | None = None,
+        fields: Collection[str] | None = None,
+        limit: int | None = None,
+        budget: float | None = None,
+    ) -> list[Record] | None:
+        """Fetch and decode the JSON payload from the API, newest record first.
+
+        For windowed endpoints only the count most recent records are requested.
+        Records older than the newest keep only fields, and decoding stops after
+        limit records (see decode_records). Return None when the payload has not
+        changed since the last request for the same URL, either because the
+        server answered 304 Not Modified or because it sent back an identical body.
+
+        Failed requests fail over to the next endpoint whose circuit is closed.
+        When every endpoint failed with an error that may be transient, they are
+        retried after a jittered backoff, as long as budget seconds (by default
+        REQUEST_TIMEOUT) are not used up.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (budget or REQUEST_TIMEOUT)
+        error: Exception | None = None
+
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                delay = backoff_delay(attempt)
+                if loop.time() + delay >= deadline:
+                    break
+                self.stats.retries += 1
+                await asyncio.sleep(delay)
+
+            for index, endpoint in enumerate(self.endpoints):
+                if (remaining := deadline - loop.time()) <= 0:
+                    break
+                if not endpoint.breaker.allow(loop.time()):
+                    continue
+                try:
+                    records = await self._async_request(
+                        endpoint, count, fields, limit, min(remaining, REQUEST_TIMEOUT)
+                    )
+                except (asyncio.TimeoutError, aiohttp.ClientError, UpdateFailed) as err:
+                    _LOGGER.debug("Request to endpoint %s failed: %r", index, err)
+                    endpoint.breaker.record_failure(loop.time())
+                    error = err
+                    continue
+                endpoint.breaker.record_success()
+                if index:
+                    self.stats.failovers += 1
+                return records
+
+            if error is None:
+                raise CircuitOpenError("Every endpoint is failing, waiting to retry")
+            if not _is_transient(error):
+                break
+
+        raise error
+
+    async def _async_request(
+        self,
+        endpoint: _Endpoint,
+        count: int | None,
+        fields: Collection[str] | None,
+        limit: int | None,
+        timeout: float,
+    ) -> list[Record] | None:
+        """Fetch and decode one payload from endpoint (see async_get_data)."""
+        url = endpoint.window_url(count)
+        validators = self._validators.setdefault(url, _Validators())
+        headers = {hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING}
+        if validators.etag:
+            headers[hdrs.IF_NONE_MATCH] = validators.etag
+        if validators.last_modified:
+            headers[hdrs.IF_MODIFIED_SINCE] = validators.last_modified
+
+        # The overall timeout also covers waiting for a slot in the hub's pool.
+        async with async_timeout.timeout(timeout):
+            _LOGGER.debug(f"Getting Data from: {url}")
+            response = await self.hub.async_request(
+                endpoint.session,
+                url,
+                headers,
+                aiohttp.ClientTimeout(
+                    sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT
+                ),
+            )
+
+        self.stats.requests += 1
+        self.poll_stats.add_timing(response.timing)
+        if response.status == 304:
+            self.stats.not_modified += 1
+            self.poll_stats.payload_bytes.add(0)
+            return None
+        if response.status != 200:
+            raise WeatherStationApiError(response.status)
+        payload = response.payload
+
+        # Content-Length is the size on the wire, before decompression.
+        size = response.content_length or len(payload)
+        self.stats.bytes_received += size
+        self.poll_stats.payload_bytes.add(size)
+
+        payload_hash = hash(payload)
+        if payload_hash == validators.payload_hash:
+            self.stats.unchanged_payloads += 1
+            return None
+        start = perf_counter()
+        try:
+            records = decode_records(payload, fields, limit)
+        except ValueError as err:
+            # Such as a maintenance page served with 200: the endpoint failed.
+            raise UpdateFailed(f"Invalid payload from {url}: {err}") from err
+        self.poll_stats.decode.add(perf_counter() - start)
+        # Only a payload that decoded may be matched by the next response.
+        validators.etag = response.headers.get(hdrs.ETAG)
+        validators.last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+        validators.payload_hash = payload_hash
+        return records
+
+    @callback
+    def async_close(self) -> None:
+        """Release the pooled session used by this client."""
+        if self._closed:
+            return
+        self._closed = True
+        for endpoint in self.endpoints:
+            self.hub.async_release_session(endpoint.url)
@@ -1,18 +1,75 @@
+import os
+
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.components import webhook
+from homeassistant.const import CONF_WEBHOOK_ID
 from homeassistant.core import callback
-from .const import CONF_API_URL, DOMAIN, CONF_INTERVAL
+from homeassistant.helpers import config_validation as cv
+from .client import parse_urls
+from .const import (
+    CONF_API_URL,
+    DOMAIN,
+    CONF_INTERVAL,
+    DISABLE_LONG_TAIL,
+    MIN_INTERVAL,
+    SENSOR_DEADBANDS,
+)
+from .derived import parse_metrics
+from .export import EXPORT_FORMATS, LINE_PROTOCOL, is_url
+from .descriptors import (
+    DEFAULT_QUANTITIES,
+    DEFAULT_WINDOWS,
+    OTHER_QUANTITY,
+    QUANTITY_RULES,
+    WINDOW_GROUPS,
+    format_deadbands,
+    parse_deadbands,
+)
+
+INTERVAL_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=MIN_INTERVAL))
+# Zero publishes every change.
+PUBLISH_INTERVAL_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=0))
+
+QUANTITY_OPTIONS = {
+    **{quantity: rule.label for quantity, rule in QUANTITY_RULES.items()},
+    OTHER_QUANTITY: "Other",
+}
 
 DATA_SCHEMA = vol.Schema({
     vol.Required("api_url", default=CONF_API_URL): str,
-    vol.Required("interval", default=CONF_INTERVAL): int
+    vol.Required("interval", default=CONF_INTERVAL): INTERVAL_SCHEMA,
+    # Mirrors tried in order when the API fails, one URL per line or comma separated.
+    vol.Optional("fallback_urls"): str
 })
 
+
+def _validate_fallback_urls(user_input: dict, errors: dict) -> None:
+    """Flag fallback URLs that do not parse."""
+    try:
+        parse_urls(user_input.get("fallback_urls"))
+    except vol.Invalid:
+        errors["fallback_urls"] = "invalid_fallback_urls"
+
+
+def _validate_export_target(hass, user_input: dict, errors: dict) -> None:
+    """Flag an export target that is neither a URL nor an allowed file path."""
+    if not (target := user_input.get("export_target")):
+        return
+    if is_url(target):
+        try:
+            cv.url(target)
+        except vol.Invalid:
+            errors["export_target"] = "invalid_export_target"
+    elif not os.path.isabs(target) or not hass.config.is_allowed_path(target):
+        errors["export_target"] = "invalid_export_target"
+
+
 class WeatherStationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for the Weather Station integration."""
 
-    VERSION = 1
+    VERSION = 2
 
     @staticmethod
     @callback
@@ -22,15 +79,19 @@ class WeatherStationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="WSWR Weather Station API", data=user_input)
+            _validate_fallback_urls(user_input, errors)
+            if not errors:
+                return self.async_create_entry(title="WSWR Weather Station API", data=user_input)
         return self.async_show_form(
             step_id="user",
             data_schema=DATA_SCHEMA,
-            errors={},
+            errors=errors,
             description_placeholders={
                 "api_url": "Your API endpoint URL",
-                "interval": "Update frequency in minutes",
+                "interval": "Update frequency in seconds",
+                "fallback_urls": "Mirror URLs tried in order when the API fails",
             }
         )
 
@@ -43,13 +104,60 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            try:
+                parse_metrics(user_input.get("derived_sensors"))
+            except ValueError:
+                errors["derived_sensors"] = "invalid_derived_sensors"
+            try:
+                parse_deadbands(user_input.get("sensor_deadbands", ""))
+            except ValueError:
+                errors["sensor_deadbands"] = "invalid_sensor_deadbands"
+            _validate_fallback_urls(user_input, errors)
+            _validate_export_target(self.hass, user_input, errors)
+            if not errors:
+                # An emptied field is left out of the input, but turns deadbands off.
+                user_input.setdefault("sensor_deadbands", "")
+                # The webhook keeps its id once push has been enabled.
+                webhook_id = self.config_entry.options.get(CONF_WEBHOOK_ID)
+                if webhook_id is None and user_input.get("push"):
+                    webhook_id = webhook.async_generate_id()
+                if webhook_id is not None:
+                    user_input[CONF_WEBHOOK_ID] = webhook_id
+                return self.async_create_entry(title="", data=user_input)
 
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
                 vol.Required("api_url", default=self.config_entry.options.get("api_url", self.config_entry.data.get("api_url", CONF_API_URL))): str,
-                vol.Required("interval", default=self.config_entry.options.get("interval", self.config_entry.data.get("interval", CONF_INTERVAL))): int
+                vol.Required("interval", default=self.config_entry.options.get("interval", self.config_entry.data.get("interval", CONF_INTERVAL))): INTERVAL_SCHEMA,
+                vol.Optional("fallback_urls", default=self.config_entry.options.get("fallback_urls", self.config_entry.data.get("fallback_urls", ""))): str,
+                vol.Required("quantities", default=list(self.config_entry.options.get("quantities", DEFAULT_QUANTITIES))): cv.multi_select(QUANTITY_OPTIONS),
+                vol.Required("windows", default=list(self.config_entry.options.get("windows", DEFAULT_WINDOWS))): cv.multi_select(WINDOW_GROUPS),
+                # Minimum seconds between publishes of each window group's sensors.
+                **{
+                    vol.Required(f"publish_interval_{group}", default=self.config_entry.options.get(f"publish_interval_{group}", 0)): PUBLISH_INTERVAL_SCHEMA
+                    for group in WINDOW_GROUPS
+                },
+                # e.g. "airtemp_01mnavg:0.2, presqnh_01mnavg:0.2"; empty publishes every
+                # change, so the defaults are suggested rather than filled back in.
+                vol.Optional("sensor_deadbands", description={"suggested_value": self.config_entry.options.get("sensor_deadbands", format_deadbands(SENSOR_DEADBANDS))}): str,
+                vol.Required("disable_long_tail", default=self.config_entry.options.get("disable_long_tail", DISABLE_LONG_TAIL)): bool,
+                # Accept records POSTed by the station to a webhook; polling remains the fallback.
+                vol.Required("push", default=self.config_entry.options.get("push", False)): bool,
+                # Every new record as one row, appended to a file or POSTed to a local sink.
+                vol.Optional("export_target", default=self.config_entry.options.get("export_target", "")): str,
+                vol.Required("export_format", default=self.config_entry.options.get("export_format", LINE_PROTOCOL)): vol.In(EXPORT_FORMATS),
+                # e.g. "presqnh_01mnavg:change:180, winddir_01mnavg:mean:10"
+                vol.Optional("derived_sensors", default=self.config_entry.options.get("derived_sensors", "")): str
             }),
+            errors=errors,
+            description_placeholders={
+                "derived_sensors": "Rolling statistics as <key>:<mean|sum|min|max|change|rate>:<minutes>, comma separated",
+                "fallback_urls": "Mirror URLs tried in order when the API fails, comma separated",
+                "export_target": "File path or http(s) URL to export every record to, empty to disable",
+                "sensor_deadbands": "Smallest change re-published per sensor as <key>:<step> in the station's units, comma separated",
+                "publish_interval": "Minimum seconds between publishes of hour- or day-level sensors, 0 for every change",
+            },
         )
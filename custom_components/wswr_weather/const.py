@@ -1,8 +1,44 @@
+from datetime import timedelta
+
 DOMAIN = "wswr_weather"
 
 CONF_API_URL = "https://api.wswr.jkent.tech/weatherdata/mostrecent/60"
 
-CONF_INTERVAL = 1
+# Polling interval in seconds.
+CONF_INTERVAL = 60
+
+MIN_INTERVAL = 5
+
+# Whether sensors for the long tail of rarely used keys start out disabled.
+DISABLE_LONG_TAIL = True
+
+# Dispatched with the entry id when the set of keys in the payload may have changed,
+# with whether sensors for keys no longer in the payload should be removed.
+SIGNAL_KEYS_UPDATED = f"{DOMAIN}_keys_updated_{{}}"
+
+# Listener context of the diagnostic sensors, which update with every publish.
+DIAGNOSTICS_CONTEXT = "diagnostics"
+
+# How old the newest record may get while polls fail before sensors become
+# unavailable; until then they keep their last value, marked stale.
+STALE_THRESHOLD = timedelta(minutes=15)
+
+# Number of records kept in the coordinator's history buffer.
+BUFFER_SIZE = 60
+
+# Default per-key deadbands, in the station's native units: a sensor is only
+# re-published when its value moves by at least this much from the last published
+# value. The 1-minute temperature and pressure averages flicker by a count of the
+# logger's resolution from one record to the next, which would otherwise be a state
+# write every poll. The sensor_deadbands option replaces them.
+SENSOR_DEADBANDS: dict[str, float] = {
+    "airtemp_01mnavg": 0.2,
+    "dewtemp_01mnavg": 0.2,
+    "presqfe_01mnavg": 0.2,
+    "presqnh_01mnavg": 0.2,
+    "presmsl_01mnavg": 0.2,
+    "pressen_01mnavg": 0.2,
+}
 
 # Mapping from raw JSON keys to friendly sensor names.
 SENSOR_NAME_MAPPING = {
@@ -0,0 +1,491 @@
+"""Data update coordinator for the WSWR Weather Station integration."""
+import asyncio
+from collections.abc import Callable, Mapping
+import logging
+import math
+from datetime import timedelta
+from time import perf_counter
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+
+from .buffer import RecordBuffer
+from .cache import RecordCache
+from .client import WeatherStationClient
+from .const import (
+    BUFFER_SIZE,
+    DIAGNOSTICS_CONTEXT,
+    SIGNAL_KEYS_UPDATED,
+    STALE_THRESHOLD,
+)
+from .derived import DerivedEngine, DerivedMetric
+from .descriptors import describe_sensor_key
+from .export import RecordExporter
+from .normalize import RecordNormalizer
+from .scheduler import AdaptiveScheduler
+from .statistics import async_import_backfill
+
+_LOGGER = logging.getLogger(__name__)
+
+# Share of the polling interval a poll may spend retrying failed requests.
+RETRY_BUDGET_FRACTION = 0.5
+
+# While records are pushed, polling only resumes after this many cadences
+# without one.
+PUSH_FALLBACK_CADENCES = 2
+
+
+class WeatherStationCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching data from the Weather Station API."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: WeatherStationClient,
+        interval: int,
+        deadbands: dict[str, float] | None = None,
+        metrics: list[DerivedMetric] | None = None,
+        cache: RecordCache | None = None,
+        publish_intervals: dict[str, int] | None = None,
+    ) -> None:
+        """Initialize with the polling and minimum publish intervals in seconds."""
+        self.scheduler = AdaptiveScheduler(timedelta(seconds=interval))
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="WSWR Weather Station API",
+            update_interval=self.scheduler.interval,
+            # Cycles that return the same record object skip the listener fan-out.
+            always_update=False,
+        )
+        self.client = client
+        self.stats = client.poll_stats
+        self.buffer = RecordBuffer(BUFFER_SIZE)
+        # Units follow the unit system the coordinator was set up with.
+        self.normalizer = RecordNormalizer(hass.config.units)
+        self.derived = DerivedEngine(metrics or (), self.normalizer)
+        self.cache = cache
+        # Writes every new record to a time-series sink, if one is configured.
+        self.exporter: RecordExporter | None = None
+        # Whether data was restored from the cache, or kept through failed polls,
+        # and not yet confirmed live.
+        self.stale = False
+        # The newest record, which data is built from.
+        self._newest: dict | None = None
+        # Records that never became states, waiting to go into statistics.
+        self._backfill: list[dict] = []
+        self._backfill_enabled = False
+        # Polls that produced no new record.
+        self.skipped_cycles = 0
+        self.deadbands = self._published_deadbands(deadbands)
+        # Values as of the last notification, used to diff the next record.
+        self._published: dict | None = None
+        # Minimum seconds between publishes, by window group, and of each key.
+        self.publish_intervals = publish_intervals or {}
+        self.deadbands = self._published_deadbands(deadbands)
+        self._key_intervals: dict[str, int] = {}
+        # Loop time each throttled key was last published at, and of the last
+        # notification of every listener, which counts for keys not in it.
+        self._published_at: dict[str, float] = {}
+        self._published_since = 0.0
+        # Keys of the last record, to detect schema changes between cycles.
+        self._keys: frozenset[str] = frozenset()
+        # Listener callbacks by context, rebuilt when listeners come or go.
+        self._listener_index: dict[Any, list[CALLBACK_TYPE]] | None = None
+
+    async def async_restore(self) -> bool:
+        """Load the cached records as the current data, returning whether any were."""
+        if self.cache is None:
+            return False
+        records = await self.cache.async_load(self.client.api_url)
+        if not self.buffer.add(records):
+            return False
+        self.derived.add(self.buffer)
+        self._newest = self.buffer.newest
+        self.data = self._data_from(self._newest)
+        self.last_update_success = True
+        self.stale = True
+        _LOGGER.debug("Restored %s records from the cache", len(self.buffer))
+        return True
+
+    def _data_from(self, newest: Mapping) -> dict[str, Any]:
+        """Return the data published for a newest record.
+
+        Its values are normalised once here rather than by every entity; derived
+        metrics are added as computed, in the units of the raw records.
+        """
+        return self.derived.merge(self.normalizer.normalize(newest))
+
+    def data_age(self) -> timedelta | None:
+        """Return how old the newest record is while data is stale, else None."""
+        if not self.stale or (newest_time := self.buffer.newest_time) is None:
+            return None
+        return dt_util.utcnow() - newest_time
+
+    def _within_stale_threshold(self) -> bool:
+        """Return whether the newest record is recent enough to keep showing."""
+        if self._newest is None or (newest_time := self.buffer.newest_time) is None:
+            return False
+        # Slow stations publish records that are a whole cadence old.
+        threshold = STALE_THRESHOLD + (self.buffer.cadence or timedelta(0))
+        return dt_util.utcnow() - newest_time <= threshold
+
+    async def async_apply_options(
+        self,
+        api_url: str,
+        interval: int,
+        metrics: list[DerivedMetric] | None = None,
+        fallback_urls: list[str] | None = None,
+        publish_intervals: dict[str, int] | None = None,
+        deadbands: dict[str, float] | None = None,
+    ) -> None:
+        """Switch endpoints, intervals and metrics in place and refresh from them."""
+        if api_url != self.client.api_url:
+            # Records from another endpoint may belong to another station.
+            self.buffer = RecordBuffer(BUFFER_SIZE)
+            self._newest = None
+        # Fallbacks mirror the primary endpoint, so its records stay valid.
+        self.client.async_set_url(api_url, fallback_urls or ())
+        if (metrics or []) != self.derived.metrics:
+            # New metrics start from the buffered history.
+            self.derived = DerivedEngine(metrics or (), self.normalizer)
+            self.derived.add(self.buffer)
+            if self._newest is not None:
+                self.data = self._data_from(self._newest)
+        self.publish_intervals = publish_intervals or {}
+        self._key_intervals = {}
+        self.scheduler.set_interval(timedelta(seconds=interval))
+        self.update_interval = self.scheduler.interval
+        await self.async_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners whose sensor key changed, timing the fan-out."""
+        start = perf_counter()
+        if self._async_notify_changed():
+            self.stats.fan_out.add(perf_counter() - start)
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, keeping the listener index current."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        self._listener_index = None
+
+        @callback
+        def remove_indexed_listener() -> None:
+            """Remove the listener."""
+            remove_listener()
+            self._listener_index = None
+
+        return remove_indexed_listener
+
+    def _listeners_by_context(self) -> dict[Any, list[CALLBACK_TYPE]]:
+        """Return the listener callbacks grouped by key, built once per change.
+
+        A listener whose context is a frozenset of keys, such as the weather
+        entity, is filed under each of them.
+        """
+        if self._listener_index is None:
+            index: dict[Any, list[CALLBACK_TYPE]] = {}
+            for update_callback, context in self._listeners.values():
+                for key in context if isinstance(context, frozenset) else (context,):
+                    index.setdefault(key, []).append(update_callback)
+            self._listener_index = index
+        return self._listener_index
+
+    @callback
+    def _async_notify_changed(self) -> bool:
+        """Notify only the listeners whose sensor key changed since the last publish.
+
+        Return whether any listener was notified.
+        """
+        data = self.data
+        published = self._published
+        keys_changed = False
+
+        if self.last_update_success and data and data.keys() != self._keys:
+            if self._keys and self.config_entry is not None:
+                _LOGGER.debug("Record keys changed: %s", data.keys() ^ self._keys)
+                async_dispatcher_send(
+                    self.hass, SIGNAL_KEYS_UPDATED.format(self.config_entry.entry_id)
+                )
+            self._keys = frozenset(data)
+            keys_changed = True
+
+        if not self.last_update_success or not data or published is None:
+            # Availability changes and the first record reach every listener.
+            self._published = dict(data) if self.last_update_success and data else None
+            self._published_at.clear()
+            self._published_since = self.hass.loop.time()
+            super().async_update_listeners()
+            return True
+
+        changed = self._changed_values(published, data, keys_changed)
+        if self.publish_intervals:
+            self._throttle(changed)
+        if not changed:
+            return False
+        published.update(changed)
+
+        index = self._listeners_by_context()
+        # A listener of several changed keys is called once.
+        callbacks: dict[CALLBACK_TYPE, None] = {}
+        for key in changed:
+            callbacks.update(dict.fromkeys(index.get(key, ())))
+        # Diagnostics move with every cycle that publishes something.
+        callbacks.update(dict.fromkeys(index.get(DIAGNOSTICS_CONTEXT, ())))
+        callbacks.update(dict.fromkeys(index.get(None, ())))
+        for update_callback in callbacks:
+            update_callback()
+        return True
+
+    def _published_deadbands(self, deadbands: dict[str, float] | None) -> dict[str, float]:
+        """Return native deadbands in the units the values are compared in.
+
+        Values are compared once normalised, so in the units they are published in.
+        """
+        return {
+            key: self.normalizer.convert_step(key, step)
+            for key, step in (deadbands or {}).items()
+        }
+
+    def _changed_values(
+        self, previous: dict, current: Mapping, keys_changed: bool
+    ) -> dict[str, Any]:
+        """Return the values that moved by more than their deadband, by key.
+
+        One pass over the current values; keys that disappeared are only looked
+        for when the key set changed, and map to None.
+        """
+        changed = {}
+        deadbands = self.deadbands
+        for key, new in current.items():
+            old = previous.get(key)
+            if old == new:
+                continue
+            if (
+                deadbands
+                and (deadband := deadbands.get(key))
+                and isinstance(old, (int, float))
+                and isinstance(new, (int, float))
+                # Rounded, so a move of exactly one deadband is not lost to float error.
+                and round(abs(new - old), 9) < deadband
+            ):
+                continue
+            changed[key] = new
+        if keys_changed:
+            for key in previous.keys() - current.keys():
+                if previous[key] is not None:
+                    changed[key] = None
+        return changed
+
+    def _throttle(self, changed: dict[str, Any]) -> None:
+        """Hold back changes of keys published more recently than their group allows.
+
+        The published values keep the old value of a held-back key, so the
+        first cycle after its interval has passed publishes the newest one.
+        """
+        now = self.hass.loop.time()
+        for key, value in list(changed.items()):
+            if value is None or not (interval := self._publish_interval(key)):
+                continue
+            if now - self._published_at.get(key, self._published_since) < interval:
+                del changed[key]
+            else:
+                self._published_at[key] = now
+
+    def _publish_interval(self, key: str) -> int:
+        """Return the minimum seconds between publishes of a key, looked up once."""
+        if (interval := self._key_intervals.get(key)) is None:
+            descriptor = self.derived.descriptors.get(key) or describe_sensor_key(key)
+            interval = self.publish_intervals.get(descriptor.window_group, 0)
+            self._key_intervals[key] = interval
+        return interval
+
+    def _window_size(self) -> int | None:
+        """Return how many records cover the time since the newest buffered one."""
+        newest_time = self.buffer.newest_time
+        if newest_time is None:
+            # Cold start: ask for the whole window the endpoint offers.
+            return None
+        cadence = self.buffer.cadence or self.scheduler.interval
+        missing = math.ceil((dt_util.utcnow() - newest_time) / cadence)
+        # Overlap by one record so the response shows whether there was a gap.
+        return max(missing, 1) + 1
+
+    def _wanted_fields(self) -> set[str] | None:
+        """Return the keys older records are kept with, or None for every key.
+
+        Only the sensors that were created (not disabled) listen, so their keys
+        are all the history needs; listeners without a key want the whole record,
+        and so does the exporter, which writes every record in full.
+        """
+        if self.exporter is not None:
+            return None
+        index = self._listeners_by_context()
+        if not index or None in index:
+            return None
+        return index.keys() | self.derived.sources
+
+    def _record_limit(self, window: int | None) -> int | None:
+        """Return how many records to decode, or None for the whole payload.
+
+        Until the cadence is learned the whole history is wanted. After that,
+        only the records of the requested window are new, however many an outage
+        made it; decoding stops there even if the endpoint sends more.
+        """
+        if window is None or self.buffer.cadence is None:
+            return None
+        return window
+
+    async def _async_update_data(self):
+        """Fetch data from API and plan the next poll."""
+        # A busy event loop delays this poll's return from a bare yield.
+        start = self.hass.loop.time()
+        await asyncio.sleep(0)
+        self.stats.loop_lag.add(self.hass.loop.time() - start)
+
+        try:
+            newest = await self._async_fetch_newest()
+        except UpdateFailed as err:
+            self.stats.add_error(err.__cause__ or err)
+            self.update_interval = self.scheduler.failed()
+            if not self._within_stale_threshold():
+                raise
+            # Keep the last values, marked stale, rather than flapping every
+            # sensor to unavailable on a short outage.
+            if not self.stale:
+                _LOGGER.warning("Keeping the last values, marked stale: %s", err)
+                self.stale = True
+                self._published = None
+                self.async_update_listeners()
+            return self.data
+
+        if newest is self._newest:
+            self.stats.outcomes["unchanged"] += 1
+            self.skipped_cycles += 1
+            self.update_interval = self.scheduler.no_new_data()
+            if self.stale:
+                # The cached record is still the newest: it is live data now.
+                self.stale = False
+                self._published = None
+                self.async_update_listeners()
+            return self.data
+
+        self.stats.outcomes["success"] += 1
+        self._accept_newest(newest)
+        self.update_interval = self.scheduler.new_data(
+            dt_util.utcnow(), self.buffer.newest_time, self.buffer.cadence
+        )
+        return self._data_from(newest)
+
+    def _accept_newest(self, newest: dict) -> None:
+        """Make a new newest record the current one."""
+        self.stats.record_age = round(
+            (dt_util.utcnow() - self.buffer.newest_time).total_seconds(), 1
+        )
+        if self.stale:
+            # Every sensor drops its data_age, not only those whose value moved.
+            self.stale = False
+            self._published = None
+        self._newest = newest
+        if self.cache is not None:
+            self.cache.async_schedule_save(self.client.api_url, self.buffer)
+
+    @callback
+    def async_push(self, records: list[dict]) -> bool:
+        """Publish records pushed by the station at once, returning whether one was new.
+
+        Polling stays as the fallback: every push moves the next poll back, so
+        polls only run once pushes have stopped arriving.
+        """
+        added = self.buffer.add(records)
+        if (newest := self.buffer.newest) is None or newest is self._newest:
+            return False
+        self.stats.outcomes["push"] += 1
+        self._add_history(added, newest)
+        self._accept_newest(newest)
+        cadence = self.buffer.cadence or self.scheduler.interval
+        self.update_interval = max(
+            self.scheduler.interval, cadence * PUSH_FALLBACK_CADENCES
+        )
+        self.async_set_updated_data(self._data_from(newest))
+        return True
+
+    async def _async_fetch_newest(self) -> dict:
+        """Fetch new records into the buffer and return the newest one."""
+        previous_time = self.buffer.newest_time
+        try:
+            window = self._window_size()
+            data = await self.client.async_get_data(
+                window,
+                self._wanted_fields(),
+                self._record_limit(window),
+                budget=self.scheduler.interval.total_seconds() * RETRY_BUDGET_FRACTION,
+            )
+        except Exception as err:
+            raise UpdateFailed(f"Error fetching data: {err}") from err
+
+        if data is None and self._newest is not None:
+            # Nothing new on the server since the last poll.
+            return self._newest
+
+        # The API returns a list of records, newest first.
+        records = data if isinstance(data, list) else [data or {}]
+        added = self.buffer.add(records)
+        if added and previous_time is not None and len(added) == len(records):
+            _LOGGER.debug(
+                "No overlap with the buffered records, records since %s may be missing",
+                previous_time,
+            )
+
+        if (newest := self.buffer.newest) is None:
+            raise UpdateFailed("No records returned")
+        if newest is self._newest:
+            return newest
+
+        self._add_history(added, newest)
+        return newest
+
+    @callback
+    def _add_history(self, added: list[dict], newest: dict) -> None:
+        """Feed new records to the derived metrics, exporter and statistics backfill."""
+        self.derived.add(added)
+        if self.exporter is not None:
+            self.exporter.async_export(added)
+        self._backfill.extend(record for record in added if record is not newest)
+        self._async_flush_backfill()
+
+    @callback
+    def async_enable_backfill(self) -> None:
+        """Start importing backfilled records once the entities are registered."""
+        self._backfill_enabled = True
+        self._async_flush_backfill()
+
+    @callback
+    def _async_flush_backfill(self) -> None:
+        """Import pending backfilled records into the recorder's statistics."""
+        if not self._backfill_enabled or not self._backfill:
+            return
+        backfill, self._backfill = self._backfill, []
+        if self.config_entry is None or "recorder" not in self.hass.config.components:
+            return
+        self.config_entry.async_create_task(
+            self.hass,
+            async_import_backfill(
+                self.hass,
+                self.config_entry.entry_id,
+                backfill,
+                list(self.buffer),
+                self.normalizer.normalize,
+                self.buffer.cadence,
+            ),
+        )
@@ -0,0 +1,314 @@
+"""Rolling statistics computed locally from the station's records."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable, Mapping
+from datetime import datetime, timedelta
+import math
+import re
+from typing import TYPE_CHECKING, NamedTuple
+
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.const import DEGREE, UnitOfLength, UnitOfVolumetricFlux
+
+from .buffer import parse_record_time
+from .descriptors import SensorDescriptor, describe_sensor_key
+
+if TYPE_CHECKING:
+    from .normalize import RecordNormalizer
+
+# Sources whose mean is taken on the circle rather than on the line.
+CIRCULAR_QUANTITIES = frozenset({"winddir", "wnddirm"})
+
+STATISTICS = {
+    "mean": "Mean",
+    "sum": "Sum",
+    "min": "Min",
+    "max": "Max",
+    "change": "Change",
+    "rate": "Rate",
+}
+
+# One metric per entry, "<source key>:<statistic>:<window in minutes>", separated
+# by commas or new lines, e.g. "presqnh_01mnavg:change:180, rainfal_01mnacc:rate:30".
+METRIC_PATTERN = re.compile(r"^(?P<source>[a-z0-9_]+):(?P<statistic>[a-z]+):(?P<minutes>\d+)$")
+
+HOUR = timedelta(hours=1)
+
+# Statistics that are differences of readings rather than readings themselves.
+INTERVAL_STATISTICS = frozenset({"sum", "change", "rate"})
+
+# Volumetric flux units of a rate of precipitation, by the unit of the amount.
+_INTENSITY_UNITS = {
+    UnitOfLength.MILLIMETERS: UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR,
+    UnitOfLength.INCHES: UnitOfVolumetricFlux.INCHES_PER_HOUR,
+}
+
+
+class DerivedMetric(NamedTuple):
+    """A rolling statistic of one record key over a trailing time window."""
+
+    source: str
+    statistic: str
+    window: timedelta
+
+    @property
+    def key(self) -> str:
+        """Return the key the metric is published under."""
+        return f"{self.source}_{self.statistic}_{self.window // timedelta(minutes=1)}m"
+
+    @property
+    def circular(self) -> bool:
+        """Return whether the source is an angle."""
+        source = describe_sensor_key(self.source)
+        return source.quantity in CIRCULAR_QUANTITIES or source.statistic == "dir"
+
+    def descriptor(self, source: SensorDescriptor | None = None) -> SensorDescriptor:
+        """Return the sensor description of the metric, based on its source's.
+
+        source is the description of the source sensor, in the unit it is
+        published in; by default the station's native one.
+        """
+        if source is None:
+            source = describe_sensor_key(self.source)
+        minutes = self.window // timedelta(minutes=1)
+        window = f"{minutes // 60}-hr" if minutes % 60 == 0 else f"{minutes}-min"
+        name = f"{source.name} {STATISTICS[self.statistic]} ({window})"
+
+        if self.statistic == "mean" and self.circular:
+            return SensorDescriptor(self.key, name, source.quantity, self.window, "dir", "wind_direction", DEGREE)
+        if self.statistic == "rate":
+            if (intensity := _INTENSITY_UNITS.get(source.unit)) is not None:
+                return SensorDescriptor(
+                    self.key, name, source.quantity, self.window, self.statistic,
+                    "precipitation_intensity", intensity, SensorStateClass.MEASUREMENT,
+                )
+            unit = f"{source.unit}/h" if source.unit else None
+            return SensorDescriptor(self.key, name, source.quantity, self.window, self.statistic, None, unit, SensorStateClass.MEASUREMENT)
+        device_class = source.device_class
+        if self.statistic in INTERVAL_STATISTICS and device_class == "temperature":
+            # A difference of temperatures is not a temperature: Home Assistant
+            # would convert it with the offset.
+            device_class = None
+        return SensorDescriptor(
+            self.key, name, source.quantity, self.window, self.statistic,
+            device_class, source.unit, SensorStateClass.MEASUREMENT if source.unit else None,
+        )
+
+    def converter(self, normalizer: RecordNormalizer) -> Callable[[float], float] | None:
+        """Return what converts a value of the metric to the unit of its source sensor."""
+        if self.statistic == "mean" and self.circular:
+            return None
+        if self.statistic in INTERVAL_STATISTICS:
+            return lambda value: normalizer.convert_step(self.source, value)
+        return lambda value: normalizer.convert_value(self.source, value)
+
+
+def parse_metrics(text: str | None) -> list[DerivedMetric]:
+    """Parse the derived sensors option, raising ValueError on a bad entry."""
+    metrics = []
+    for entry in re.split(r"[,\n]", text or ""):
+        if not (entry := entry.strip()):
+            continue
+        if (match := METRIC_PATTERN.match(entry.lower())) is None:
+            raise ValueError(f"Invalid derived sensor: {entry}")
+        statistic = match.group("statistic")
+        minutes = int(match.group("minutes"))
+        if statistic not in STATISTICS or minutes < 1:
+            raise ValueError(f"Invalid derived sensor: {entry}")
+        metric = DerivedMetric(match.group("source"), statistic, timedelta(minutes=minutes))
+        if metric not in metrics:
+            metrics.append(metric)
+    return metrics
+
+
+class RollingWindow:
+    """Sum, count, min, max and first value of a trailing time window.
+
+    Every reading is pushed and evicted exactly once, and the min and max are
+    kept in monotonic deques, so each update costs O(1) amortized.
+    """
+
+    def __init__(self, window: timedelta) -> None:
+        """Initialize."""
+        self.window = window
+        self._readings: deque[tuple[datetime, float]] = deque()
+        self._minima: deque[tuple[datetime, float]] = deque()
+        self._maxima: deque[tuple[datetime, float]] = deque()
+        self.sum = 0.0
+        self.earliest: datetime | None = None
+        self.latest: datetime | None = None
+
+    def __len__(self) -> int:
+        """Return the number of readings in the window."""
+        return len(self._readings)
+
+    def push(self, when: datetime, value: float | None) -> None:
+        """Add a reading and evict those that fell out of the window."""
+        if self.earliest is None:
+            self.earliest = when
+        self.latest = when
+        if value is not None:
+            self._readings.append((when, value))
+            self.sum += value
+            while self._minima and self._minima[-1][1] >= value:
+                self._minima.pop()
+            self._minima.append((when, value))
+            while self._maxima and self._maxima[-1][1] <= value:
+                self._maxima.pop()
+            self._maxima.append((when, value))
+
+        start = when - self.window
+        readings = self._readings
+        while readings and readings[0][0] <= start:
+            self.sum -= readings.popleft()[1]
+        if not readings:
+            # Nothing left to subtract from, so drop any rounding error.
+            self.sum = 0.0
+        while self._minima and self._minima[0][0] <= start:
+            self._minima.popleft()
+        while self._maxima and self._maxima[0][0] <= start:
+            self._maxima.popleft()
+
+    @property
+    def covered(self) -> bool:
+        """Return whether records reach back to the start of the window."""
+        return self.latest is not None and self.latest - self.earliest >= self.window
+
+    @property
+    def first(self) -> float | None:
+        """Return the oldest reading in the window."""
+        return self._readings[0][1] if self._readings else None
+
+    @property
+    def last(self) -> float | None:
+        """Return the newest reading in the window."""
+        return self._readings[-1][1] if self._readings else None
+
+    @property
+    def min(self) -> float | None:
+        """Return the smallest reading in the window."""
+        return self._minima[0][1] if self._minima else None
+
+    @property
+    def max(self) -> float | None:
+        """Return the largest reading in the window."""
+        return self._maxima[0][1] if self._maxima else None
+
+
+class _Accumulator:
+    """The rolling windows one metric is computed from."""
+
+    def __init__(self, metric: DerivedMetric) -> None:
+        """Initialize."""
+        self.metric = metric
+        self.circular = metric.statistic == "mean" and metric.circular
+        if self.circular:
+            # Angles are averaged as unit vectors.
+            self.windows = (RollingWindow(metric.window), RollingWindow(metric.window))
+        else:
+            self.windows = (RollingWindow(metric.window),)
+
+    def push(self, when: datetime, value) -> None:
+        """Add a reading of the source key."""
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            value = None
+        if self.circular:
+            radians = None if value is None else math.radians(value)
+            self.windows[0].push(when, None if radians is None else math.sin(radians))
+            self.windows[1].push(when, None if radians is None else math.cos(radians))
+        else:
+            self.windows[0].push(when, value)
+
+    def value(self) -> float | None:
+        """Return the statistic over the current window.
+
+        Until the records reach back a whole window the statistic is unknown,
+        rather than that of the shorter span they cover.
+        """
+        window = self.windows[0]
+        if not window.covered or not len(window):
+            return None
+        statistic = self.metric.statistic
+        if self.circular:
+            sines, cosines = self.windows
+            if math.isclose(sines.sum, 0, abs_tol=1e-9) and math.isclose(cosines.sum, 0, abs_tol=1e-9):
+                # Opposite directions cancel out: there is no mean direction.
+                return None
+            return round(math.degrees(math.atan2(sines.sum, cosines.sum)) % 360, 1)
+        if statistic == "mean":
+            return round(window.sum / len(window), 3)
+        if statistic == "sum":
+            return round(window.sum, 3)
+        if statistic == "min":
+            return window.min
+        if statistic == "max":
+            return window.max
+        if statistic == "change":
+            return round(window.last - window.first, 3)
+        # rate: the window's sum per hour.
+        return round(window.sum * (HOUR / self.metric.window), 3)
+
+
+class DerivedEngine:
+    """Compute every configured derived metric incrementally as records arrive.
+
+    Metrics are computed from the station's native readings; with a normalizer
+    they are published in the units of their source sensors.
+    """
+
+    def __init__(
+        self,
+        metrics: Iterable[DerivedMetric] = (),
+        normalizer: RecordNormalizer | None = None,
+    ) -> None:
+        """Initialize."""
+        self._accumulators = [_Accumulator(metric) for metric in metrics]
+        self.metrics = [accumulator.metric for accumulator in self._accumulators]
+        # Keys the metrics read, which history records must keep.
+        self.sources = frozenset(metric.source for metric in self.metrics)
+        if normalizer is None:
+            self.descriptors = {metric.key: metric.descriptor() for metric in self.metrics}
+            self._converters = {}
+        else:
+            self.descriptors = {
+                metric.key: metric.descriptor(normalizer.describe(metric.source))
+                for metric in self.metrics
+            }
+            self._converters = {
+                metric.key: converter
+                for metric in self.metrics
+                if (converter := metric.converter(normalizer)) is not None
+            }
+        self._latest: datetime | None = None
+        self._values: dict[str, float | None] = {}
+
+    def add(self, records: Iterable[Mapping]) -> None:
+        """Feed new records, oldest first.
+
+        Records older than the newest one already seen are skipped, since the
+        windows only move forward.
+        """
+        if not self._accumulators:
+            return
+        for record in records:
+            when = parse_record_time(record)
+            if when is None or (self._latest is not None and when <= self._latest):
+                continue
+            self._latest = when
+            for accumulator in self._accumulators:
+                accumulator.push(when, record.get(accumulator.metric.source))
+        values = {
+            accumulator.metric.key: accumulator.value()
+            for accumulator in self._accumulators
+        }
+        for key, convert in self._converters.items():
+            if (value := values[key]) is not None:
+                values[key] = round(convert(value), 3)
+        self._values = values
+
+    def merge(self, record: Mapping) -> Mapping:
+        """Return record with the current metric values added to it."""
+        if not self._accumulators:
+            return record
+        return {**record, **self._values}
@@ -0,0 +1,247 @@
+"""Parse WSWR record keys into sensor descriptors."""
+from collections.abc import Mapping
+from datetime import timedelta
+from functools import cache
+import re
+from typing import NamedTuple
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import (
+    DEGREE,
+    PERCENTAGE,
+    UnitOfElectricPotential,
+    UnitOfIrradiance,
+    UnitOfLength,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+)
+
+from .const import SENSOR_DEADBANDS, SENSOR_NAME_MAPPING
+
+# <7-char quantity>_<period><unit><stat>, e.g. airtemp_01mnavg or windcw__10mnmax.
+KEY_PATTERN = re.compile(
+    r"^(?P<quantity>[a-z0-9_]{7})_(?P<period>\d{2}|xx)(?P<unit>mn|hr|dy)(?P<stat>[a-z]{3})$"
+)
+
+WINDOW_UNITS = {
+    "mn": (timedelta(minutes=1), "min"),
+    "hr": (timedelta(hours=1), "hr"),
+    "dy": (timedelta(days=1), "day"),
+}
+
+STATISTIC_NAMES = {
+    "avg": "Avg",
+    "max": "Max",
+    "min": "Min",
+    "acc": "Accum",
+}
+
+
+class QuantityRule(NamedTuple):
+    """How the readings of one quantity are exposed."""
+
+    label: str
+    device_class: str | None
+    unit: str | None
+    state_class: str | None
+
+
+_TEMPERATURE = (SensorDeviceClass.TEMPERATURE, UnitOfTemperature.CELSIUS, SensorStateClass.MEASUREMENT)
+_PRESSURE = (SensorDeviceClass.PRESSURE, UnitOfPressure.HPA, SensorStateClass.MEASUREMENT)
+_WIND_SPEED = ("wind_speed", UnitOfSpeed.KNOTS, SensorStateClass.MEASUREMENT)
+_WIND_DIRECTION = ("wind_direction", DEGREE, None)
+
+QUANTITY_RULES: dict[str, QuantityRule] = {
+    "airtemp": QuantityRule("Air Temperature", *_TEMPERATURE),
+    "dewtemp": QuantityRule("Dew Point", *_TEMPERATURE),
+    "presqfe": QuantityRule("Station Pressure QFE", *_PRESSURE),
+    "presqnh": QuantityRule("Sea-Level Pressure QNH", *_PRESSURE),
+    "presmsl": QuantityRule("Pressure MSL", *_PRESSURE),
+    "pressen": QuantityRule("Pressure", *_PRESSURE),
+    "relhumd": QuantityRule("Relative Humidity", SensorDeviceClass.HUMIDITY, PERCENTAGE, SensorStateClass.MEASUREMENT),
+    "rainfal": QuantityRule("Rainfall", "precipitation", UnitOfLength.MILLIMETERS, SensorStateClass.MEASUREMENT),
+    "windspd": QuantityRule("Wind Speed", *_WIND_SPEED),
+    "windgst": QuantityRule("Wind Gust", *_WIND_SPEED),
+    "windlul": QuantityRule("Wind Lull", *_WIND_SPEED),
+    "windcw_": QuantityRule("Wind CW", *_WIND_SPEED),
+    "windccw": QuantityRule("Wind CCW", *_WIND_SPEED),
+    "wndcwm_": QuantityRule("Wind CW Mean", *_WIND_SPEED),
+    "wndccwm": QuantityRule("Wind CCW Mean", *_WIND_SPEED),
+    "wndgstm": QuantityRule("Wind Gust Mean", *_WIND_SPEED),
+    "winddir": QuantityRule("Wind Direction", *_WIND_DIRECTION),
+    "wnddirm": QuantityRule("Wind Dir Mean", *_WIND_DIRECTION),
+    "windrun": QuantityRule("Wind Run", "distance", UnitOfLength.KILOMETERS, SensorStateClass.TOTAL_INCREASING),
+    "solradn": QuantityRule("Solar Radiation", "irradiance", UnitOfIrradiance.WATTS_PER_SQUARE_METER, SensorStateClass.MEASUREMENT),
+    "power_v": QuantityRule("Power Voltage", SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT, SensorStateClass.MEASUREMENT),
+}
+
+# Rarely used variants, whose sensors can be created disabled by default: the
+# running means of the wind readings and the 10-minute duplicates of 1-minute keys.
+LONG_TAIL_QUANTITIES = frozenset({"wndcwm_", "wndccwm", "wndgstm", "wnddirm"})
+LONG_TAIL_WINDOW = timedelta(minutes=10)
+
+# Sensors are selected, and their publishing throttled, by quantity and by the
+# unit of their averaging window. Quantities without a rule are grouped as
+# "other"; keys without a window count as minute-level.
+OTHER_QUANTITY = "other"
+WINDOW_GROUPS = {"mn": "Minute windows", "hr": "Hour windows", "dy": "Day windows"}
+
+# Station housekeeping readings and unknown quantities are left out unless selected.
+DEFAULT_QUANTITIES = tuple(quantity for quantity in QUANTITY_RULES if quantity != "power_v")
+DEFAULT_WINDOWS = tuple(WINDOW_GROUPS)
+
+
+class SensorDescriptor(NamedTuple):
+    """Structured description of a WSWR record key."""
+
+    key: str
+    name: str
+    quantity: str | None = None
+    window: timedelta | None = None
+    statistic: str | None = None
+    device_class: str | None = None
+    unit: str | None = None
+    state_class: str | None = None
+
+    def properties(self) -> dict:
+        """Return the device_class/unit/state_class that apply to this key."""
+        properties = {}
+        if self.device_class is not None:
+            properties["device_class"] = self.device_class
+        if self.unit is not None:
+            properties["unit"] = self.unit
+        if self.state_class is not None:
+            properties["state_class"] = self.state_class
+        return properties
+
+    @property
+    def long_tail(self) -> bool:
+        """Return whether the key is one of the rarely used variants."""
+        return self.quantity in LONG_TAIL_QUANTITIES or self.window == LONG_TAIL_WINDOW
+
+    @property
+    def quantity_group(self) -> str:
+        """Return the quantity the key is selected by."""
+        return self.quantity if self.quantity in QUANTITY_RULES else OTHER_QUANTITY
+
+    @property
+    def window_group(self) -> str:
+        """Return the window unit the key is selected and throttled by."""
+        if self.window is None or self.window < timedelta(hours=1):
+            return "mn"
+        if self.window < timedelta(days=1):
+            return "hr"
+        return "dy"
+
+
+class SensorSelection(NamedTuple):
+    """The sensor groups chosen in the options."""
+
+    quantities: frozenset[str]
+    windows: frozenset[str]
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "SensorSelection":
+        """Read the selection from an entry's data and options."""
+        return cls(
+            frozenset(config.get("quantities", DEFAULT_QUANTITIES)),
+            frozenset(config.get("windows", DEFAULT_WINDOWS)),
+        )
+
+    def includes(self, descriptor: SensorDescriptor) -> bool:
+        """Return whether the key's sensor is selected."""
+        return (
+            descriptor.quantity_group in self.quantities
+            and descriptor.window_group in self.windows
+        )
+
+
+def publish_intervals(config: Mapping) -> dict[str, int]:
+    """Return the minimum seconds between publishes of each throttled window group."""
+    return {
+        group: seconds
+        for group in WINDOW_GROUPS
+        if (seconds := config.get(f"publish_interval_{group}"))
+    }
+
+
+def parse_deadbands(text: str) -> dict[str, float]:
+    """Parse the sensor deadbands option, raising ValueError on a bad entry.
+
+    One deadband per entry, "<key>:<step>", separated by commas or new lines.
+    """
+    deadbands = {}
+    for entry in re.split(r"[,\n]", text):
+        if not (entry := entry.strip()):
+            continue
+        key, _, step = entry.partition(":")
+        try:
+            value = float(step)
+        except ValueError:
+            raise ValueError(f"Invalid deadband: {entry}") from None
+        if not (key := key.strip().lower()) or not 0 < value < float("inf"):
+            raise ValueError(f"Invalid deadband: {entry}")
+        deadbands[key] = value
+    return deadbands
+
+
+def format_deadbands(deadbands: Mapping[str, float]) -> str:
+    """Return deadbands as the text of the sensor deadbands option."""
+    return ", ".join(f"{key}:{step:g}" for key, step in deadbands.items())
+
+
+def sensor_deadbands(config: Mapping) -> dict[str, float]:
+    """Return the configured per-key deadbands, or the default ones if unset."""
+    if (text := config.get("sensor_deadbands")) is None:
+        return dict(SENSOR_DEADBANDS)
+    return parse_deadbands(text)
+
+
+def _generated_name(rule: QuantityRule | None, quantity: str, period: str, unit: str, stat: str) -> str:
+    """Build a friendly name such as "Air Temperature (1-min Avg)"."""
+    label = rule.label if rule else quantity.rstrip("_").upper()
+    window = f"{int(period) if period.isdigit() else 1}-{WINDOW_UNITS[unit][1]}"
+    if stat == "dir":
+        return f"{label} Direction ({window})"
+    if stat == "tim":
+        return f"{label} Time ({window})"
+    if stat == "chg":
+        return f"{label} Change ({window})"
+    return f"{label} ({window} {STATISTIC_NAMES.get(stat, stat.title())})"
+
+
+@cache
+def describe_sensor_key(sensor_key: str) -> SensorDescriptor:
+    """Parse a record key into a descriptor, once per key."""
+    key = sensor_key.lower()
+    if (match := KEY_PATTERN.match(key)) is None:
+        # Keys outside the grammar only get a name, unless a quantity prefix matches.
+        rule = QUANTITY_RULES.get(key[:7])
+        name = SENSOR_NAME_MAPPING.get(sensor_key, f"Weather Station {sensor_key}")
+        if rule is None:
+            return SensorDescriptor(sensor_key, name)
+        return SensorDescriptor(
+            sensor_key, name, key[:7], None, None, rule.device_class, rule.unit, rule.state_class
+        )
+
+    quantity, period, unit, stat = match.group("quantity", "period", "unit", "stat")
+    rule = QUANTITY_RULES.get(quantity)
+    window = WINDOW_UNITS[unit][0] * (int(period) if period.isdigit() else 1)
+    name = SENSOR_NAME_MAPPING.get(sensor_key) or _generated_name(rule, quantity, period, unit, stat)
+
+    if stat == "tim":
+        # Event times are parsed into datetimes when records are normalised.
+        return SensorDescriptor(sensor_key, name, quantity, window, stat, SensorDeviceClass.TIMESTAMP)
+    if rule is None:
+        # Unknown quantities are exposed as plain values.
+        return SensorDescriptor(sensor_key, name, quantity, window, stat)
+    if stat == "dir":
+        return SensorDescriptor(sensor_key, name, quantity, window, stat, *_WIND_DIRECTION)
+
+    state_class = rule.state_class
+    if quantity == "rainfal" and stat == "acc":
+        state_class = SensorStateClass.TOTAL_INCREASING
+    return SensorDescriptor(
+        sensor_key, name, quantity, window, stat, rule.device_class, rule.unit, state_class
+    )
@@ -0,0 +1,74 @@
+"""Diagnostics support for the WSWR Weather Station integration."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import WeatherStationCoordinator
+from .hub import async_get_hub
+
+# The endpoints may carry an access token in their path or query, and anyone
+# knowing the webhook id can push records; so may the export sink's URL.
+TO_REDACT = {"api_url", "fallback_urls", "export_target", CONF_WEBHOOK_ID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: WeatherStationCoordinator = hass.data[DOMAIN][entry.entry_id][
+        "coordinator"
+    ]
+    scheduler = coordinator.scheduler
+    buffer = coordinator.buffer
+    hub = async_get_hub(hass)
+    exporter = coordinator.exporter
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval_s": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None,
+            "skipped_cycles": coordinator.skipped_cycles,
+            "stale": coordinator.stale,
+            "keys": len(coordinator.data or {}),
+            "listeners": len(coordinator._listeners),
+        },
+        "scheduler": {
+            "interval_s": scheduler.interval.total_seconds(),
+            "phase_s": scheduler.phase.total_seconds(),
+            "lag_s": scheduler.lag.total_seconds(),
+            "failures": scheduler.failures,
+            "misses": scheduler.misses,
+        },
+        "buffer": {
+            "records": len(buffer),
+            "newest_time": buffer.newest_time.isoformat() if buffer.newest_time else None,
+            "cadence_s": buffer.cadence.total_seconds() if buffer.cadence else None,
+        },
+        "client": asdict(coordinator.client.stats),
+        # In configured order, the primary endpoint first.
+        "endpoints": [
+            {"circuit": endpoint.breaker.state, "failures": endpoint.breaker.failures}
+            for endpoint in coordinator.client.endpoints
+        ],
+        "polls": coordinator.stats.as_dict(),
+        "export": asdict(exporter.stats) | {"queued": exporter.queue.qsize()}
+        if exporter is not None
+        else None,
+        "hub": {
+            "stations": len(hub.coordinators),
+            "sessions": len(hub.sessions),
+        },
+    }
@@ -0,0 +1,270 @@
+"""Export the record stream to a time-series sink, in batches."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Mapping
+from contextlib import suppress
+import csv
+from dataclasses import dataclass
+from io import StringIO
+import logging
+import math
+
+import aiohttp
+from aiohttp import hdrs
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .buffer import parse_record_time
+from .const import DOMAIN
+from .records import IDENTITY_KEYS
+
+_LOGGER = logging.getLogger(__name__)
+
+LINE_PROTOCOL = "line_protocol"
+CSV = "csv"
+EXPORT_FORMATS = {LINE_PROTOCOL: "InfluxDB line protocol", CSV: "CSV"}
+
+CONTENT_TYPES = {LINE_PROTOCOL: "text/plain; charset=utf-8", CSV: "text/csv"}
+
+# Measurement name of line protocol rows.
+MEASUREMENT = "wswr"
+
+# A batch is written once it has this many records, or this many seconds after
+# its first record arrived, whichever comes first.
+EXPORT_BATCH_SIZE = 60
+EXPORT_FLUSH_INTERVAL = 10
+
+# Records waiting for the sink; past this, the oldest are dropped.
+EXPORT_QUEUE_SIZE = 1440
+
+# Seconds an HTTP sink has to accept a batch.
+EXPORT_TIMEOUT = 10
+
+
+def is_url(target: str) -> bool:
+    """Return whether an export target is an HTTP sink rather than a file."""
+    return target.startswith(("http://", "https://"))
+
+
+def _escape(text: str) -> str:
+    """Escape a line protocol tag value or field key."""
+    return (
+        text.replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+    )
+
+
+def _field_value(value) -> str | None:
+    """Return a line protocol field value, or None for a missing reading.
+
+    Numbers are always written as floats, so a field never changes type when a
+    reading happens to be whole.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return repr(float(value)) if math.isfinite(value) else None
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def render_line_protocol(records: Iterable[Mapping], station: str) -> str:
+    """Return records as line protocol, one line per record."""
+    tags = f"{MEASUREMENT},station={_escape(station)}"
+    lines = []
+    for record in records:
+        if (record_time := parse_record_time(record)) is None:
+            continue
+        fields = ",".join(
+            f"{_escape(key)}={field}"
+            for key, value in record.items()
+            if key not in IDENTITY_KEYS and (field := _field_value(value)) is not None
+        )
+        if fields:
+            # Nanoseconds, as the sink expects by default.
+            lines.append(f"{tags} {fields} {round(record_time.timestamp()) * 10**9}")
+    return "".join(f"{line}\n" for line in lines)
+
+
+def render_csv(
+    records: Iterable[Mapping], station: str, columns: tuple[str, ...] | None = None
+) -> tuple[str, tuple[str, ...] | None]:
+    """Return records as CSV rows, and the columns of the last one.
+
+    A header row goes before the first row and wherever the keys change, unless
+    columns says which header the rows continue.
+    """
+    output = StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    for record in records:
+        if (record_time := parse_record_time(record)) is None:
+            continue
+        keys = tuple(key for key in record if key not in IDENTITY_KEYS)
+        if keys != columns:
+            columns = keys
+            writer.writerow(("time", "station", *keys))
+        values = ("" if (value := record[key]) is None else value for key in keys)
+        writer.writerow((record_time.isoformat(), station, *values))
+    return output.getvalue(), columns
+
+
+def _last_columns(path: str) -> tuple[str, ...] | None:
+    """Return the columns of the last header row of a CSV file, if it has one."""
+    columns = None
+    try:
+        with open(path, encoding="utf-8", newline="") as file:
+            for line in file:
+                if line.startswith("time,station"):
+                    columns = tuple(next(csv.reader([line]))[2:])
+    except FileNotFoundError:
+        return None
+    return columns
+
+
+def _append(path: str, text: str) -> None:
+    """Append text to a file, creating it if needed."""
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(text)
+
+
+@dataclass
+class ExportStats:
+    """Counters of an exporter."""
+
+    rows: int = 0
+    batches: int = 0
+    failures: int = 0
+    # Records dropped because the queue was full or their batch failed.
+    dropped: int = 0
+
+
+class RecordExporter:
+    """Write each new record as one row to a file or an HTTP sink, in batches.
+
+    Records are queued as they arrive and a single writer task appends them in
+    batches, so the event loop and the poll never wait on the sink. The queue is
+    bounded: while the sink falls behind the oldest records are dropped, and
+    counted, instead of holding back the poll.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        target: str,
+        export_format: str,
+        station: str,
+        batch_size: int = EXPORT_BATCH_SIZE,
+        flush_interval: float = EXPORT_FLUSH_INTERVAL,
+        queue_size: int = EXPORT_QUEUE_SIZE,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.target = target
+        self.export_format = export_format
+        self.station = station
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[Mapping] = asyncio.Queue(queue_size)
+        self.stats = ExportStats()
+        self._session = async_get_clientsession(hass) if is_url(target) else None
+        # The batch being gathered, kept here so stopping still writes it.
+        self._batch: list[Mapping] = []
+        # Columns the last CSV row written to the file was under, read from the
+        # file before the first write so a restart does not repeat the header.
+        self._columns: tuple[str, ...] | None = None
+        self._columns_read = False
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_start(self, entry: ConfigEntry) -> None:
+        """Start writing batches."""
+        self._task = entry.async_create_background_task(
+            self.hass, self._async_run(), f"{DOMAIN} export {entry.entry_id}"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop writing, after writing what was queued."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        while not self.queue.empty():
+            self._batch.append(self.queue.get_nowait())
+        await self._async_flush()
+
+    @callback
+    def async_export(self, records: Iterable[Mapping]) -> None:
+        """Queue records, oldest first, dropping the oldest queued ones if full."""
+        queue = self.queue
+        for record in records:
+            if queue.full():
+                queue.get_nowait()
+                self.stats.dropped += 1
+            queue.put_nowait(record)
+
+    async def _async_run(self) -> None:
+        """Gather records into batches and write them."""
+        queue = self.queue
+        batch = self._batch
+        while True:
+            batch.append(await queue.get())
+            # Wait for a full batch, but no longer than the flush interval.
+            with suppress(TimeoutError):
+                async with asyncio.timeout(self.flush_interval):
+                    while len(batch) < self.batch_size:
+                        batch.append(await queue.get())
+            await self._async_flush()
+
+    async def _async_flush(self) -> None:
+        """Write the gathered batch to the sink.
+
+        A batch whose write is cancelled, when the entry unloads, is dropped
+        rather than written again, since it may have reached the sink already.
+        """
+        if not (batch := self._batch):
+            return
+        try:
+            await self._async_write(batch)
+        except asyncio.CancelledError:
+            self.stats.dropped += len(batch)
+            batch.clear()
+            raise
+        except (aiohttp.ClientError, TimeoutError, OSError) as err:
+            self.stats.failures += 1
+            self.stats.dropped += len(batch)
+            _LOGGER.warning("Could not export %s records: %s", len(batch), err)
+        else:
+            self.stats.rows += len(batch)
+            self.stats.batches += 1
+        batch.clear()
+
+    async def _async_write(self, batch: list[Mapping]) -> None:
+        """Render a batch and append it to the sink in one write."""
+        if self.export_format == CSV:
+            if self._session is None and not self._columns_read:
+                self._columns = await self.hass.async_add_executor_job(
+                    _last_columns, self.target
+                )
+                self._columns_read = True
+            # Every request to an HTTP sink carries its own header.
+            columns = None if self._session is not None else self._columns
+            body, columns = render_csv(batch, self.station, columns)
+        else:
+            body = render_line_protocol(batch, self.station)
+        if not body:
+            return
+        if self._session is None:
+            await self.hass.async_add_executor_job(_append, self.target, body)
+            if self.export_format == CSV:
+                self._columns = columns
+            return
+        async with self._session.post(
+            self.target,
+            data=body.encode(),
+            headers={hdrs.CONTENT_TYPE: CONTENT_TYPES[self.export_format]},
+            timeout=aiohttp.ClientTimeout(total=EXPORT_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
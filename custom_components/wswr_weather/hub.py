@@ -0,0 +1,179 @@
+"""Domain-wide hub shared by every WSWR Weather Station config entry."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import TYPE_CHECKING
+
+import aiohttp
+from multidict import CIMultiDictProxy
+from yarl import URL
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+from .const import DOMAIN
+from .instrumentation import FetchTiming, create_trace_config
+
+if TYPE_CHECKING:
+    from .coordinator import WeatherStationCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_HUB = "hub"
+
+# Requests in flight across all stations at any one time.
+MAX_CONCURRENT_REQUESTS = 4
+
+# Stations are spread over this fraction of their polling interval.
+STAGGER_FRACTION = 0.5
+
+
+class PooledSession:
+    """A keep-alive session shared by every entry that polls the same host."""
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        """Initialize."""
+        self.session = session
+        self.users = 0
+
+
+@dataclass
+class HubResponse:
+    """The parts of an HTTP response a client needs, shareable between clients."""
+
+    status: int
+    headers: CIMultiDictProxy[str]
+    payload: bytes
+    content_length: int | None
+    timing: FetchTiming | None = None
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> WeatherStationHub:
+    """Return the hub, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (hub := domain_data.get(DATA_HUB)) is None:
+        hub = domain_data[DATA_HUB] = WeatherStationHub(hass)
+    return hub
+
+
+class WeatherStationHub:
+    """Own every station's coordinator and funnel their polls through one pool.
+
+    Requests share a per-host session, run at most MAX_CONCURRENT_REQUESTS at a
+    time, and identical requests in flight are combined into one.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_concurrent: int = MAX_CONCURRENT_REQUESTS
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.sessions: dict[str, PooledSession] = {}
+        self.coordinators: dict[str, WeatherStationCoordinator] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._inflight: dict[tuple, asyncio.Future[HubResponse]] = {}
+
+    @callback
+    def async_acquire_session(self, api_url: str) -> aiohttp.ClientSession:
+        """Return the pooled session for the host of api_url, creating it if needed.
+
+        Sessions are built on Home Assistant's shared connector, so connections and
+        TLS sessions are reused across polls and with the rest of Home Assistant.
+        """
+        host = str(URL(api_url).origin())
+        if (pooled := self.sessions.get(host)) is None:
+            _LOGGER.debug("Creating pooled session for %s", host)
+            pooled = self.sessions[host] = PooledSession(
+                async_create_clientsession(
+                    self.hass, auto_cleanup=False, trace_configs=[create_trace_config()]
+                )
+            )
+        pooled.users += 1
+        return pooled.session
+
+    @callback
+    def async_release_session(self, api_url: str) -> None:
+        """Release a pooled session, detaching it once its last user is gone."""
+        host = str(URL(api_url).origin())
+        pooled = self.sessions[host]
+        pooled.users -= 1
+        if pooled.users <= 0:
+            _LOGGER.debug("Closing pooled session for %s", host)
+            del self.sessions[host]
+            # The connector belongs to Home Assistant, so detach rather than close.
+            pooled.session.detach()
+
+    async def async_request(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: dict[str, str],
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> HubResponse:
+        """GET url through the pool, joining an identical request in flight."""
+        key = (url, tuple(sorted(headers.items())))
+        if (future := self._inflight.get(key)) is not None:
+            return await asyncio.shield(future)
+
+        future = self._inflight[key] = self.hass.loop.create_future()
+        timing = FetchTiming()
+        # Without a timeout of its own, the request keeps the session's.
+        options = {"timeout": timeout} if timeout is not None else {}
+        try:
+            async with self._semaphore:
+                async with session.get(
+                    url,
+                    headers=headers,
+                    trace_request_ctx=timing,
+                    **options,
+                ) as response:
+                    payload = await response.read() if response.status == 200 else b""
+                    timing.total = self.hass.loop.time() - timing.start
+                    result = HubResponse(
+                        response.status,
+                        response.headers,
+                        payload,
+                        response.content_length,
+                        timing,
+                    )
+        except asyncio.CancelledError:
+            # Cancelling the future would cancel every joiner with it, so they
+            # fail this fetch as if it timed out and their owners retry it.
+            future.set_exception(TimeoutError())
+            future.exception()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            # Mark the exception retrieved in case nobody joined this request.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    @callback
+    def async_add_coordinator(
+        self, entry_id: str, coordinator: WeatherStationCoordinator
+    ) -> None:
+        """Register a station and re-spread every station's poll phase."""
+        self.coordinators[entry_id] = coordinator
+        self.async_stagger()
+
+    @callback
+    def async_remove_coordinator(self, entry_id: str) -> None:
+        """Unregister a station."""
+        if self.coordinators.pop(entry_id, None) is not None:
+            self.async_stagger()
+
+    @callback
+    def async_stagger(self) -> None:
+        """Give each station an evenly spaced offset within its interval."""
+        count = len(self.coordinators)
+        for index, coordinator in enumerate(self.coordinators.values()):
+            scheduler = coordinator.scheduler
+            scheduler.phase = scheduler.interval * STAGGER_FRACTION * index / count
@@ -0,0 +1,188 @@
+"""Timings and counters describing how polls perform."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from dataclasses import dataclass, field
+import math
+from types import SimpleNamespace
+
+import aiohttp
+
+# Samples kept per measurement for its percentiles.
+SAMPLE_SIZE = 100
+
+PERCENTILES = (50, 90, 99)
+
+
+def _nearest_rank(ordered: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    return ordered[max(math.ceil(percent / 100 * len(ordered)), 1) - 1]
+
+
+class Samples:
+    """The most recent samples of a measurement."""
+
+    def __init__(self, maxlen: int = SAMPLE_SIZE) -> None:
+        """Initialize."""
+        self._values: deque[float] = deque(maxlen=maxlen)
+        self.last: float | None = None
+
+    def __len__(self) -> int:
+        """Return the number of samples kept."""
+        return len(self._values)
+
+    def add(self, value: float | None) -> None:
+        """Record a sample, ignoring None."""
+        if value is not None:
+            self._values.append(value)
+            self.last = value
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the nearest-rank percentile of the kept samples."""
+        if not self._values:
+            return None
+        return _nearest_rank(sorted(self._values), percent)
+
+    def summary(self, scale: float = 1, digits: int = 1) -> dict[str, float | int | None]:
+        """Return the count, last value, percentiles and max, multiplied by scale."""
+        if not self._values:
+            return {"count": 0}
+        ordered = sorted(self._values)
+        summary: dict[str, float | int | None] = {
+            "count": len(ordered),
+            "last": round(self.last * scale, digits),
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}"] = round(_nearest_rank(ordered, percent) * scale, digits)
+        summary["max"] = round(ordered[-1] * scale, digits)
+        return summary
+
+
+@dataclass
+class FetchTiming:
+    """How long each phase of one request took, in seconds.
+
+    DNS and connect are None when a pooled connection was reused.
+    """
+
+    start: float = 0.0
+    dns: float | None = None
+    connect: float | None = None
+    ttfb: float | None = None
+    total: float | None = None
+    _dns_start: float = field(default=0.0, repr=False)
+    _connect_start: float = field(default=0.0, repr=False)
+
+
+def _now() -> float:
+    """Return the event loop's clock."""
+    return asyncio.get_running_loop().time()
+
+
+async def _on_request_start(session, context: SimpleNamespace, params) -> None:
+    """Note when the request started."""
+    if isinstance(timing := context.trace_request_ctx, FetchTiming):
+        timing.start = _now()
+
+
+async def _on_dns_start(session, context: SimpleNamespace, params) -> None:
+    """Note when the DNS lookup started."""
+    if isinstance(timing := context.trace_request_ctx, FetchTiming):
+        timing._dns_start = _now()
+
+
+async def _on_dns_end(session, context: SimpleNamespace, params) -> None:
+    """Record the DNS lookup time."""
+    if isinstance(timing := context.trace_request_ctx, FetchTiming):
+        timing.dns = _now() - timing._dns_start
+
+
+async def _on_connect_start(session, context: SimpleNamespace, params) -> None:
+    """Note when opening a connection started."""
+    if isinstance(timing := context.trace_request_ctx, FetchTiming):
+        timing._connect_start = _now()
+
+
+async def _on_connect_end(session, context: SimpleNamespace, params) -> None:
+    """Record the time to open the connection."""
+    if isinstance(timing := context.trace_request_ctx, FetchTiming):
+        # Connection setup includes the DNS lookup; report it separately.
+        timing.connect = _now() - timing._connect_start - (timing.dns or 0)
+
+
+async def _on_request_end(session, context: SimpleNamespace, params) -> None:
+    """Record the time to the response headers."""
+    if isinstance(timing := context.trace_request_ctx, FetchTiming):
+        timing.ttfb = _now() - timing.start
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """Return a trace config filling in the FetchTiming passed as trace_request_ctx."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_connection_create_start.append(_on_connect_start)
+    trace_config.on_connection_create_end.append(_on_connect_end)
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+
+class PollStats:
+    """Per-coordinator measurements of fetching, decoding and publishing."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.dns = Samples()
+        self.connect = Samples()
+        self.ttfb = Samples()
+        self.total = Samples()
+        self.payload_bytes = Samples()
+        self.decode = Samples()
+        self.fan_out = Samples()
+        # How long the event loop took to come back to a poll that yielded to it.
+        self.loop_lag = Samples()
+        # Seconds between the newest record's record_time and its arrival.
+        self.record_age: float | None = None
+        # success, unchanged, failure and timeout, and failures by error class.
+        self.outcomes: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+
+    def add_timing(self, timing: FetchTiming | None) -> None:
+        """Record the phases of a request."""
+        if timing is None:
+            return
+        self.dns.add(timing.dns)
+        self.connect.add(timing.connect)
+        self.ttfb.add(timing.ttfb)
+        self.total.add(timing.total)
+
+    def add_error(self, err: BaseException) -> None:
+        """Count a failed poll by its error class."""
+        if isinstance(err, asyncio.TimeoutError):
+            self.outcomes["timeout"] += 1
+        else:
+            self.outcomes["failure"] += 1
+        if (status := getattr(err, "status", None)) is not None:
+            self.errors[f"HTTP {status}"] += 1
+        else:
+            self.errors[type(err).__name__] += 1
+
+    def as_dict(self) -> dict:
+        """Return every measurement, times in milliseconds."""
+        return {
+            "latency_ms": {
+                "dns": self.dns.summary(1000),
+                "connect": self.connect.summary(1000),
+                "ttfb": self.ttfb.summary(1000),
+                "total": self.total.summary(1000),
+            },
+            "payload_bytes": self.payload_bytes.summary(digits=0),
+            "decode_ms": self.decode.summary(1000, 3),
+            "fan_out_ms": self.fan_out.summary(1000, 3),
+            "loop_lag_ms": self.loop_lag.summary(1000, 3),
+            "record_age_s": self.record_age,
+            "outcomes": dict(self.outcomes),
+            "errors": dict(self.errors),
+        }
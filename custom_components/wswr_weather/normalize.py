@@ -0,0 +1,201 @@
+"""Normalise record values into the types and units the sensors publish."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.components.sensor.const import UNIT_CONVERTERS
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_system import UnitSystem
+
+from .buffer import parse_record_time
+from .descriptors import SensorDescriptor, describe_sensor_key
+from .records import SENTINEL_NUMBERS
+
+_LOGGER = logging.getLogger(__name__)
+
+_TEMPERATURE_RANGE = (-90, 60)
+_WIND_SPEED_RANGE = (0, 250)
+_DIRECTION_RANGE = (0, 360)
+
+# Plausible readings of each quantity, in its native unit; anything outside is
+# a fault of the sensor or the logger and is published as unknown.
+VALID_RANGES: dict[str, tuple[float, float]] = {
+    "airtemp": _TEMPERATURE_RANGE,
+    "dewtemp": _TEMPERATURE_RANGE,
+    "presqfe": (500, 1100),
+    "pressen": (500, 1100),
+    "presqnh": (850, 1090),
+    "presmsl": (850, 1090),
+    "relhumd": (0, 100),
+    "rainfal": (0, 5000),
+    "windspd": _WIND_SPEED_RANGE,
+    "windgst": _WIND_SPEED_RANGE,
+    "windlul": _WIND_SPEED_RANGE,
+    "windcw_": _WIND_SPEED_RANGE,
+    "windccw": _WIND_SPEED_RANGE,
+    "wndcwm_": _WIND_SPEED_RANGE,
+    "wndccwm": _WIND_SPEED_RANGE,
+    "wndgstm": _WIND_SPEED_RANGE,
+    "winddir": _DIRECTION_RANGE,
+    "wnddirm": _DIRECTION_RANGE,
+    "windrun": (0, 50000),
+    "solradn": (0, 2000),
+    "power_v": (0, 60),
+}
+
+# Statistics whose values are readings of the quantity itself.
+_READING_STATISTICS = frozenset({"avg", "max", "min", "acc"})
+
+Converter = Callable[[Any, "datetime | None"], Any]
+
+
+def parse_event_time(value, record_time: datetime | None) -> datetime | None:
+    """Return when an event such as a peak gust happened, as an aware UTC datetime.
+
+    Stations report event times as a time of day ("09:42"), which is taken as
+    the latest such time at or before the record's time.
+    """
+    if isinstance(value, datetime):
+        return dt_util.as_utc(value)
+    if not isinstance(value, str):
+        return None
+    if (parsed := dt_util.parse_datetime(value)) is not None:
+        return dt_util.as_utc(parsed)
+    if record_time is None or (time_of_day := dt_util.parse_time(value)) is None:
+        return None
+    local = dt_util.as_local(record_time)
+    event = datetime.combine(local.date(), time_of_day, local.tzinfo)
+    if event > local:
+        event -= timedelta(days=1)
+    return dt_util.as_utc(event)
+
+
+def _record_time(value, record_time: datetime | None) -> datetime | None:
+    """Return the record's own time, parsed once for the whole record."""
+    return record_time
+
+
+def _number(value) -> float | int | None:
+    """Return value as a number, or None if it is not one or is a sentinel."""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if value != value or value in SENTINEL_NUMBERS:
+        return None
+    return value
+
+
+def _numeric_converter(
+    key: str,
+    valid_range: tuple[float, float] | None,
+    convert: Callable[[float], float] | None,
+) -> Converter:
+    """Return a converter coercing to a number, rejecting implausible readings."""
+    low, high = valid_range or (None, None)
+
+    def normalize(value, record_time: datetime | None):
+        if (number := _number(value)) is None:
+            return None
+        if low is not None and not low <= number <= high:
+            _LOGGER.debug("Rejected %s of %s, outside %s..%s", number, key, low, high)
+            return None
+        return number if convert is None else convert(number)
+
+    return normalize
+
+
+def preferred_unit(descriptor: SensorDescriptor, units: UnitSystem) -> str | None:
+    """Return the unit the unit system prefers for a key's values."""
+    if descriptor.unit is None or descriptor.device_class is None:
+        return descriptor.unit
+    if descriptor.device_class == SensorDeviceClass.TEMPERATURE:
+        return units.temperature_unit
+    return units.get_converted_unit(descriptor.device_class, descriptor.unit) or descriptor.unit
+
+
+class RecordNormalizer:
+    """Turn records into published values, with one converter per key.
+
+    Converters are built the first time a key is seen, so each record costs a
+    single pass: numbers are coerced, implausible readings and sentinels become
+    None, event times become datetimes, and readings are scaled to the units the
+    unit system prefers, so Home Assistant has nothing left to convert per state.
+    """
+
+    def __init__(self, units: UnitSystem) -> None:
+        """Initialize."""
+        self.units = units
+        self._converters: dict[str, Converter | None] = {}
+        self._descriptors: dict[str, SensorDescriptor] = {}
+
+    def describe(self, key: str) -> SensorDescriptor:
+        """Return the descriptor of a record key, in the unit its values are published in."""
+        if (descriptor := self._descriptors.get(key)) is None:
+            descriptor = describe_sensor_key(key)
+            if (unit := preferred_unit(descriptor, self.units)) != descriptor.unit:
+                descriptor = descriptor._replace(unit=unit)
+            self._descriptors[key] = descriptor
+        return descriptor
+
+    def convert_value(self, key: str, value: float) -> float:
+        """Return a native value of a key in the unit it is published in."""
+        native = describe_sensor_key(key)
+        if (unit := self.describe(key).unit) == native.unit:
+            return value
+        return UNIT_CONVERTERS[native.device_class].convert(value, native.unit, unit)
+
+    def convert_step(self, key: str, step: float) -> float:
+        """Return a difference between native values of a key, in its published unit."""
+        native = describe_sensor_key(key)
+        if (unit := self.describe(key).unit) == native.unit:
+            return step
+        converter = UNIT_CONVERTERS[native.device_class]
+        if native.device_class == SensorDeviceClass.TEMPERATURE:
+            # A difference of temperatures converts without the offset.
+            return converter.convert_interval(step, native.unit, unit)
+        return converter.convert(step, native.unit, unit)
+
+    def _converter(self, key: str) -> Converter | None:
+        """Build the converter of a key, or None if its values pass as they are."""
+        if key == "record_time":
+            return _record_time
+        native = describe_sensor_key(key)
+        if native.statistic == "tim":
+            return parse_event_time
+        if native.unit is None:
+            return None
+
+        convert = None
+        if (unit := self.describe(key).unit) != native.unit:
+            convert = UNIT_CONVERTERS[native.device_class].converter_factory(
+                native.unit, unit
+            )
+        valid_range = None
+        if native.statistic == "dir":
+            valid_range = _DIRECTION_RANGE
+        elif native.statistic in _READING_STATISTICS:
+            valid_range = VALID_RANGES.get(native.quantity)
+        return _numeric_converter(key, valid_range, convert)
+
+    def normalize(self, record: Mapping) -> dict[str, Any]:
+        """Return the published values of a record."""
+        record_time = parse_record_time(record)
+        converters = self._converters
+        normalized = {}
+        for key, value in record.items():
+            try:
+                converter = converters[key]
+            except KeyError:
+                converter = converters[key] = self._converter(key)
+            normalized[key] = (
+                value if converter is None or value is None else converter(value, record_time)
+            )
+        return normalized
@@ -0,0 +1,60 @@
+"""Accept records pushed by the station, or a relay, to a webhook."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import partial
+from http import HTTPStatus
+import logging
+
+from aiohttp import web
+from aiohttp.hdrs import METH_POST
+
+from homeassistant.components import webhook
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .coordinator import WeatherStationCoordinator
+from .records import decode_records
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def _async_handle_webhook(
+    coordinator: WeatherStationCoordinator,
+    hass: HomeAssistant,
+    webhook_id: str,
+    request: web.Request,
+) -> web.Response:
+    """Publish the records of a POST, shaped like an API payload or one record."""
+    try:
+        records = decode_records(await request.text())
+    except ValueError:
+        return web.Response(status=HTTPStatus.BAD_REQUEST, text="Invalid JSON")
+    if not records:
+        return web.Response(status=HTTPStatus.BAD_REQUEST, text="No records")
+    # Records already seen, e.g. pushed again by a relay, are accepted and ignored.
+    coordinator.async_push(records)
+    return web.Response(status=HTTPStatus.NO_CONTENT)
+
+
+@callback
+def async_register_push(
+    hass: HomeAssistant,
+    webhook_id: str,
+    name: str,
+    coordinator: WeatherStationCoordinator,
+) -> Callable[[], None]:
+    """Accept pushed records for a station, returning a callback to stop."""
+    webhook.async_register(
+        hass,
+        DOMAIN,
+        name,
+        webhook_id,
+        partial(_async_handle_webhook, coordinator),
+        local_only=True,
+        allowed_methods=[METH_POST],
+    )
+    _LOGGER.info(
+        "Accepting pushed records at %s", webhook.async_generate_path(webhook_id)
+    )
+    return partial(webhook.async_unregister, hass, webhook_id)
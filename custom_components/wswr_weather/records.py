@@ -0,0 +1,257 @@
+"""Decode WSWR payloads into compact, typed records."""
+from __future__ import annotations
+
+from collections.abc import (
+    Callable,
+    Collection,
+    ItemsView,
+    Iterator,
+    Mapping,
+)
+from functools import cache, lru_cache
+from json import JSONDecoder
+import math
+from operator import itemgetter
+
+from homeassistant.util.json import json_loads
+
+# Keys that identify a record and are always decoded.
+IDENTITY_KEYS = frozenset({"id", "record_time"})
+
+# String values the station uses for a missing reading.
+MISSING_VALUES = frozenset({"", "-", "--", "---", "n/a", "na", "nan", "null", "none"})
+
+# Numeric values the station uses for a missing reading.
+SENTINEL_NUMBERS = frozenset({-9999, -999.9, 9999})
+
+# Value types that need no coercion outside the text keys.
+_PLAIN_TYPES = frozenset({int, float, str, type(None)})
+
+# NaN and Infinity literals decode to None, as missing readings.
+_DECODER = JSONDecoder(parse_constant=lambda constant: None)
+_WHITESPACE = " \t\r\n"
+_SEPARATORS = _WHITESPACE + ","
+
+
+@cache
+def _is_text_key(key: str) -> bool:
+    """Return whether the values of key are text rather than numbers."""
+    return key == "record_time" or key.endswith("tim")
+
+
+class RecordSchema:
+    """The fixed key order shared by every record with the same keys."""
+
+    __slots__ = ("keys", "index", "text_positions", "_projections")
+
+    def __init__(self, keys: tuple[str, ...]) -> None:
+        """Initialize."""
+        self.keys = keys
+        self.index = {key: position for position, key in enumerate(keys)}
+        self.text_positions = tuple(
+            position for position, key in enumerate(keys) if _is_text_key(key)
+        )
+        self._projections: dict[frozenset[str], tuple[RecordSchema, Callable]] = {}
+
+    def project(self, fields: frozenset[str]) -> tuple[RecordSchema, Callable]:
+        """Return the schema narrowed to fields, and a getter for its values.
+
+        The getter picks the kept values out of a tuple laid out by this schema.
+        Identity keys are always kept.
+        """
+        if (projection := self._projections.get(fields)) is None:
+            positions = [
+                position
+                for position, key in enumerate(self.keys)
+                if key in fields or key in IDENTITY_KEYS
+            ]
+            if len(positions) == 1:
+                (only,) = positions
+                getter = lambda values: (values[only],)  # noqa: E731
+            elif positions:
+                getter = itemgetter(*positions)
+            else:
+                getter = lambda values: ()  # noqa: E731
+            projection = self._projections[fields] = (
+                record_schema(tuple(self.keys[position] for position in positions)),
+                getter,
+            )
+        return projection
+
+
+@lru_cache(maxsize=32)
+def record_schema(keys: tuple[str, ...]) -> RecordSchema:
+    """Return the shared schema for a key order."""
+    return RecordSchema(keys)
+
+
+class _RecordItems(ItemsView):
+    """Items of a record, iterated without a lookup per key."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Iterate over (key, value) pairs in schema order."""
+        return zip(self._mapping.schema.keys, self._mapping.values)
+
+
+class Record(Mapping):
+    """A read-only record storing its values in a tuple laid out by a shared schema.
+
+    Records behave like the dicts they replace, at a fraction of the memory: the
+    keys and their positions live once in the schema instead of in every record.
+    """
+
+    __slots__ = ("schema", "values")
+
+    def __init__(self, schema: RecordSchema, values: tuple) -> None:
+        """Initialize."""
+        self.schema = schema
+        self.values = values
+
+    def __getitem__(self, key: str):
+        """Return the value of key."""
+        return self.values[self.schema.index[key]]
+
+    def get(self, key: str, default=None):
+        """Return the value of key, or default if the record has no such key."""
+        if (position := self.schema.index.get(key)) is None:
+            return default
+        return self.values[position]
+
+    def __contains__(self, key) -> bool:
+        """Return whether the record has key."""
+        return key in self.schema.index
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys in schema order."""
+        return iter(self.schema.keys)
+
+    def __len__(self) -> int:
+        """Return the number of keys."""
+        return len(self.values)
+
+    def items(self) -> ItemsView:
+        """Return the (key, value) pairs."""
+        return _RecordItems(self)
+
+    def __eq__(self, other) -> bool:
+        """Return whether other has the same keys and values."""
+        if isinstance(other, Record) and other.schema is self.schema:
+            return other.values == self.values
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        """Return the record as a dict literal."""
+        return f"Record({dict(self)!r})"
+
+
+def coerce_value(key: str, value):
+    """Return value as a number, None for a missing reading, or text for text keys.
+
+    Identity values are not readings, so they are never missing or sentinels.
+    """
+    if key in IDENTITY_KEYS:
+        return value
+    if isinstance(value, float):
+        if math.isnan(value) or value in SENTINEL_NUMBERS:
+            return None
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return None if value in SENTINEL_NUMBERS else value
+    if not isinstance(value, str):
+        return value
+    if value.strip().lower() in MISSING_VALUES:
+        return None
+    if _is_text_key(key):
+        return value
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if math.isnan(number) or number in SENTINEL_NUMBERS:
+        return None
+    return number
+
+
+def _coerce_values(schema: RecordSchema, values: tuple) -> tuple:
+    """Return values with every value coerced for its key."""
+    types = list(map(type, values))
+    text_positions = schema.text_positions
+    # The common case, numbers everywhere but in the text keys, is checked in bulk.
+    if (
+        _PLAIN_TYPES.issuperset(types)
+        and types.count(str) == len(text_positions)
+        and SENTINEL_NUMBERS.isdisjoint(values)
+        and all(
+            types[position] is str
+            and values[position].strip().lower() not in MISSING_VALUES
+            for position in text_positions
+        )
+    ):
+        return values
+    return tuple([coerce_value(key, value) for key, value in zip(schema.keys, values)])
+
+
+def compact_record(raw: dict, fields: frozenset[str] | None = None) -> Record:
+    """Return raw as a Record, keeping only fields and the identity keys if given."""
+    schema = record_schema(tuple(raw))
+    values = tuple(raw.values())
+    if fields is not None:
+        schema, getter = schema.project(fields)
+        values = getter(values)
+    return Record(schema, _coerce_values(schema, values))
+
+
+def _iter_objects(text: str) -> Iterator[dict]:
+    """Yield the JSON objects of a payload one at a time, without decoding the rest."""
+    position = 0
+    length = len(text)
+    while position < length and text[position] in _WHITESPACE:
+        position += 1
+    if position == length:
+        return
+    if text[position] != "[":
+        yield _DECODER.raw_decode(text, position)[0]
+        return
+
+    position += 1
+    while True:
+        while position < length and text[position] in _SEPARATORS:
+            position += 1
+        if position >= length or text[position] == "]":
+            return
+        raw, position = _DECODER.raw_decode(text, position)
+        yield raw
+
+
+def decode_records(
+    payload: bytes | str,
+    fields: Collection[str] | None = None,
+    limit: int | None = None,
+) -> list[Record]:
+    """Decode a mostrecent payload, newest first, into compact records.
+
+    The newest record keeps every key so keys new to the payload are still seen;
+    older records keep only fields (and id/record_time) when fields is given. With
+    limit, decoding stops after that many records and the rest of the payload is
+    never parsed.
+    """
+    if limit is None:
+        data = json_loads(payload)
+        raws = data if isinstance(data, list) else [data]
+    else:
+        text = payload.decode() if isinstance(payload, bytes) else payload
+        raws = []
+        for raw in _iter_objects(text):
+            raws.append(raw)
+            if len(raws) >= limit:
+                break
+
+    if fields is not None:
+        fields = frozenset(fields)
+    return [
+        compact_record(raw, None if position == 0 else fields)
+        for position, raw in enumerate(raws)
+        if isinstance(raw, dict)
+    ]
@@ -0,0 +1,74 @@
+"""Retry backoff and circuit breaking for API endpoints."""
+from __future__ import annotations
+
+import random
+
+# Consecutive failures that open an endpoint's circuit.
+FAILURE_THRESHOLD = 3
+
+# Seconds an open circuit waits before letting a probe request through.
+RESET_TIMEOUT = 60
+
+# Retry delays start around this many seconds and double up to the cap.
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 10
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = RETRY_BASE_DELAY,
+    cap: float = RETRY_MAX_DELAY,
+    rng: random.Random | None = None,
+) -> float:
+    """Return a random delay before retry attempt (1 for the first retry).
+
+    "Full jitter": uniform between zero and the exponential backoff, so
+    stations that failed together do not retry together.
+    """
+    return (rng or random).uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Stop requesting an endpoint that keeps failing.
+
+    After FAILURE_THRESHOLD consecutive failures the circuit opens and requests
+    are refused until RESET_TIMEOUT has passed; then a single probe is let
+    through, which closes the circuit on success and reopens it on failure.
+    Times are seconds on any monotonic clock, passed in by the caller.
+    """
+
+    def __init__(
+        self, threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT
+    ) -> None:
+        """Initialize."""
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self, now: float) -> bool:
+        """Return whether a request may be sent now."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+            # Let one probe through; until it finishes, others are refused.
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self, now: float) -> None:
+        """Count a failure, opening the circuit when there were too many."""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.state = OPEN
+            self.opened_at = now
@@ -0,0 +1,81 @@
+"""Adaptive poll scheduling aligned to the station's record cadence."""
+from collections import deque
+from datetime import datetime, timedelta
+import math
+
+# Smallest delay between two polls.
+MIN_DELAY = timedelta(seconds=1)
+
+# Polls are planned this long after a record is expected to be published.
+PUBLISH_MARGIN = timedelta(seconds=2)
+
+# Backoff never grows beyond this multiple of the configured interval.
+MAX_BACKOFF_FACTOR = 8
+
+# Smallest retry delay when a poll finds no new record.
+MIN_RETRY = timedelta(seconds=5)
+
+
+class AdaptiveScheduler:
+    """Plan the next poll just after the station is expected to publish.
+
+    The publish lag (how long after its record_time a record becomes available)
+    is learned from the polls that found a new record. Polls that fail or find
+    nothing new back off exponentially.
+    """
+
+    def __init__(self, interval: timedelta) -> None:
+        """Initialize with the configured polling interval."""
+        self.set_interval(interval)
+        # Offset within the interval assigned by the hub to spread stations out.
+        self.phase = timedelta(0)
+        self.failures = 0
+        self.misses = 0
+        self._lags: deque[timedelta] = deque(maxlen=10)
+
+    def set_interval(self, interval: timedelta) -> None:
+        """Change the configured polling interval."""
+        self.interval = interval
+        self.max_interval = interval * MAX_BACKOFF_FACTOR
+
+    @property
+    def lag(self) -> timedelta:
+        """Return the smallest publish lag seen recently."""
+        return min(self._lags, default=timedelta(0))
+
+    def _backoff(self, base: timedelta, attempts: int) -> timedelta:
+        """Return base doubled for every attempt after the first, capped."""
+        return min(base * 2 ** max(attempts - 1, 0), self.max_interval)
+
+    def failed(self) -> timedelta:
+        """Return the delay after a failed poll."""
+        self.failures += 1
+        return self._backoff(self.interval, self.failures)
+
+    def no_new_data(self) -> timedelta:
+        """Return the delay after a poll that found no new record."""
+        self.failures = 0
+        self.misses += 1
+        retry = max(self.interval / 4, MIN_RETRY)
+        return self._backoff(retry, self.misses)
+
+    def new_data(
+        self, now: datetime, newest_time: datetime, cadence: timedelta | None
+    ) -> timedelta:
+        """Return the delay after a poll that found a new record.
+
+        The next poll is placed on the first expected publish time at least one
+        interval away, so polls are never more frequent than the interval or
+        than the station's records.
+        """
+        self.failures = 0
+        self.misses = 0
+        self._lags.append(max(now - newest_time, timedelta(0)))
+        if not cadence:
+            return self.interval
+
+        expected = newest_time + self.lag + PUBLISH_MARGIN + self.phase
+        earliest = now + self.interval - PUBLISH_MARGIN
+        steps = max(1, math.ceil((earliest - expected) / cadence))
+        delay = expected + cadence * steps - now
+        return min(max(delay, MIN_DELAY), self.max_interval)
@@ -1,65 +1,116 @@
 import logging
+from collections.abc import Callable
 from datetime import timedelta
-from typing import Callable
+from types import MappingProxyType
+from typing import Any, NamedTuple
 
-import async_timeout
-import aiohttp
 from homeassistant.components.sensor import (
-    SensorEntity,
     SensorDeviceClass,
+    SensorEntity,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, Platform, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
-from homeassistant.helpers.typing import (
-    ConfigType,
-    DiscoveryInfoType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import (
+    DOMAIN,
+    CONF_INTERVAL,
+    DIAGNOSTICS_CONTEXT,
+    DISABLE_LONG_TAIL,
+    SIGNAL_KEYS_UPDATED,
 )
-from homeassistant.const import (
-    UnitOfTemperature,
-    UnitOfPressure,
-    UnitOfSpeed,
-    UnitOfLength,
-    UnitOfIrradiance,
-    UnitOfElectricPotential,
-    PERCENTAGE,
-    DEGREE,
-)
-
-from .const import DOMAIN, CONF_API_URL,  CONF_INTERVAL, SENSOR_NAME_MAPPING
+from .coordinator import WeatherStationCoordinator
+from .descriptors import SensorDescriptor, SensorSelection, describe_sensor_key
 
 _LOGGER = logging.getLogger(__name__)
-SCAN_INTERVAL = timedelta(minutes=CONF_INTERVAL)
-
-async def async_setup_platform(
-    hass: HomeAssistant,
-    config: ConfigType,
-    async_add_entities: Callable,
-    discovery_info: DiscoveryInfoType | None = None,
-) -> None:
-    """Set up Weather Station sensor entities from a config entry."""
-    _LOGGER.info("WSWR Weather Station - async_setup_platform")
-
-    _LOGGER.info("WSWR Weather Station - Creating coordinator")
-    coordinator = WeatherStationCoordinator(hass)
-
-    _LOGGER.info("WSWR Weather Station - refresh_data")
-    await coordinator.async_config_entry_first_refresh()
-
-    # Create one sensor per key in the latest JSON object.
-    sensors = [
-        WeatherStationSensor(coordinator, sensor_key)
-        for sensor_key in coordinator.data.keys()
-        if sensor_key not in ("id", "record_time", "power_v_01mnavg", "wvpk2ht_xxmnavg")
-    ]
-
-    _LOGGER.debug("WSWR Weather Station - Creating Sensors: " + str(len(sensors)))
-    async_add_entities(sensors, update_before_add=True)
+SCAN_INTERVAL = timedelta(seconds=CONF_INTERVAL)
+
+# Record keys that identify a record rather than measure anything; which of the
+# other keys become sensors is chosen by quantity and window in the options.
+EXCLUDED_KEYS = ("id", "record_time")
+
+
+class DiagnosticDescription(NamedTuple):
+    """A diagnostic sensor reading the coordinator's poll measurements."""
+
+    key: str
+    name: str
+    value_fn: Callable[[WeatherStationCoordinator], Any]
+    device_class: str | None = SensorDeviceClass.DURATION
+    unit: str | None = UnitOfTime.MILLISECONDS
+    state_class: str | None = SensorStateClass.MEASUREMENT
+    enabled_default: bool = False
+    attributes_fn: Callable[[WeatherStationCoordinator], dict] | None = None
+
+
+def _milliseconds(value: float | None) -> float | None:
+    """Convert seconds to milliseconds."""
+    return None if value is None else round(value * 1000, 1)
+
+
+DIAGNOSTIC_SENSORS = (
+    DiagnosticDescription(
+        "fetch_latency",
+        "Weather Station Fetch Latency",
+        lambda coordinator: _milliseconds(coordinator.stats.total.percentile(50)),
+        # Compare the API's share (DNS, connect, first byte) with our own.
+        attributes_fn=lambda coordinator: coordinator.stats.as_dict()["latency_ms"]
+        | {"loop_lag": coordinator.stats.loop_lag.summary(1000, 3)},
+    ),
+    DiagnosticDescription(
+        "time_to_first_byte",
+        "Weather Station Time to First Byte",
+        lambda coordinator: _milliseconds(coordinator.stats.ttfb.percentile(50)),
+    ),
+    DiagnosticDescription(
+        "payload_size",
+        "Weather Station Payload Size",
+        lambda coordinator: coordinator.stats.payload_bytes.last,
+        SensorDeviceClass.DATA_SIZE,
+        UnitOfInformation.BYTES,
+    ),
+    DiagnosticDescription(
+        "decode_time",
+        "Weather Station Decode Time",
+        lambda coordinator: _milliseconds(coordinator.stats.decode.percentile(50)),
+    ),
+    DiagnosticDescription(
+        "fan_out_time",
+        "Weather Station Fan-out Time",
+        lambda coordinator: _milliseconds(coordinator.stats.fan_out.percentile(50)),
+    ),
+    DiagnosticDescription(
+        "loop_lag",
+        "Weather Station Event Loop Lag",
+        lambda coordinator: _milliseconds(coordinator.stats.loop_lag.percentile(90)),
+    ),
+    DiagnosticDescription(
+        "record_age",
+        "Weather Station Record Age",
+        lambda coordinator: coordinator.stats.record_age,
+        unit=UnitOfTime.SECONDS,
+        enabled_default=True,
+    ),
+    DiagnosticDescription(
+        "poll_failures",
+        "Weather Station Poll Failures",
+        lambda coordinator: coordinator.stats.outcomes["failure"]
+        + coordinator.stats.outcomes["timeout"],
+        None,
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        True,
+        lambda coordinator: {
+            "outcomes": dict(coordinator.stats.outcomes),
+            "errors": dict(coordinator.stats.errors),
+        },
+    ),
+)
 
 async def async_setup_entry(
     hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -68,158 +119,137 @@ async def async_setup_entry(
     
     _LOGGER.info("WSWR Weather Station - async_setup_entry")
 
-    config = hass.data[DOMAIN][config_entry.entry_id]
-
-    if config_entry.options:
-        config.update(config_entry.options)
-    
-    api_url = config.get("api_url", CONF_API_URL)
-    interval = config.get("interval", CONF_INTERVAL)
-
-    coordinator = WeatherStationCoordinator(hass, api_url, interval)
+    coordinator: WeatherStationCoordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
 
-    await coordinator.async_config_entry_first_refresh()
+    registry = er.async_get(hass)
+    # Sensors that were created, by key; disabled keys are known but never built.
+    sensors: dict[str, WeatherStationSensor] = {}
+    known_keys: set[str] = set()
 
-    # Create the sensors
-    sensors = [
-        WeatherStationSensor(coordinator, sensor_key)
-        for sensor_key in coordinator.data.keys()
-        if sensor_key not in ("id", "record_time", "power_v_01mnavg", "wvpk2ht_xxmnavg")
-    ]
+    def selected(sensor_key: str, selection: SensorSelection) -> bool:
+        """Return whether a key's sensor is wanted.
 
-    _LOGGER.debug("WSWR Weather Station - Creating Sensors: " + str(len(sensors)))
+        Derived sensors were asked for one by one, so they are always wanted.
+        """
+        return sensor_key not in EXCLUDED_KEYS and (
+            sensor_key in coordinator.derived.descriptors
+            or selection.includes(describe_sensor_key(sensor_key))
+        )
 
-    async_add_entities(sensors, update_before_add=True)
+    @callback
+    def async_add_sensors(keys) -> None:
+        """Create sensors for selected keys not seen before, skipping disabled ones."""
+        entry_data = hass.data[DOMAIN][config_entry.entry_id]
+        disable_long_tail = entry_data.get("disable_long_tail", DISABLE_LONG_TAIL)
+        selection = SensorSelection.from_config(entry_data)
+        added = []
+        for sensor_key in keys:
+            if sensor_key in known_keys or not selected(sensor_key, selection):
+                continue
+            known_keys.add(sensor_key)
+            descriptor = coordinator.derived.descriptors.get(
+                sensor_key
+            ) or coordinator.normalizer.describe(sensor_key)
+            unique_id = f"{config_entry.entry_id}-{sensor_key}"
+            entity_id = registry.async_get_entity_id(Platform.SENSOR, DOMAIN, unique_id)
+
+            if entity_id is None and disable_long_tail and descriptor.long_tail:
+                # Register the sensor as disabled instead of building an entity
+                # nobody reads; enabling it reloads the entry, which creates it.
+                registry.async_get_or_create(
+                    Platform.SENSOR,
+                    DOMAIN,
+                    unique_id,
+                    config_entry=config_entry,
+                    suggested_object_id=descriptor.name,
+                    disabled_by=er.RegistryEntryDisabler.INTEGRATION,
+                    original_name=descriptor.name,
+                    original_device_class=descriptor.device_class,
+                    unit_of_measurement=descriptor.unit,
+                )
+                continue
+            if entity_id is not None and registry.entities[entity_id].disabled:
+                continue
+
+            sensors[sensor_key] = WeatherStationSensor(coordinator, sensor_key, descriptor)
+            added.append(sensors[sensor_key])
+
+        if added:
+            _LOGGER.debug("WSWR Weather Station - Creating Sensors: %s", len(added))
+            async_add_entities(added)
+
+    @callback
+    def async_sync_sensors(prune: bool = False) -> None:
+        """Add sensors for new keys and, if prune, remove those whose key is gone.
+
+        Pruning also removes the sensors of groups that are no longer selected.
+        """
+        async_add_sensors(coordinator.data)
+        if not prune:
+            return
+        selection = SensorSelection.from_config(hass.data[DOMAIN][config_entry.entry_id])
+        removed = {
+            sensor_key
+            for sensor_key in known_keys
+            if sensor_key not in coordinator.data or not selected(sensor_key, selection)
+        }
+        for sensor_key in removed:
+            known_keys.discard(sensor_key)
+            sensor = sensors.pop(sensor_key, None)
+            _LOGGER.debug("WSWR Weather Station - Removing Sensor: %s", sensor_key)
+            unique_id = f"{config_entry.entry_id}-{sensor_key}"
+            if entity_id := registry.async_get_entity_id(Platform.SENSOR, DOMAIN, unique_id):
+                registry.async_remove(entity_id)
+            elif sensor is not None:
+                hass.async_create_task(sensor.async_remove())
+
+    # The coordinator was refreshed during entry setup, so the entities can be
+    # added without polling each one individually.
+    async_add_sensors(coordinator.data)
+    async_add_entities(
+        WeatherStationDiagnosticSensor(coordinator, description)
+        for description in DIAGNOSTIC_SENSORS
+    )
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_KEYS_UPDATED.format(config_entry.entry_id), async_sync_sensors
+        )
+    )
 
 
 def get_sensor_properties(sensor_key: str):
     """Infer sensor properties based on the sensor key."""
-    sensor_key_lower = sensor_key.lower()
-    properties = {}
-    
-    # Prioritize specific suffixes
-    
-    # Wind Gust Time/Direction (avoid matching generic 'windgst' speed first)
-    if "windgst" in sensor_key_lower:
-        if "tim" in sensor_key_lower:
-             # Just a time string, or timestamp if format allows. 
-             # Assuming string for now as per original code implies simple display.
-             return {} 
-        if "dir" in sensor_key_lower:
-             return {"device_class": "wind_direction", "unit": DEGREE}
-
-    # Wind Direction (general)
-    if "winddir" in sensor_key_lower or "wnddirm" in sensor_key_lower:
-        return {"device_class": "wind_direction", "unit": DEGREE}
-
-    # Temperature sensors
-    if sensor_key_lower.startswith("airtemp") or sensor_key_lower.startswith("dewtemp"):
-        properties.update({"device_class": SensorDeviceClass.TEMPERATURE, "unit": UnitOfTemperature.CELSIUS, "state_class": SensorStateClass.MEASUREMENT})
-    
-    # Pressure sensors
-    elif (
-        sensor_key_lower.startswith("pres")
-        or sensor_key_lower.startswith("pressen")
-        or "presqfe" in sensor_key_lower
-        or "presqnh" in sensor_key_lower
-        or "presmsl" in sensor_key_lower
-    ):
-        properties.update({"device_class": SensorDeviceClass.PRESSURE, "unit": UnitOfPressure.HPA, "state_class": SensorStateClass.MEASUREMENT})
-    
-    # Humidity sensors
-    elif sensor_key_lower.startswith("relhumd"):
-        properties.update({"device_class": SensorDeviceClass.HUMIDITY, "unit": PERCENTAGE, "state_class": SensorStateClass.MEASUREMENT})
-    
-    # Rainfall sensors
-    elif sensor_key_lower.startswith("rainfal"):
-        # Accumulators
-        state_class = SensorStateClass.TOTAL_INCREASING if "acc" in sensor_key_lower else SensorStateClass.MEASUREMENT
-        properties.update({"device_class": "precipitation", "unit": UnitOfLength.MILLIMETERS, "state_class": state_class})
-    
-    # Wind Speed / Gust / Lull / Run / Cross Wind
-    elif (
-        sensor_key_lower.startswith("windspd")
-        or sensor_key_lower.startswith("windgst")
-        or sensor_key_lower.startswith("windlul")
-        or "windcw" in sensor_key_lower 
-        or "windccw" in sensor_key_lower
-    ):
-        # Assuming windcw/windccw are also speeds
-        properties.update({"device_class": "wind_speed", "unit": UnitOfSpeed.KNOTS, "state_class": SensorStateClass.MEASUREMENT})
-
-    # Wind Run specifically (Distance)
-    elif "windrun" in sensor_key_lower:
-         # Wind run is distance. Assuming km based on typical metric usage if not kn*hr
-         # If the sensor output is just a number logic might vary, but DISTANCE is safer than SPEED.
-         properties.update({"device_class": "distance", "unit": UnitOfLength.KILOMETERS, "state_class": SensorStateClass.TOTAL_INCREASING})
-
-    # Solar radiation sensors
-    elif sensor_key_lower.startswith("solradn"):
-        properties.update({"device_class": "irradiance", "unit": UnitOfIrradiance.WATTS_PER_SQUARE_METER, "state_class": SensorStateClass.MEASUREMENT})
-    
-    # Voltage sensors
-    elif sensor_key_lower.startswith("power_v"):
-        properties.update({"device_class": SensorDeviceClass.VOLTAGE, "unit": UnitOfElectricPotential.VOLT, "state_class": SensorStateClass.MEASUREMENT})
-        
-    return properties
-
-class WeatherStationCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from the Weather Station API."""
-
-    def __init__(self, hass: HomeAssistant, api_url: str, interval: int) -> None:
-        """Initialize."""
-        super().__init__(
-            hass,
-            _LOGGER,
-            name="WSWR Weather Station API",
-            update_interval=timedelta(minutes=interval),
-        )
-        self.api_url = api_url
-        self.session = aiohttp.ClientSession()
-
-    async def _async_update_data(self):
-        """Fetch data from API."""
-        try:
-            async with async_timeout.timeout(10):
-                _LOGGER.debug(f"Getting Data from: {self.api_url}")
-                async with self.session.get(self.api_url) as response:
-                    if response.status != 200:
-                        raise UpdateFailed(f"Error fetching data: {response.status}")
-                    data = await response.json()
-
-                    # _LOGGER.debug("WSWR JSON:", data)
-                    # If the API returns a list of records, use the first one as the latest.
-                    if isinstance(data, list) and data:
-                        return data[0]
-                    return data
-        except Exception as err:
-            raise UpdateFailed(f"Error fetching data: {err}") from err
-
-
-class WeatherStationSensor(SensorEntity):
+    return describe_sensor_key(sensor_key).properties()
+
+class WeatherStationSensor(CoordinatorEntity, SensorEntity):
     """Representation of a sensor for each type of Weather Station API data."""
 
-    def __init__(self, coordinator: WeatherStationCoordinator, sensor_key: str) -> None:
+    def __init__(
+        self,
+        coordinator: WeatherStationCoordinator,
+        sensor_key: str,
+        descriptor: SensorDescriptor | None = None,
+    ) -> None:
         """Initialize the sensor."""
-        self.coordinator = coordinator
+        super().__init__(coordinator, context=sensor_key)
         self._sensor_key = sensor_key
+        # Built once and shared by every state write.
+        self._attributes = MappingProxyType({"measurement": sensor_key})
 
-        # Use a friendly name if available; otherwise, fall back.
-        friendly_name = SENSOR_NAME_MAPPING.get(sensor_key, f"Weather Station {sensor_key}")
-                # Infer sensor properties such as device_class and unit_of_measurement
-        properties = get_sensor_properties(sensor_key)
+        # Friendly name and sensor properties such as device_class and unit.
+        descriptor = descriptor or describe_sensor_key(sensor_key)
 
-        self._attr_name = friendly_name
+        self._attr_name = descriptor.name
         # self._attr_unique_id = f"weather_station_{sensor_key}"
         self._attr_unique_id = f"{coordinator.config_entry.entry_id}-{sensor_key}"
-        
-        if "device_class" in properties:
-            self._attr_device_class = properties["device_class"]
-        if "unit" in properties:
-            self._attr_native_unit_of_measurement = properties["unit"]
-        if "state_class" in properties:
-            self._attr_state_class = properties["state_class"]
 
+        if descriptor.device_class is not None:
+            self._attr_device_class = descriptor.device_class
+        if descriptor.unit is not None:
+            self._attr_native_unit_of_measurement = descriptor.unit
+        if descriptor.state_class is not None:
+            self._attr_state_class = descriptor.state_class
 
     @property
     def native_value(self):
@@ -229,8 +259,45 @@ class WeatherStationSensor(SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return additional attributes (if needed)."""
-        return {"measurement": self._sensor_key}
+        if (age := self.coordinator.data_age()) is None:
+            return self._attributes
+        # Seconds since the cached record was taken, until live data arrives.
+        return {**self._attributes, "data_age": round(age.total_seconds())}
+
+
+class WeatherStationDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """A measurement of how the station's polls perform."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
 
-    async def async_update(self) -> None:
-        """Request an update from the coordinator."""
-        await self.coordinator.async_request_refresh()
+    def __init__(
+        self, coordinator: WeatherStationCoordinator, description: DiagnosticDescription
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, context=DIAGNOSTICS_CONTEXT)
+        self._description = description
+        self._attr_name = description.name
+        self._attr_unique_id = (
+            f"{coordinator.config_entry.entry_id}-diagnostics-{description.key}"
+        )
+        self._attr_device_class = description.device_class
+        self._attr_native_unit_of_measurement = description.unit
+        self._attr_state_class = description.state_class
+        self._attr_entity_registry_enabled_default = description.enabled_default
+
+    @property
+    def available(self) -> bool:
+        """Return True, as failures are part of what the diagnostics show."""
+        return True
+
+    @property
+    def native_value(self):
+        """Return the measurement."""
+        return self._description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the detailed measurements, if any."""
+        if self._description.attributes_fn is None:
+            return None
+        return self._description.attributes_fn(self.coordinator)
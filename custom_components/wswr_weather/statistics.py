@@ -0,0 +1,241 @@
+"""Backfill buffered WSWR records into Home Assistant's long-term statistics."""
+import logging
+from collections import defaultdict
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_import_statistics,
+    statistics_during_period,
+)
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .buffer import parse_record_time
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+
+
+def _hour_start(when: datetime) -> datetime:
+    """Return the start of the hour containing when."""
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def group_by_hour(
+    records,
+    hours: set[datetime],
+    normalize: Callable[[Mapping], Mapping] | None = None,
+) -> dict[datetime, list[dict]]:
+    """Group time-ordered records into the given hourly buckets.
+
+    With normalize, the grouped records are normalised like published ones.
+    """
+    buckets: dict[datetime, list[dict]] = defaultdict(list)
+    for record in records:
+        if (record_time := parse_record_time(record)) is None:
+            continue
+        if (hour := _hour_start(record_time)) in hours:
+            buckets[hour].append(record if normalize is None else normalize(record))
+    return buckets
+
+
+def _values(records: list[dict], key: str) -> list[float]:
+    """Return the numeric values of key across records."""
+    values = []
+    for record in records:
+        try:
+            values.append(float(record[key]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return values
+
+
+def measurement_statistics(
+    buckets: dict[datetime, list[dict]], key: str
+) -> list[StatisticData]:
+    """Return hourly mean/min/max rows for a measurement sensor."""
+    rows = []
+    for hour in sorted(buckets):
+        if values := _values(buckets[hour], key):
+            rows.append(
+                StatisticData(
+                    start=hour,
+                    mean=sum(values) / len(values),
+                    min=min(values),
+                    max=max(values),
+                )
+            )
+    return rows
+
+
+def total_increasing_statistics(
+    buckets: dict[datetime, list[dict]],
+    key: str,
+    last_state: float | None,
+    last_sum: float,
+) -> list[StatisticData]:
+    """Return hourly state/sum rows for a total_increasing sensor.
+
+    A drop in value is treated as a meter reset, like the recorder does.
+    """
+    rows = []
+    for hour in sorted(buckets):
+        if not (values := _values(buckets[hour], key)):
+            continue
+        for value in values:
+            if last_state is None:
+                last_state = value
+                continue
+            last_sum += value - last_state if value >= last_state else value
+            last_state = value
+        rows.append(StatisticData(start=hour, state=last_state, sum=last_sum))
+    return rows
+
+
+def covered_hours(
+    records, hours: set[datetime], cadence: timedelta | None
+) -> set[datetime]:
+    """Return the hours the records cover from start to end.
+
+    An hour is covered when no two neighbouring records, nor the hour's bounds
+    and its first or last record, are more than two cadences apart.
+    """
+    if cadence is None:
+        return set()
+    max_gap = cadence * 2
+    times: dict[datetime, list[datetime]] = defaultdict(list)
+    for record in records:
+        if (record_time := parse_record_time(record)) is None:
+            continue
+        if (hour := _hour_start(record_time)) in hours:
+            times[hour].append(record_time)
+    covered = set()
+    for hour, hour_times in times.items():
+        edges = [hour, *sorted(hour_times), hour + HOUR]
+        if all(later - earlier <= max_gap for earlier, later in zip(edges, edges[1:])):
+            covered.add(hour)
+    return covered
+
+
+def _recorded_rows(
+    hass: HomeAssistant, start: datetime, end: datetime, statistic_ids: set[str]
+) -> dict[str, dict[datetime, tuple[float | None, float | None]]]:
+    """Return the state and sum of the hourly rows recorded from start to end."""
+    stats = statistics_during_period(
+        hass, start, end, statistic_ids, "hour", None, {"state", "sum"}
+    )
+    return {
+        statistic_id: {
+            dt_util.utc_from_timestamp(row["start"]): (row.get("state"), row.get("sum"))
+            for row in rows
+        }
+        for statistic_id, rows in stats.items()
+    }
+
+
+def _missing_totals(
+    buckets: dict[datetime, list[dict]],
+    key: str,
+    hours: list[datetime],
+    recorded: dict[datetime, tuple[float | None, float | None]],
+) -> list[StatisticData]:
+    """Return state/sum rows for the hours, each continuing the row before it.
+
+    An hour without a row, recorded or imported, just before it is skipped: its
+    sum would restart from zero and break the cumulative series.
+    """
+    rows: list[StatisticData] = []
+    for hour in hours:
+        if (previous := recorded.get(hour - HOUR)) is None:
+            if not rows or rows[-1]["start"] != hour - HOUR:
+                continue
+            previous = (rows[-1]["state"], rows[-1]["sum"])
+        last_state, last_sum = previous
+        if last_sum is None:
+            continue
+        rows.extend(
+            total_increasing_statistics({hour: buckets[hour]}, key, last_state, last_sum)
+        )
+    return rows
+
+
+async def async_import_backfill(
+    hass: HomeAssistant,
+    entry_id: str,
+    backfill: list[dict],
+    buffered,
+    normalize: Callable[[Mapping], Mapping] | None = None,
+    cadence: timedelta | None = None,
+) -> None:
+    """Import hourly statistics for completed hours that contain backfilled records.
+
+    Only hours the buffer covers from start to end, and that the recorder has no
+    row for, are imported, so statistics compiled from states are never replaced
+    by partial ones. The recorder imports one statistic per job, so there is one
+    job per sensor, holding all of its rows; the recorder commits them together.
+    """
+    current_hour = _hour_start(dt_util.utcnow())
+    hours = {
+        hour
+        for record in backfill
+        if (record_time := parse_record_time(record)) is not None
+        and (hour := _hour_start(record_time)) < current_hour
+    }
+    if not (hours := covered_hours(buffered, hours, cadence)):
+        return
+    buckets = group_by_hour(buffered, hours, normalize)
+
+    registry = er.async_get(hass)
+    sensors: dict[str, tuple[str, er.RegistryEntry]] = {}
+    for entity in er.async_entries_for_config_entry(registry, entry_id):
+        if entity.domain != "sensor" or entity.disabled:
+            continue
+        if entity.options.get("sensor", {}).get("unit_of_measurement"):
+            # Statistics are kept in the display unit, normalised records in the native one.
+            continue
+        state_class = (entity.capabilities or {}).get("state_class")
+        if state_class not in (
+            SensorStateClass.MEASUREMENT,
+            SensorStateClass.TOTAL_INCREASING,
+        ):
+            continue
+        sensors[entity.entity_id] = (entity.unique_id.removeprefix(f"{entry_id}-"), entity)
+    if not sensors:
+        return
+
+    # Rows already recorded, and the hour before the first, which totals continue.
+    recorded = await get_instance(hass).async_add_executor_job(
+        _recorded_rows, hass, min(hours) - HOUR, max(hours) + HOUR, set(sensors)
+    )
+
+    imported = 0
+    for entity_id, (key, entity) in sensors.items():
+        sensor_rows = recorded.get(entity_id, {})
+        missing = sorted(hours - sensor_rows.keys())
+        total = entity.capabilities["state_class"] == SensorStateClass.TOTAL_INCREASING
+        if total:
+            rows = _missing_totals(buckets, key, missing, sensor_rows)
+        else:
+            rows = measurement_statistics({hour: buckets[hour] for hour in missing}, key)
+        if not rows:
+            continue
+        metadata = StatisticMetaData(
+            has_mean=not total,
+            has_sum=total,
+            name=None,
+            source="recorder",
+            statistic_id=entity_id,
+            unit_of_measurement=entity.unit_of_measurement,
+        )
+        async_import_statistics(hass, metadata, rows)
+        imported += 1
+
+    _LOGGER.debug(
+        "Backfilled statistics for %s sensors over %s hours", imported, len(hours)
+    )
@@ -0,0 +1,94 @@
+"""Current conditions of a WSWR Weather Station as one weather entity."""
+import logging
+
+from homeassistant.components.weather import (
+    ATTR_CONDITION_RAINY,
+    ATTR_CONDITION_WINDY,
+    WeatherEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfPressure, UnitOfSpeed, UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util.unit_conversion import SpeedConverter
+
+from .const import DOMAIN
+from .coordinator import WeatherStationCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Weather entity attribute -> record key it is read from.
+CONDITION_KEYS = {
+    "_attr_native_temperature": "airtemp_01mnavg",
+    "_attr_native_dew_point": "dewtemp_01mnavg",
+    "_attr_humidity": "relhumd_01mnavg",
+    "_attr_native_pressure": "presqnh_01mnavg",
+    "_attr_native_wind_speed": "windspd_01mnavg",
+    "_attr_native_wind_gust_speed": "windgst_01mnmax",
+    "_attr_wind_bearing": "winddir_01mnavg",
+}
+
+# Rain in the last minute means it is raining now.
+RAIN_KEY = "rainfal_01mnacc"
+
+# Mean wind speed, in knots, from which it is windy (Beaufort force 6).
+WINDY_SPEED = 22
+
+WEATHER_KEYS = frozenset({*CONDITION_KEYS.values(), RAIN_KEY})
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the weather entity from a config entry."""
+    coordinator: WeatherStationCoordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
+    async_add_entities([WeatherStationWeather(coordinator)])
+
+
+class WeatherStationWeather(CoordinatorEntity, WeatherEntity):
+    """The station's current conditions, read from the coordinator's record."""
+
+    _attr_native_temperature_unit = UnitOfTemperature.CELSIUS
+    _attr_native_pressure_unit = UnitOfPressure.HPA
+    _attr_native_wind_speed_unit = UnitOfSpeed.KNOTS
+
+    def __init__(self, coordinator: WeatherStationCoordinator) -> None:
+        """Initialize, listening for changes of any key the conditions are read from."""
+        super().__init__(coordinator, context=WEATHER_KEYS)
+        self._attr_name = "Weather Station"
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}-weather"
+        # Readings are published in the units the coordinator normalised them to.
+        normalizer = coordinator.normalizer
+        self._attr_native_temperature_unit = normalizer.describe(
+            CONDITION_KEYS["_attr_native_temperature"]
+        ).unit
+        self._attr_native_pressure_unit = normalizer.describe(
+            CONDITION_KEYS["_attr_native_pressure"]
+        ).unit
+        self._attr_native_wind_speed_unit = normalizer.describe(
+            CONDITION_KEYS["_attr_native_wind_speed"]
+        ).unit
+        self._windy_speed = SpeedConverter.convert(
+            WINDY_SPEED, UnitOfSpeed.KNOTS, self._attr_native_wind_speed_unit
+        )
+        self._update_conditions()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Read the new conditions and write them as one state."""
+        self._update_conditions()
+        super()._handle_coordinator_update()
+
+    def _update_conditions(self) -> None:
+        """Read every condition from the record in one pass."""
+        data = self.coordinator.data or {}
+        for attribute, key in CONDITION_KEYS.items():
+            setattr(self, attribute, data.get(key))
+
+        condition = None
+        if (rain := data.get(RAIN_KEY)) is not None and rain > 0:
+            condition = ATTR_CONDITION_RAINY
+        elif (speed := self._attr_native_wind_speed) is not None and speed >= self._windy_speed:
+            condition = ATTR_CONDITION_WINDY
+        self._attr_condition = condition
@@ -0,0 +1,22 @@
+"""Constants for WSWR Weather Station tests."""
+from custom_components.wswr_weather.const import CONF_API_URL, CONF_INTERVAL
+
+MOCK_CONFIG = {"api_url": CONF_API_URL, "interval": CONF_INTERVAL}
+
+# A trimmed record as returned by the mostrecent endpoint (newest first).
+MOCK_RECORD = {
+    "id": 1000,
+    "record_time": "2024-05-01T10:00:00",
+    "airtemp_01mnavg": 12.4,
+    "dewtemp_01mnavg": 8.1,
+    "relhumd_01mnavg": 75.0,
+    "presqnh_01hrmax": 1013.2,
+    "rainfal_01hracc": 0.2,
+    "rainfal_24hracc": 4.6,
+    "windspd_01mnavg": 8.5,
+    "windgst_01mnmax": 14.0,
+    "winddir_01mnavg": 310,
+    "windgst_01hrtim": "09:42",
+    "power_v_01mnavg": 13.1,
+    "wvpk2ht_xxmnavg": 0.0,
+}
@@ -0,0 +1,129 @@
+"""A local stub of the WSWR weather data API."""
+import asyncio
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+import json
+import random
+
+from aiohttp import hdrs, web
+
+from homeassistant.util import dt as dt_util
+
+from .const import MOCK_RECORD
+
+
+def make_record(record_id: int, when: datetime, template: dict = MOCK_RECORD) -> dict:
+    """Build a record stamped with the station-local time of when."""
+    return dict(
+        template,
+        id=record_id,
+        record_time=dt_util.as_local(when).replace(tzinfo=None).isoformat(),
+    )
+
+
+class StubWSWRApi:
+    """Serve /weatherdata/mostrecent/<count> from an in-memory record list."""
+
+    def __init__(
+        self,
+        record_count: int = 60,
+        cadence: timedelta = timedelta(minutes=1),
+        latency: float = 0,
+        template: dict = MOCK_RECORD,
+        error_rate: float = 0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize with record_count records ending now.
+
+        A share error_rate of the requests, drawn from a seeded generator, is
+        answered with 503 Service Unavailable.
+        """
+        self.cadence = cadence
+        self.latency = latency
+        self.template = template
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.records: list[dict] = []
+        self.requests: list[web.Request] = []
+        # When set, every request is answered with this HTTP status.
+        self.fail_status: int | None = None
+        # When set, every request is answered 200 with this body.
+        self.fail_body: bytes | None = None
+        # Requests being served right now, and the most seen at once.
+        self.active = 0
+        self.max_active = 0
+        now = dt_util.utcnow().replace(second=0, microsecond=0)
+        for offset in reversed(range(record_count)):
+            self.publish(now - cadence * offset)
+        self.runner: web.AppRunner | None = None
+        self.url = ""
+
+    def publish(self, when: datetime | None = None) -> dict:
+        """Append a new record, newest last."""
+        record_id = self.records[-1]["id"] + 1 if self.records else 1
+        record = make_record(record_id, when or dt_util.utcnow(), self.template)
+        self.records.append(record)
+        return record
+
+    async def handle_mostrecent(self, request: web.Request) -> web.StreamResponse:
+        """Return the newest count records, newest first."""
+        self.requests.append(request)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self._respond(request)
+        finally:
+            self.active -= 1
+
+    def _respond(self, request: web.Request) -> web.Response:
+        """Build the response for a mostrecent request."""
+        if self.fail_status is not None:
+            return web.Response(status=self.fail_status)
+        if self.fail_body is not None:
+            return web.Response(body=self.fail_body, content_type="text/html")
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=503)
+        count = int(request.match_info["count"])
+        newest = self.records[-1]
+        etag = f'"{newest["id"]}-{count}"'
+        last_modified = format_datetime(
+            dt_util.as_utc(dt_util.parse_datetime(newest["record_time"])), usegmt=True
+        )
+        if request.headers.get(hdrs.IF_NONE_MATCH) == etag:
+            return web.Response(status=304, headers={hdrs.ETAG: etag})
+
+        body = json.dumps(self.records[::-1][:count]).encode()
+        response = web.Response(
+            body=body,
+            content_type="application/json",
+            headers={hdrs.ETAG: etag, hdrs.LAST_MODIFIED: last_modified},
+        )
+        response.enable_compression()
+        return response
+
+    async def start(self) -> str:
+        """Start serving on a free localhost port and return the endpoint URL."""
+        app = web.Application()
+        app.router.add_get("/weatherdata/mostrecent/{count}", self.handle_mostrecent)
+        # Per-station paths, so several entries can poll distinct URLs.
+        app.router.add_get(
+            "/{station}/weatherdata/mostrecent/{count}", self.handle_mostrecent
+        )
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/weatherdata/mostrecent/60"
+        return self.url
+
+    def station_url(self, station: int) -> str:
+        """Return the endpoint URL of a numbered station."""
+        return self.url.replace("/weatherdata/", f"/station{station}/weatherdata/")
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self.runner:
+            await self.runner.cleanup()
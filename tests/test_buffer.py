@@ -0,0 +1,40 @@
+"""Tests for the WSWR Weather Station record buffer."""
+from datetime import timedelta
+
+from custom_components.wswr_weather.buffer import RecordBuffer
+
+
+def _records(first_id, count, start_minute=0):
+    """Build count one-minute records, newest first as the API returns them."""
+    return [
+        {
+            "id": first_id + offset,
+            "record_time": f"2024-05-01T10:{start_minute + offset:02d}:00",
+            "airtemp_01mnavg": 10 + offset,
+        }
+        for offset in reversed(range(count))
+    ]
+
+
+def test_add_orders_and_deduplicates():
+    """Test records are kept oldest first and repeated records are skipped."""
+    buffer = RecordBuffer(60)
+
+    added = buffer.add(_records(1, 5))
+    assert [record["id"] for record in added] == [1, 2, 3, 4, 5]
+
+    added = buffer.add(_records(4, 4, start_minute=3))
+    assert [record["id"] for record in added] == [6, 7]
+    assert [record["id"] for record in buffer] == [1, 2, 3, 4, 5, 6, 7]
+    assert buffer.newest["id"] == 7
+    assert buffer.cadence == timedelta(minutes=1)
+
+
+def test_add_is_bounded():
+    """Test the oldest records are evicted once the buffer is full."""
+    buffer = RecordBuffer(10)
+    buffer.add(_records(1, 25))
+
+    assert len(buffer) == 10
+    assert [record["id"] for record in buffer] == list(range(16, 26))
+    assert 15 not in buffer
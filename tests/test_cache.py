@@ -0,0 +1,126 @@
+"""Tests for the on-disk record cache."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.wswr_weather.cache import CACHE_SAVE_DELAY, STORAGE_VERSION
+from custom_components.wswr_weather.const import CONF_INTERVAL, DOMAIN
+
+from .const import MOCK_CONFIG
+from .stub import make_record
+
+
+def _cache(entry, records, api_url=MOCK_CONFIG["api_url"]):
+    """Return the stored form of a cache holding records."""
+    return {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": {"api_url": api_url, "records": records},
+    }
+
+
+async def test_startup_from_cache(hass, hass_storage):
+    """Test entities are populated from the cache without waiting for the API."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    now = dt_util.utcnow().replace(microsecond=0)
+    cached = make_record(1000, now - timedelta(minutes=10))
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = _cache(entry, [cached])
+
+    api_ready = asyncio.Event()
+    live = make_record(1001, now, dict(cached, airtemp_01mnavg=13.0))
+
+    async def slow_api(*args, **kwargs):
+        await api_ready.wait()
+        return [live, cached]
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        side_effect=slow_api,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        state = hass.states.get("sensor.air_temperature_1_min_avg")
+        assert state.state == "12.4"
+        assert 590 <= state.attributes["data_age"] <= 610
+
+        # The live refresh runs as a background task of the entry.
+        api_ready.set()
+        await asyncio.wait(entry._background_tasks)
+        await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.air_temperature_1_min_avg")
+    assert state.state == "13.0"
+    assert "data_age" not in state.attributes
+    # Unchanged sensors are re-published once to drop the stale attribute.
+    assert "data_age" not in hass.states.get("sensor.dew_point_1_min_avg").attributes
+
+
+async def test_cache_for_other_url_is_ignored(hass, hass_storage):
+    """Test a cache written for another endpoint is not used."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    now = dt_util.utcnow()
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = _cache(
+        entry, [make_record(1, now, {"airtemp_01mnavg": 30.0})], "http://elsewhere/"
+    )
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=[make_record(1000, now)],
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.air_temperature_1_min_avg")
+    assert state.state == "12.4"
+    assert "data_age" not in state.attributes
+
+
+async def test_cache_saves_are_throttled(hass, hass_storage):
+    """Test polls with new records still get the buffer written within the delay."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    key = f"{DOMAIN}.{entry.entry_id}"
+    start = dt_util.utcnow()
+    polls = 0
+
+    async def new_record(*args, **kwargs):
+        nonlocal polls
+        polls += 1
+        return [make_record(1000 + polls, start + timedelta(minutes=polls))]
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        side_effect=new_record,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert key not in hass_storage
+
+        # Polls every interval, each with a new record, for longer than the delay.
+        now = dt_util.utcnow()
+        for _ in range(CACHE_SAVE_DELAY // CONF_INTERVAL + 1):
+            now += timedelta(seconds=CONF_INTERVAL)
+            async_fire_time_changed(hass, now)
+            await hass.async_block_till_done()
+
+        assert polls > 2
+        assert key in hass_storage
+        written = hass_storage[key]["data"]
+        assert written["api_url"] == MOCK_CONFIG["api_url"]
+        ids = [record["id"] for record in written["records"]]
+        assert ids == sorted(ids)
+
+    assert await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert key not in hass_storage
@@ -0,0 +1,165 @@
+"""Tests for the WSWR Weather Station API client."""
+from unittest.mock import patch
+
+from aiohttp import hdrs
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.wswr_weather.client import (
+    CircuitOpenError,
+    WeatherStationApiError,
+    WeatherStationClient,
+)
+from custom_components.wswr_weather.const import DOMAIN
+from custom_components.wswr_weather.hub import async_get_hub
+
+from .const import MOCK_CONFIG
+from .stub import StubWSWRApi
+
+
+@pytest.fixture
+async def stub_api(socket_enabled):
+    """Run a local stub of the WSWR API."""
+    api = StubWSWRApi()
+    await api.start()
+    yield api
+    await api.stop()
+
+
+async def test_conditional_requests(hass, stub_api):
+    """Test unchanged payloads are answered with 304 and not decoded."""
+    client = WeatherStationClient(async_get_hub(hass), stub_api.url)
+
+    records = await client.async_get_data()
+    assert len(records) == 60
+    assert "gzip" in stub_api.requests[-1].headers[hdrs.ACCEPT_ENCODING]
+    assert stub_api.requests[-1].headers.get(hdrs.IF_NONE_MATCH) is None
+    # The compressed payload is much smaller than the JSON it decodes to.
+    assert 0 < client.stats.bytes_received < len(str(records)) / 4
+
+    assert await client.async_get_data() is None
+    assert stub_api.requests[-1].headers[hdrs.IF_NONE_MATCH] == '"60-60"'
+    assert client.stats.not_modified == 1
+
+    stub_api.publish()
+    records = await client.async_get_data(2)
+    assert [record["id"] for record in records] == [61, 60]
+    assert client.stats.requests == 3
+
+    client.async_close()
+
+
+async def test_failover_and_circuit_breaker(hass, stub_api):
+    """Test failed requests fail over to a mirror and a dead endpoint is skipped."""
+    mirror = StubWSWRApi()
+    await mirror.start()
+    client = WeatherStationClient(async_get_hub(hass), stub_api.url, [mirror.url])
+    stub_api.fail_status = 503
+
+    for _ in range(3):
+        assert len(await client.async_get_data()) == 60
+        # A new record each time, so the mirror never answers 304.
+        mirror.publish()
+    assert len(stub_api.requests) == 3
+    assert client.stats.failovers == 3
+    assert client.endpoints[0].breaker.state == "open"
+
+    # The open circuit keeps the primary endpoint from being asked.
+    await client.async_get_data()
+    assert len(stub_api.requests) == 3
+    assert len(mirror.requests) == 4
+
+    mirror.fail_status = 404
+    with pytest.raises(WeatherStationApiError):
+        await client.async_get_data()
+    # Client errors are not retried.
+    assert client.stats.retries == 0
+
+    for _ in range(2):
+        with pytest.raises(WeatherStationApiError):
+            await client.async_get_data()
+    with pytest.raises(CircuitOpenError):
+        await client.async_get_data()
+    assert len(mirror.requests) == 7
+
+    client.async_close()
+    await mirror.stop()
+
+
+async def test_invalid_payload_fails_over(hass, stub_api):
+    """Test a body that is not JSON counts as a failure of its endpoint."""
+    mirror = StubWSWRApi()
+    await mirror.start()
+    client = WeatherStationClient(async_get_hub(hass), stub_api.url, [mirror.url])
+    stub_api.fail_body = b"<html>Down for maintenance</html>"
+
+    assert len(await client.async_get_data()) == 60
+    assert client.endpoints[0].breaker.failures == 1
+    assert client.stats.failovers == 1
+    assert len(mirror.requests) == 1
+
+    # The same bad body is still a failure, not an unchanged payload.
+    client.endpoints[0].breaker.record_success()
+    mirror.fail_status = 503
+    with patch(
+        "custom_components.wswr_weather.client.backoff_delay", return_value=0
+    ), pytest.raises(WeatherStationApiError):
+        await client.async_get_data()
+    assert client.stats.unchanged_payloads == 0
+
+    client.async_close()
+    await mirror.stop()
+
+
+async def test_retries_within_budget(hass, stub_api):
+    """Test transient errors are retried while the budget lasts."""
+    client = WeatherStationClient(async_get_hub(hass), stub_api.url)
+    stub_api.fail_status = 503
+
+    with patch(
+        "custom_components.wswr_weather.client.backoff_delay", return_value=0
+    ), pytest.raises(WeatherStationApiError):
+        await client.async_get_data(budget=30)
+    assert len(stub_api.requests) == 3
+    assert client.stats.retries == 2
+
+    # A retry that would wait past the budget is not made.
+    client.endpoints[0].breaker.record_success()
+    with patch(
+        "custom_components.wswr_weather.client.backoff_delay", return_value=5
+    ), pytest.raises(WeatherStationApiError):
+        await client.async_get_data(budget=1)
+    assert len(stub_api.requests) == 4
+
+    client.async_close()
+
+
+async def test_unchanged_polls_skip_fan_out(hass, stub_api):
+    """Test polls without a new record skip parsing and entity updates."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=dict(MOCK_CONFIG, api_url=stub_api.url))
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    for _ in range(3):
+        async_fire_time_changed(hass, dt_util.utcnow() + coordinator.update_interval)
+        await hass.async_block_till_done()
+
+    assert len(stub_api.requests) == 4
+    assert coordinator.skipped_cycles == 3
+    # The first poll switches to the two-record window, later ones get a 304.
+    assert coordinator.client.stats.not_modified == 2
+
+    stub_api.publish()
+    async_fire_time_changed(hass, dt_util.utcnow() + coordinator.update_interval)
+    await hass.async_block_till_done()
+    assert coordinator.data["id"] == 61
+    assert coordinator.skipped_cycles == 3
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,94 @@
+"""Tests for the WSWR Weather Station coordinator."""
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from custom_components.wswr_weather.const import CONF_INTERVAL, STALE_THRESHOLD
+from custom_components.wswr_weather.coordinator import WeatherStationCoordinator
+
+from .stub import make_record
+
+
+async def test_incremental_window(hass, freezer: FrozenDateTimeFactory):
+    """Test later polls only request the records missed since the last one."""
+    client = MagicMock()
+    client.async_get_data = AsyncMock()
+    coordinator = WeatherStationCoordinator(hass, client, CONF_INTERVAL)
+    now = dt_util.utcnow().replace(second=0, microsecond=0)
+    freezer.move_to(now)
+
+    client.async_get_data.return_value = [
+        make_record(60 - minute, now - timedelta(minutes=minute))
+        for minute in range(60)
+    ]
+    await coordinator.async_refresh()
+    client.async_get_data.assert_awaited_with(None, None, None, budget=30)
+    assert coordinator.data["id"] == 60
+    assert len(coordinator.buffer) == 60
+
+    # One record later: ask for it plus one record of overlap.
+    freezer.tick(60)
+    client.async_get_data.return_value = [
+        make_record(61, dt_util.utcnow()),
+        make_record(60, now),
+    ]
+    await coordinator.async_refresh()
+    # With the cadence known, only those two records are decoded.
+    client.async_get_data.assert_awaited_with(2, None, 2, budget=30)
+    assert coordinator.data["id"] == 61
+
+    # After a five minute outage the window, and what is decoded of it, grows
+    # to cover the gap.
+    freezer.tick(300)
+    client.async_get_data.return_value = [
+        make_record(61 + minute, now + timedelta(minutes=1 + minute))
+        for minute in range(6)
+    ][::-1]
+    await coordinator.async_refresh()
+    client.async_get_data.assert_awaited_with(6, None, 6, budget=30)
+    assert coordinator.data["id"] == 66
+    assert [record["id"] for record in coordinator.buffer][-6:] == list(range(61, 67))
+
+
+async def test_keeps_stale_values_through_failures(
+    hass, freezer: FrozenDateTimeFactory
+):
+    """Test failed polls keep the last values, marked stale, up to a threshold."""
+    client = MagicMock()
+    client.async_get_data = AsyncMock()
+    coordinator = WeatherStationCoordinator(hass, client, CONF_INTERVAL)
+    updates = []
+    unsub = coordinator.async_add_listener(lambda: updates.append(coordinator.stale))
+    now = dt_util.utcnow().replace(second=0, microsecond=0)
+    freezer.move_to(now)
+
+    client.async_get_data.return_value = [make_record(1, now)]
+    await coordinator.async_refresh()
+    assert updates == [False]
+
+    client.async_get_data.side_effect = UpdateFailed("Error fetching data: 503")
+    for _ in range(2):
+        freezer.tick(60)
+        await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.stale
+    assert coordinator.data_age() == timedelta(minutes=2)
+    # Only going stale reached the listeners.
+    assert updates == [False, True]
+
+    freezer.move_to(now + STALE_THRESHOLD + timedelta(seconds=1))
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert updates == [False, True, True]
+
+    client.async_get_data.side_effect = None
+    client.async_get_data.return_value = [make_record(2, dt_util.utcnow())]
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert not coordinator.stale
+    assert coordinator.data["id"] == 2
+    unsub()
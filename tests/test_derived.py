@@ -0,0 +1,190 @@
+"""Tests for the derived-metric engine."""
+from datetime import timedelta
+import random
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import UnitOfTemperature, UnitOfVolumetricFlux
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_system import US_CUSTOMARY_SYSTEM
+
+from custom_components.wswr_weather.const import DOMAIN
+from custom_components.wswr_weather.derived import (
+    DerivedEngine,
+    DerivedMetric,
+    RollingWindow,
+    parse_metrics,
+)
+from custom_components.wswr_weather.normalize import RecordNormalizer
+
+from .const import MOCK_CONFIG
+from .stub import make_record
+
+START = dt_util.utcnow().replace(second=0, microsecond=0)
+
+
+def test_rolling_window_matches_brute_force():
+    """Test the incremental sum/min/max agree with recomputing the window."""
+    window = RollingWindow(timedelta(minutes=10))
+    rng = random.Random(4)
+    readings = []
+    for minute in range(200):
+        when = START + timedelta(minutes=minute)
+        value = None if minute % 17 == 0 else rng.uniform(-20, 40)
+        window.push(when, value)
+        readings.append((when, value))
+
+        current = [
+            value
+            for at, value in readings
+            if at > when - timedelta(minutes=10) and value is not None
+        ]
+        if not current:
+            assert window.min is None and window.sum == 0
+            continue
+        assert window.sum == pytest.approx(sum(current))
+        assert window.min == min(current)
+        assert window.max == max(current)
+        assert window.first == current[0]
+        assert len(window) == len(current)
+
+
+def _records(key, values):
+    """Build one record a minute with the given values of key, oldest first."""
+    return [
+        make_record(index, START + timedelta(minutes=index), {key: value})
+        for index, value in enumerate(values)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("statistic", "values", "expected"),
+    [
+        ("mean", [1, 2, 3, 4], 3.0),
+        ("sum", [1, 2, 3, 4], 9),
+        ("min", [5, 2, 3, 4], 2),
+        ("max", [1, 9, 3, 4], 9),
+        ("change", [1010, 1011, 1012.5, 1013], 2.0),
+        ("rate", [0.1, 0.2, 0.2, 0.1], 10.0),
+    ],
+)
+def test_engine_statistics(statistic, values, expected):
+    """Test each statistic over a three minute window."""
+    metric = DerivedMetric("airtemp_01mnavg", statistic, timedelta(minutes=3))
+    engine = DerivedEngine([metric])
+
+    engine.add(_records("airtemp_01mnavg", values))
+
+    assert engine.merge({})[metric.key] == pytest.approx(expected)
+
+
+def test_engine_circular_mean():
+    """Test wind directions are averaged on the circle."""
+    metric = DerivedMetric("winddir_01mnavg", "mean", timedelta(minutes=10))
+    engine = DerivedEngine([metric])
+
+    engine.add(_records("winddir_01mnavg", [350, 10, 355, 5] * 3))
+    assert engine.merge({})[metric.key] in (0.0, 360.0)
+    assert metric.descriptor().unit == "°"
+
+    # Records that are not newer than the last one are ignored.
+    engine.add(_records("winddir_01mnavg", [90]))
+    assert engine.merge({})[metric.key] in (0.0, 360.0)
+
+
+def test_engine_waits_for_a_whole_window():
+    """Test a metric is unknown until the records reach back a whole window."""
+    metric = DerivedMetric("rainfal_01mnacc", "sum", timedelta(minutes=10))
+    engine = DerivedEngine([metric])
+    records = _records("rainfal_01mnacc", [0.1] * 11)
+
+    engine.add(records[:10])
+    assert engine.merge({})[metric.key] is None
+
+    engine.add(records[10:])
+    assert engine.merge({})[metric.key] == pytest.approx(1.0)
+
+
+def test_temperature_differences_are_not_temperatures():
+    """Test a change of temperature is published without the temperature class."""
+    change = DerivedMetric("airtemp_01mnavg", "change", timedelta(minutes=60))
+    mean = DerivedMetric("airtemp_01mnavg", "mean", timedelta(minutes=60))
+
+    assert change.descriptor().device_class is None
+    assert change.descriptor().unit == UnitOfTemperature.CELSIUS
+    assert mean.descriptor().device_class == SensorDeviceClass.TEMPERATURE
+
+
+def test_engine_publishes_in_the_units_of_the_source():
+    """Test metrics are converted like the sensors they are derived from."""
+    normalizer = RecordNormalizer(US_CUSTOMARY_SYSTEM)
+    window = timedelta(minutes=3)
+    change = DerivedMetric("airtemp_01mnavg", "change", window)
+    mean = DerivedMetric("airtemp_01mnavg", "mean", window)
+    rate = DerivedMetric("rainfal_01mnacc", "rate", window)
+    engine = DerivedEngine([change, mean, rate], normalizer)
+
+    engine.add(
+        make_record(
+            index,
+            START + timedelta(minutes=index),
+            {"airtemp_01mnavg": 10 + index, "rainfal_01mnacc": 0.254},
+        )
+        for index in range(4)
+    )
+
+    values = engine.merge({})
+    # A rise of 2 °C is a rise of 3.6 °F, not 35.6 °F.
+    assert values[change.key] == pytest.approx(3.6)
+    assert engine.descriptors[change.key].unit == UnitOfTemperature.FAHRENHEIT
+    assert values[mean.key] == pytest.approx(53.6)
+    assert engine.descriptors[mean.key].unit == UnitOfTemperature.FAHRENHEIT
+    # 0.254 mm a minute is 0.6 in an hour.
+    assert values[rate.key] == pytest.approx(0.6)
+    assert engine.descriptors[rate.key].unit == UnitOfVolumetricFlux.INCHES_PER_HOUR
+
+
+def test_parse_metrics():
+    """Test the option text parses into metrics, rejecting bad entries."""
+    assert parse_metrics("presqnh_01mnavg:change:180,\n winddir_01mnavg:mean:10") == [
+        DerivedMetric("presqnh_01mnavg", "change", timedelta(hours=3)),
+        DerivedMetric("winddir_01mnavg", "mean", timedelta(minutes=10)),
+    ]
+    assert parse_metrics("") == []
+    assert parse_metrics(None) == []
+    for text in ("airtemp_01mnavg:median:10", "airtemp_01mnavg:mean", "x:mean:0"):
+        with pytest.raises(ValueError):
+            parse_metrics(text)
+
+
+async def test_derived_sensors(hass):
+    """Test derived sensors are published from the buffered records."""
+    records = _records("rainfal_01mnacc", [0.1] * 60)[::-1]
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data=MOCK_CONFIG,
+        options={"derived_sensors": "rainfal_01mnacc:rate:30"},
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=records,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        state = hass.states.get("sensor.rainfall_1_min_accum_rate_30_min")
+        # 0.1 mm a minute is 6 mm an hour.
+        assert float(state.state) == pytest.approx(6.0)
+        assert state.attributes["unit_of_measurement"] == "mm/h"
+
+        # Dropping the metric from the options removes its sensor.
+        hass.config_entries.async_update_entry(entry, options={})
+        await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.rainfall_1_min_accum_rate_30_min") is None
@@ -0,0 +1,124 @@
+"""Tests for WSWR record key descriptors."""
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.const import DEGREE, UnitOfSpeed
+
+from custom_components.wswr_weather.const import SENSOR_DEADBANDS, SENSOR_NAME_MAPPING
+from custom_components.wswr_weather.descriptors import (
+    SensorSelection,
+    describe_sensor_key,
+    format_deadbands,
+    parse_deadbands,
+    publish_intervals,
+    sensor_deadbands,
+)
+
+
+def test_parses_key_grammar():
+    """Test the quantity, window and statistic are parsed from the key."""
+    descriptor = describe_sensor_key("rainfal_07dyacc")
+
+    assert descriptor.quantity == "rainfal"
+    assert descriptor.window == timedelta(days=7)
+    assert descriptor.statistic == "acc"
+    assert descriptor.state_class == SensorStateClass.TOTAL_INCREASING
+    assert describe_sensor_key("rainfal_07dyacc") is descriptor
+
+
+@pytest.mark.parametrize(
+    "sensor_key,device_class,unit",
+    [
+        ("wndcwm__01mnmax", "wind_speed", UnitOfSpeed.KNOTS),
+        ("wndccwm_01hrmax", "wind_speed", UnitOfSpeed.KNOTS),
+        ("wndgstm_01hrdir", "wind_direction", DEGREE),
+        ("windrun_01hracc", "distance", "km"),
+    ],
+)
+def test_previously_conflicting_keys(sensor_key, device_class, unit):
+    """Test keys the substring cascade misclassified."""
+    descriptor = describe_sensor_key(sensor_key)
+
+    assert descriptor.device_class == device_class
+    assert descriptor.unit == unit
+
+
+def test_names():
+    """Test mapped names win and other keys get a generated name."""
+    for sensor_key, name in SENSOR_NAME_MAPPING.items():
+        assert describe_sensor_key(sensor_key).name == name
+
+    assert describe_sensor_key("airtemp_10mnmax").name == "Air Temperature (10-min Max)"
+    assert describe_sensor_key("windgst_10mndir").name == "Wind Gust Direction (10-min)"
+    assert describe_sensor_key("unknown_sensor").name == "Weather Station unknown_sensor"
+
+
+@pytest.mark.parametrize(
+    ("key", "long_tail"),
+    [
+        ("wnddirm_01mnavg", True),
+        ("wndcwm__01hrmax", True),
+        ("windspd_10mnavg", True),
+        ("windspd_01mnavg", False),
+        ("rainfal_24hracc", False),
+        ("id", False),
+    ],
+)
+def test_long_tail(key, long_tail):
+    """Test the rarely used variants are recognised."""
+    assert describe_sensor_key(key).long_tail is long_tail
+
+
+@pytest.mark.parametrize(
+    ("key", "quantity_group", "window_group"),
+    [
+        ("windgst_01mnmax", "windgst", "mn"),
+        ("airtemp_10mnmax", "airtemp", "mn"),
+        ("presqnh_01hrmax", "presqnh", "hr"),
+        ("rainfal_24hracc", "rainfal", "dy"),
+        ("rainfal_07dyacc", "rainfal", "dy"),
+        ("wvpk2ht_xxmnavg", "other", "mn"),
+        ("unknown_sensor", "other", "mn"),
+    ],
+)
+def test_groups(key, quantity_group, window_group):
+    """Test keys are grouped by quantity and by the unit of their window."""
+    descriptor = describe_sensor_key(key)
+
+    assert descriptor.quantity_group == quantity_group
+    assert descriptor.window_group == window_group
+
+
+def test_selection():
+    """Test the default selection and one read from options."""
+    default = SensorSelection.from_config({})
+    assert default.includes(describe_sensor_key("airtemp_01mnavg"))
+    assert not default.includes(describe_sensor_key("power_v_01mnavg"))
+    assert not default.includes(describe_sensor_key("wvpk2ht_xxmnavg"))
+
+    selection = SensorSelection.from_config({"quantities": ["rainfal"], "windows": ["dy"]})
+    assert selection.includes(describe_sensor_key("rainfal_07dyacc"))
+    assert not selection.includes(describe_sensor_key("rainfal_01hracc"))
+    assert not selection.includes(describe_sensor_key("airtemp_07dyavg"))
+
+    assert publish_intervals({"publish_interval_hr": 600, "publish_interval_mn": 0}) == {
+        "hr": 600
+    }
+
+
+def test_sensor_deadbands():
+    """Test deadbands default until set, and parse from the option text."""
+    assert sensor_deadbands({}) == SENSOR_DEADBANDS
+    assert parse_deadbands(format_deadbands(SENSOR_DEADBANDS)) == SENSOR_DEADBANDS
+    # An empty option turns them off.
+    assert sensor_deadbands({"sensor_deadbands": ""}) == {}
+    text = "airtemp_01mnavg:0.5,\n windspd_01mnavg:1"
+    assert sensor_deadbands({"sensor_deadbands": text}) == {
+        "airtemp_01mnavg": 0.5,
+        "windspd_01mnavg": 1.0,
+    }
+    for text in ("airtemp_01mnavg", "airtemp_01mnavg:x", ":0.5", "airtemp_01mnavg:0"):
+        with pytest.raises(ValueError):
+            parse_deadbands(text)
@@ -0,0 +1,87 @@
+"""Tests for poll instrumentation and diagnostics."""
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.util import dt as dt_util
+
+from custom_components.wswr_weather.const import DOMAIN
+from custom_components.wswr_weather.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.wswr_weather.instrumentation import Samples
+
+from .const import MOCK_CONFIG
+from .stub import StubWSWRApi
+
+
+@pytest.fixture
+async def stub_api(socket_enabled):
+    """Run a local stub of the WSWR API."""
+    api = StubWSWRApi()
+    await api.start()
+    yield api
+    await api.stop()
+
+
+def test_samples_percentiles():
+    """Test percentiles are nearest-rank over the kept samples."""
+    samples = Samples(maxlen=100)
+    for value in range(1, 201):
+        samples.add(value / 1000)
+    samples.add(None)
+
+    assert len(samples) == 100
+    assert samples.percentile(50) == 0.15
+    assert samples.summary(1000) == {
+        "count": 100,
+        "last": 200.0,
+        "p50": 150.0,
+        "p90": 190.0,
+        "p99": 199.0,
+        "max": 200.0,
+    }
+    assert Samples().summary() == {"count": 0}
+
+
+async def test_diagnostics(hass, stub_api):
+    """Test polls are timed and failures are counted by class."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, version=2, data=dict(MOCK_CONFIG, api_url=stub_api.url)
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    stub_api.fail_status = 503
+    with patch("custom_components.wswr_weather.client.backoff_delay", return_value=0):
+        async_fire_time_changed(hass, dt_util.utcnow() + coordinator.update_interval)
+        await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["entry"]["data"]["api_url"] == REDACTED
+    # The failed poll was tried three times.
+    assert diagnostics["client"]["retries"] == 2
+    assert diagnostics["endpoints"] == [{"circuit": "open", "failures": 3}]
+    polls = diagnostics["polls"]
+    assert polls["latency_ms"]["ttfb"]["count"] == 4
+    # Only the first request opened a connection.
+    assert polls["latency_ms"]["connect"]["count"] == 1
+    assert polls["payload_bytes"]["count"] == 1
+    assert polls["decode_ms"]["count"] == 1
+    # The new record and the failure, which marked it stale, reached the entities.
+    assert polls["fan_out_ms"]["count"] == 2
+    assert polls["record_age_s"] is not None
+    assert polls["outcomes"] == {"success": 1, "failure": 1}
+    assert polls["errors"] == {"HTTP 503": 1}
+    assert diagnostics["buffer"]["records"] == 60
+
+    state = hass.states.get("sensor.weather_station_poll_failures")
+    assert state.state == "1"
+    assert state.attributes["errors"] == {"HTTP 503": 1}
@@ -0,0 +1,198 @@
+"""Tests for exporting records to a time-series sink."""
+import asyncio
+from http import HTTPStatus
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.wswr_weather.const import DOMAIN
+from custom_components.wswr_weather.export import (
+    CSV,
+    LINE_PROTOCOL,
+    RecordExporter,
+    render_csv,
+    render_line_protocol,
+)
+
+from .const import MOCK_CONFIG, MOCK_RECORD
+
+SINK_URL = "http://sink.local:8086/write"
+
+
+def _records(count: int) -> list[dict]:
+    """Return count consecutive records, oldest first."""
+    return [
+        dict(MOCK_RECORD, id=1000 + minute, record_time=f"2024-05-01T10:{minute:02}:00")
+        for minute in range(count)
+    ]
+
+
+def test_render_line_protocol():
+    """Test each record becomes one line, with missing readings left out."""
+    record = dict(MOCK_RECORD, dewtemp_01mnavg=None)
+
+    (line,) = render_line_protocol([record], "Home Bay").splitlines()
+
+    tags, fields, timestamp = line.rsplit(" ", 2)
+    assert tags == "wswr,station=Home\\ Bay"
+    assert fields.startswith('airtemp_01mnavg=12.4,relhumd_01mnavg=75.0,')
+    assert 'windgst_01hrtim="09:42"' in fields
+    assert "winddir_01mnavg=310.0" in fields
+    assert "dewtemp" not in fields
+    assert "id=" not in fields
+    # 10:00 US/Pacific, in nanoseconds.
+    assert timestamp == "1714582800000000000"
+
+
+def test_render_csv():
+    """Test a header goes before the first row and wherever the keys change."""
+    first, second = _records(2)
+    third = dict(second, id=1002, record_time="2024-05-01T10:02:00", solradn_01mnavg=512.0)
+
+    text, columns = render_csv([first, second, third], "Home Bay")
+
+    lines = text.splitlines()
+    assert len(lines) == 5
+    assert lines[0].startswith("time,station,airtemp_01mnavg,")
+    assert lines[1].startswith("2024-05-01T17:00:00+00:00,Home Bay,12.4,")
+    assert lines[3].endswith(",solradn_01mnavg")
+    assert columns[-1] == "solradn_01mnavg"
+    # Rows continuing the last header get none.
+    assert render_csv([third], "Home Bay", columns)[0].count("\n") == 1
+
+
+async def test_flush_by_size_then_on_stop(hass, tmp_path):
+    """Test full batches are written at once and the rest when stopping."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    path = tmp_path / "wswr.lp"
+    exporter = RecordExporter(
+        hass, str(path), LINE_PROTOCOL, "station", batch_size=2, flush_interval=60
+    )
+    exporter.async_start(entry)
+
+    exporter.async_export(_records(3))
+    await hass.async_block_till_done()
+    assert len(path.read_text().splitlines()) == 2
+    assert exporter.stats.batches == 1
+
+    await exporter.async_stop()
+    assert len(path.read_text().splitlines()) == 3
+    assert exporter.stats.rows == 3
+
+
+async def test_flush_by_time(hass, tmp_path):
+    """Test a partial batch is written once the flush interval has passed."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    path = tmp_path / "wswr.csv"
+    exporter = RecordExporter(hass, str(path), CSV, "station", flush_interval=0.01)
+    exporter.async_start(entry)
+
+    exporter.async_export(_records(1))
+    await asyncio.sleep(0.05)
+    await hass.async_block_till_done()
+
+    assert len(path.read_text().splitlines()) == 2
+    await exporter.async_stop()
+
+
+async def test_csv_continues_the_header_of_the_file(hass, tmp_path):
+    """Test a restarted exporter does not repeat the header of the file."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    path = tmp_path / "wswr.csv"
+    records = _records(2)
+
+    for record in records:
+        exporter = RecordExporter(hass, str(path), CSV, "station")
+        exporter.async_export([record])
+        await exporter.async_stop()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 3
+    assert lines[0].startswith("time,station,")
+
+
+async def test_full_queue_drops_oldest(hass, tmp_path):
+    """Test a sink that falls behind costs the oldest records, not the poll."""
+    exporter = RecordExporter(
+        hass, str(tmp_path / "wswr.lp"), LINE_PROTOCOL, "station", queue_size=2
+    )
+
+    exporter.async_export(_records(3))
+
+    assert exporter.stats.dropped == 1
+    assert exporter.queue.get_nowait()["id"] == 1001
+
+
+async def test_http_sink(hass, aioclient_mock):
+    """Test a batch is POSTed as one request, and failed batches are counted."""
+    aioclient_mock.post(SINK_URL, status=HTTPStatus.NO_CONTENT)
+    exporter = RecordExporter(hass, SINK_URL, LINE_PROTOCOL, "station")
+
+    exporter.async_export(_records(3))
+    await exporter.async_stop()
+
+    assert aioclient_mock.call_count == 1
+    assert aioclient_mock.mock_calls[0][2].decode().count("\n") == 3
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(SINK_URL, status=HTTPStatus.INTERNAL_SERVER_ERROR)
+    exporter.async_export(_records(2))
+    await exporter.async_stop()
+
+    assert exporter.stats.failures == 1
+    assert exporter.stats.dropped == 2
+
+
+async def test_exports_records_of_the_entry(hass, tmp_path):
+    """Test the fetched records are exported and flushed when the entry unloads."""
+    path = tmp_path / "wswr.lp"
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data=MOCK_CONFIG,
+        options={"export_target": str(path)},
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=list(reversed(_records(3))),
+    ) as get_data:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        await coordinator.async_refresh()
+        # Older records are exported in full, so are not cut to the sensors' keys.
+        assert get_data.call_args.args[1] is None
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    timestamps = [line.rsplit(" ", 1)[1] for line in path.read_text().splitlines()]
+    # Oldest first.
+    assert len(timestamps) == 3
+    assert timestamps == sorted(timestamps)
+
+
+async def test_cancelled_batch_is_not_sent_again(hass, aioclient_mock):
+    """Test a batch whose POST is cancelled on stop is dropped, not re-sent."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    sent = asyncio.Event()
+
+    async def hang(method, url, data):
+        sent.set()
+        await asyncio.Event().wait()
+
+    aioclient_mock.post(SINK_URL, side_effect=hang)
+    exporter = RecordExporter(hass, SINK_URL, LINE_PROTOCOL, "station", batch_size=2)
+    exporter.async_start(entry)
+
+    exporter.async_export(_records(2))
+    await sent.wait()
+    await exporter.async_stop()
+
+    assert aioclient_mock.call_count == 1
+    assert exporter.stats.dropped == 2
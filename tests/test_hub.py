@@ -0,0 +1,116 @@
+"""Tests for the WSWR Weather Station hub."""
+import asyncio
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.wswr_weather.client import WeatherStationClient
+from custom_components.wswr_weather.const import DOMAIN
+from custom_components.wswr_weather.hub import (
+    MAX_CONCURRENT_REQUESTS,
+    async_get_hub,
+)
+
+from .stub import StubWSWRApi
+
+STATIONS = 50
+
+
+async def test_fifty_stations(hass, socket_enabled):
+    """Test many stations share a bounded pool and poll at spread-out times."""
+    api = StubWSWRApi(latency=0.01)
+    await api.start()
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            version=2,
+            data={"api_url": api.station_url(station), "interval": 60},
+        )
+        for station in range(STATIONS)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+
+    await asyncio.gather(
+        *(hass.config_entries.async_setup(entry.entry_id) for entry in entries)
+    )
+    await hass.async_block_till_done()
+
+    assert len(api.requests) == STATIONS
+    assert api.max_active <= MAX_CONCURRENT_REQUESTS
+    hub = async_get_hub(hass)
+    assert len(hub.coordinators) == STATIONS
+    # Every station polls the same host through one session.
+    assert [pooled.users for pooled in hub.sessions.values()] == [STATIONS]
+
+    # Step through the next cycle and note when each station polled.
+    api.publish()
+    start = dt_util.utcnow()
+    arrivals: dict[str, float] = {}
+    for step in range(1, 300):
+        seen = len(api.requests)
+        async_fire_time_changed(hass, start + timedelta(seconds=step / 2))
+        await hass.async_block_till_done()
+        for request in api.requests[seen:]:
+            arrivals.setdefault(request.match_info["station"], step / 2)
+
+    assert len(arrivals) == STATIONS
+    assert api.max_active <= MAX_CONCURRENT_REQUESTS
+    # Polls are spread across half the interval instead of all at once.
+    assert max(arrivals.values()) - min(arrivals.values()) >= 25
+    per_second = Counter(int(arrival) for arrival in arrivals.values())
+    assert max(per_second.values()) <= 3
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    assert hub.sessions == {}
+    await api.stop()
+
+
+async def test_identical_requests_are_combined(hass, socket_enabled):
+    """Test clients polling the same URL at once share a single request."""
+    api = StubWSWRApi(latency=0.05)
+    await api.start()
+    hub = async_get_hub(hass)
+    clients = [WeatherStationClient(hub, api.url) for _ in range(3)]
+
+    results = await asyncio.gather(*(client.async_get_data() for client in clients))
+
+    assert len(api.requests) == 1
+    assert [len(records) for records in results] == [60, 60, 60]
+    assert [client.stats.requests for client in clients] == [1, 1, 1]
+
+    for client in clients:
+        client.async_close()
+    await api.stop()
+
+
+async def test_cancelled_request_fails_joiners(hass, socket_enabled):
+    """Test cancelling a request fails the requests that joined it, not cancels them."""
+    api = StubWSWRApi(latency=0.2)
+    await api.start()
+    hub = async_get_hub(hass)
+    session = hub.async_acquire_session(api.url)
+
+    first = asyncio.create_task(hub.async_request(session, api.url, {}))
+    await asyncio.sleep(0.05)
+    joiner = asyncio.create_task(hub.async_request(session, api.url, {}))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    with pytest.raises(TimeoutError):
+        await joiner
+
+    # Let the stub finish the abandoned response before stopping it.
+    await asyncio.sleep(api.latency)
+    hub.async_release_session(api.url)
+    await api.stop()
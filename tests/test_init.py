@@ -1,9 +1,136 @@
 """Test component setup."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.helpers import entity_registry as er
 from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
 
 from custom_components.wswr_weather.const import DOMAIN
+from custom_components.wswr_weather.hub import async_get_hub
+
+from .const import MOCK_CONFIG, MOCK_RECORD
 
 
 async def test_async_setup(hass):
     """Test the component gets setup."""
     assert await async_setup_component(hass, DOMAIN, {}) is True
+
+
+async def test_reload_does_not_leak_sessions(hass):
+    """Test repeated reloads reuse one pooled session and release it on unload."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=[dict(MOCK_RECORD)],
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        seen_sessions = set()
+        for _ in range(20):
+            sessions = async_get_hub(hass).sessions
+            assert len(sessions) == 1
+            (pooled,) = sessions.values()
+            assert pooled.users == 1
+            seen_sessions.add(pooled.session)
+
+            assert await hass.config_entries.async_reload(entry.entry_id)
+            await hass.async_block_till_done()
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert async_get_hub(hass).sessions == {}
+    assert all(session.closed for session in seen_sessions)
+
+
+async def test_entries_share_session_per_host(hass):
+    """Test entries polling the same host share a single session."""
+    entries = [
+        MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG),
+        MockConfigEntry(domain=DOMAIN, version=2, data=dict(MOCK_CONFIG, interval=300)),
+    ]
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=[dict(MOCK_RECORD)],
+    ):
+        for entry in entries:
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        sessions = async_get_hub(hass).sessions
+        assert len(sessions) == 1
+        (pooled,) = sessions.values()
+        assert pooled.users == 2
+
+        assert await hass.config_entries.async_unload(entries[0].entry_id)
+        assert not pooled.session.closed
+        assert await hass.config_entries.async_unload(entries[1].entry_id)
+        assert pooled.session.closed
+
+
+async def test_migrate_interval_to_seconds(hass):
+    """Test version 1 entries have their minute interval converted to seconds."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, version=1, data=dict(MOCK_CONFIG, interval=2), options={"interval": 5}
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=[dict(MOCK_RECORD)],
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.version == 2
+    assert entry.data["interval"] == 120
+    assert entry.options["interval"] == 300
+
+
+async def test_options_update_applies_in_place(hass):
+    """Test changing options keeps the coordinator and entities, syncing keys."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    record = dict(MOCK_RECORD)
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        side_effect=lambda *args, **kwargs: [dict(record)],
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        states = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+        # The next record gains one key and drops another.
+        record.update(id=1001, record_time="2024-05-01T10:01:00", solradn_01mnavg=512.0)
+        del record["dewtemp_01mnavg"]
+        hass.config_entries.async_update_entry(entry, options={"interval": 300})
+        await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][entry.entry_id]["coordinator"] is coordinator
+    assert coordinator.scheduler.interval == timedelta(seconds=300)
+    assert hass.states.get("sensor.solar_radiation_1_min_avg").state == "512.0"
+    assert hass.states.get("sensor.dew_point_1_min_avg") is None
+    assert er.async_get(hass).async_get("sensor.dew_point_1_min_avg") is None
+    # Only the added and removed sensors changed state, and the weather entity,
+    # which lost its dew point; none went unavailable. The diagnostic sensors
+    # move with every publish.
+    assert {
+        event.data["entity_id"]
+        for event in states
+        if not event.data["entity_id"].startswith("sensor.weather_station_")
+    } == {
+        "sensor.solar_radiation_1_min_avg",
+        "sensor.dew_point_1_min_avg",
+        "weather.weather_station",
+    }
@@ -0,0 +1,105 @@
+"""Tests for normalising record values."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from homeassistant.const import UnitOfLength, UnitOfPressure, UnitOfTemperature
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import PressureConverter
+from homeassistant.util.unit_system import METRIC_SYSTEM, US_CUSTOMARY_SYSTEM
+
+from custom_components.wswr_weather.normalize import (
+    RecordNormalizer,
+    parse_event_time,
+)
+
+from .const import MOCK_RECORD
+
+
+def _local(value: str) -> datetime:
+    """Return a naive local time as an aware UTC datetime."""
+    return dt_util.as_utc(dt_util.parse_datetime(value))
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("09:42", "2024-05-01T09:42:00"),
+        ("09:42:30", "2024-05-01T09:42:30"),
+        # A time later in the day than the record happened the day before.
+        ("23:55", "2024-04-30T23:55:00"),
+        ("2024-05-01T08:00:00", "2024-05-01T08:00:00"),
+    ],
+)
+def test_parse_event_time(value, expected):
+    """Test event times become the latest such time at or before the record."""
+    record_time = _local("2024-05-01T10:00:00")
+
+    assert parse_event_time(value, record_time) == _local(expected)
+
+
+def test_parse_event_time_invalid():
+    """Test event times that do not parse are unknown."""
+    assert parse_event_time("soon", _local("2024-05-01T10:00:00")) is None
+    assert parse_event_time("09:42", None) is None
+    assert parse_event_time(942, None) is None
+
+
+def test_normalize_metric():
+    """Test values are typed and checked, keeping the native metric units."""
+    normalizer = RecordNormalizer(METRIC_SYSTEM)
+    record = dict(
+        MOCK_RECORD,
+        airtemp_01mnavg="12.4",
+        relhumd_01mnavg=104.0,
+        presqnh_01hrmax=-9999,
+        winddir_01mnavg=310,
+        windspd_01mnavg=True,
+    )
+
+    normalized = normalizer.normalize(record)
+
+    assert normalized["id"] == 1000
+    assert normalized["record_time"] == _local("2024-05-01T10:00:00")
+    assert normalized["windgst_01hrtim"] == _local("2024-05-01T09:42:00")
+    assert normalized["airtemp_01mnavg"] == 12.4
+    assert normalized["winddir_01mnavg"] == 310
+    # Implausible readings, sentinels and non-numbers are unknown.
+    assert normalized["relhumd_01mnavg"] is None
+    assert normalized["presqnh_01hrmax"] is None
+    assert normalized["windspd_01mnavg"] is None
+    # Unknown quantities pass as they are.
+    assert normalized["wvpk2ht_xxmnavg"] == 0.0
+    assert normalizer.describe("presqnh_01hrmax").unit == UnitOfPressure.HPA
+
+
+def test_normalize_us_customary():
+    """Test readings are converted to the units of the unit system."""
+    normalizer = RecordNormalizer(US_CUSTOMARY_SYSTEM)
+
+    normalized = normalizer.normalize(MOCK_RECORD)
+
+    assert normalized["airtemp_01mnavg"] == pytest.approx(54.32)
+    assert normalized["rainfal_24hracc"] == pytest.approx(4.6 / 25.4)
+    assert normalizer.describe("airtemp_01mnavg").unit == UnitOfTemperature.FAHRENHEIT
+    assert normalizer.describe("rainfal_24hracc").unit == UnitOfLength.INCHES
+    # Readings are checked against their native range before conversion.
+    assert normalizer.normalize(dict(MOCK_RECORD, airtemp_01mnavg=61))[
+        "airtemp_01mnavg"
+    ] is None
+    assert normalized["record_time"] - normalized["windgst_01hrtim"] == timedelta(
+        minutes=18
+    )
+
+
+def test_convert_step():
+    """Test differences of native values are converted without any offset."""
+    normalizer = RecordNormalizer(US_CUSTOMARY_SYSTEM)
+
+    assert normalizer.convert_step("airtemp_01mnavg", 0.2) == pytest.approx(0.36)
+    assert normalizer.convert_step("presqnh_01mnavg", 0.2) == pytest.approx(
+        PressureConverter.convert(
+            0.2, UnitOfPressure.HPA, normalizer.describe("presqnh_01mnavg").unit
+        )
+    )
+    assert RecordNormalizer(METRIC_SYSTEM).convert_step("airtemp_01mnavg", 0.2) == 0.2
@@ -0,0 +1,75 @@
+"""Tests for records pushed to the webhook."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.webhook import async_handle_webhook
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.util import dt as dt_util
+from homeassistant.util.aiohttp import MockRequest
+from homeassistant.helpers.json import json_dumps
+
+from custom_components.wswr_weather.const import DOMAIN
+
+from .const import MOCK_CONFIG, MOCK_RECORD
+from .stub import make_record
+
+WEBHOOK_ID = "wswr_test_webhook"
+
+
+async def _async_post(hass, payload):
+    """POST a payload to the webhook, as the HTTP view would."""
+    if not isinstance(payload, bytes):
+        payload = json_dumps(payload).encode()
+    request = MockRequest(payload, mock_source="test", method="POST")
+    return await async_handle_webhook(hass, WEBHOOK_ID, request)
+
+
+async def test_pushed_records_update_entities(hass):
+    """Test a POSTed record is published at once and delays the next poll."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data=MOCK_CONFIG,
+        options={"push": True, CONF_WEBHOOK_ID: WEBHOOK_ID},
+    )
+    entry.add_to_hass(hass)
+    now = dt_util.utcnow().replace(second=0, microsecond=0)
+    records = [make_record(2, now), make_record(1, now - timedelta(minutes=1))]
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=records,
+    ) as get_data:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+        pushed = make_record(
+            3, now + timedelta(minutes=1), dict(MOCK_RECORD, airtemp_01mnavg=15.0)
+        )
+        response = await _async_post(hass, pushed)
+        assert response.status == 204
+        await hass.async_block_till_done()
+        assert get_data.await_count == 1
+
+        assert hass.states.get("sensor.air_temperature_1_min_avg").state == "15.0"
+        assert coordinator.stats.outcomes["push"] == 1
+        # Polling waits for two missed pushes before it takes over again.
+        assert coordinator.update_interval == timedelta(minutes=2)
+
+        # Repeated records are accepted but not published again.
+        response = await _async_post(hass, [records[0]])
+        assert response.status == 204
+        assert coordinator.stats.outcomes["push"] == 1
+
+        response = await _async_post(hass, b"{")
+        assert response.status == 400
+
+        # Turning push off stops accepting records.
+        hass.config_entries.async_update_entry(entry, options={"push": False})
+        await hass.async_block_till_done()
+        await _async_post(hass, make_record(4, now + timedelta(minutes=2)))
+        assert coordinator.stats.outcomes["push"] == 1
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
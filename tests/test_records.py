@@ -0,0 +1,88 @@
+"""Tests for compact WSWR records."""
+import json
+
+import pytest
+
+from custom_components.wswr_weather.records import (
+    Record,
+    coerce_value,
+    compact_record,
+    decode_records,
+)
+
+from .const import MOCK_RECORD
+
+
+@pytest.mark.parametrize(
+    ("key", "value", "expected"),
+    [
+        ("airtemp_01mnavg", 12.4, 12.4),
+        ("airtemp_01mnavg", "12.4", 12.4),
+        ("winddir_01mnavg", 310, 310),
+        ("airtemp_01mnavg", "", None),
+        ("airtemp_01mnavg", "---", None),
+        ("airtemp_01mnavg", "NaN", None),
+        ("airtemp_01mnavg", -9999, None),
+        ("airtemp_01mnavg", "-9999", None),
+        ("airtemp_01mnavg", None, None),
+        ("windgst_01hrtim", "09:42", "09:42"),
+        ("record_time", "2024-05-01T10:00:00", "2024-05-01T10:00:00"),
+        # Identity values are never treated as missing readings.
+        ("id", 9999, 9999),
+        ("id", "NA", "NA"),
+        ("unknown", "text", "text"),
+    ],
+)
+def test_coerce_value(key, value, expected):
+    """Test values are coerced once at decode time."""
+    assert coerce_value(key, value) == expected
+
+
+def test_decode_keeps_sentinel_ids():
+    """Test a record whose id looks like a sentinel keeps it as its dedup key."""
+    (record,) = decode_records(json.dumps([dict(MOCK_RECORD, id=9999)]))
+
+    assert record["id"] == 9999
+    assert record["airtemp_01mnavg"] == 12.4
+
+
+def test_record_behaves_like_a_dict():
+    """Test a record is a read-only mapping equal to the dict it came from."""
+    record = compact_record(MOCK_RECORD)
+
+    assert isinstance(record, Record)
+    assert record == MOCK_RECORD
+    assert dict(record) == MOCK_RECORD
+    assert record["airtemp_01mnavg"] == 12.4
+    assert record.get("missing") is None
+    assert "id" in record
+    assert record.keys() ^ MOCK_RECORD.keys() == set()
+    # Records with the same keys share one schema.
+    assert compact_record(dict(MOCK_RECORD, id=2)).schema is record.schema
+
+
+def test_decode_projects_history():
+    """Test older records keep only the requested fields."""
+    payload = json.dumps([dict(MOCK_RECORD, id=2), dict(MOCK_RECORD, id=1)]).encode()
+
+    newest, older = decode_records(payload, {"airtemp_01mnavg"})
+
+    assert newest == dict(MOCK_RECORD, id=2)
+    assert dict(older) == {
+        "id": 1,
+        "record_time": MOCK_RECORD["record_time"],
+        "airtemp_01mnavg": 12.4,
+    }
+
+
+def test_decode_stops_at_limit():
+    """Test decoding with a limit never parses past the limit."""
+    records = [dict(MOCK_RECORD, id=record_id) for record_id in (3, 2, 1)]
+    # Everything after the second record is malformed, and never read.
+    payload = (json.dumps(records)[:-1] + ", {broken").encode()
+
+    assert [record["id"] for record in decode_records(payload, limit=2)] == [3, 2]
+    assert [record["id"] for record in decode_records(b" [ ] ", limit=2)] == []
+    assert decode_records(json.dumps(MOCK_RECORD), limit=2) == [MOCK_RECORD]
+    with pytest.raises(ValueError):
+        decode_records(payload)
@@ -0,0 +1,44 @@
+"""Tests for retry backoff and circuit breaking."""
+import random
+
+from custom_components.wswr_weather.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    backoff_delay,
+)
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    """Test delays are spread below an exponential, capped bound."""
+    rng = random.Random(0)
+    for attempt, bound in ((1, 1), (2, 2), (3, 4), (8, 10)):
+        delays = [backoff_delay(attempt, rng=rng) for _ in range(100)]
+        assert all(0 <= delay <= bound for delay in delays)
+        assert max(delays) > bound / 2
+        assert len(set(delays)) == 100
+
+
+def test_circuit_breaker():
+    """Test the circuit opens on repeated failures and probes after a timeout."""
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    for now in range(3):
+        assert breaker.allow(now)
+        breaker.record_failure(now)
+    assert breaker.state == OPEN
+    assert not breaker.allow(30)
+
+    # One probe after the timeout; a failed probe reopens the circuit at once.
+    assert breaker.allow(62)
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow(62)
+    breaker.record_failure(63)
+    assert breaker.state == OPEN
+    assert not breaker.allow(100)
+
+    assert breaker.allow(123)
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow(124)
@@ -0,0 +1,63 @@
+"""Tests for the WSWR Weather Station adaptive scheduler."""
+from datetime import datetime, timedelta
+
+from custom_components.wswr_weather.scheduler import AdaptiveScheduler
+
+MINUTE = timedelta(minutes=1)
+RECORD_TIME = datetime(2024, 5, 1, 10, 0)
+
+
+def test_aligns_to_record_cadence():
+    """Test polls are planned just after the next record is expected."""
+    scheduler = AdaptiveScheduler(MINUTE)
+
+    # The record was seen 40 seconds after its timestamp.
+    delay = scheduler.new_data(RECORD_TIME + timedelta(seconds=40), RECORD_TIME, MINUTE)
+    assert delay == timedelta(seconds=62)
+
+    # A faster sighting teaches a shorter publish lag.
+    next_time = RECORD_TIME + MINUTE
+    delay = scheduler.new_data(next_time + timedelta(seconds=5), next_time, MINUTE)
+    assert scheduler.lag == timedelta(seconds=5)
+    assert delay == timedelta(seconds=62)
+
+    poll = next_time + timedelta(seconds=5) + delay
+    assert poll - (next_time + MINUTE) == timedelta(seconds=7)
+
+
+def test_never_polls_faster_than_interval():
+    """Test a long interval skips to the first expected record after it."""
+    scheduler = AdaptiveScheduler(timedelta(minutes=5))
+
+    delay = scheduler.new_data(RECORD_TIME, RECORD_TIME, MINUTE)
+    assert delay == timedelta(minutes=5, seconds=2)
+
+
+def test_sub_minute_interval_follows_cadence():
+    """Test a short interval does not poll more often than records appear."""
+    scheduler = AdaptiveScheduler(timedelta(seconds=10))
+
+    delay = scheduler.new_data(RECORD_TIME, RECORD_TIME, MINUTE)
+    assert delay == timedelta(seconds=62)
+
+
+def test_backoff():
+    """Test failures and empty polls back off exponentially up to a cap."""
+    scheduler = AdaptiveScheduler(MINUTE)
+
+    assert [scheduler.failed() for _ in range(5)] == [
+        MINUTE,
+        MINUTE * 2,
+        MINUTE * 4,
+        MINUTE * 8,
+        MINUTE * 8,
+    ]
+    assert [scheduler.no_new_data() for _ in range(3)] == [
+        timedelta(seconds=15),
+        timedelta(seconds=30),
+        timedelta(seconds=60),
+    ]
+    assert scheduler.failures == 0
+
+    scheduler.new_data(RECORD_TIME, RECORD_TIME, MINUTE)
+    assert scheduler.misses == 0
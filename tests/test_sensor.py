@@ -1,4 +1,5 @@
 """Tests for the WSWR Weather Station sensor."""
+from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -7,6 +8,7 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import (
+    EVENT_STATE_CHANGED,
     UnitOfTemperature,
     UnitOfPressure,
     UnitOfSpeed,
@@ -16,7 +18,26 @@ from homeassistant.const import (
     PERCENTAGE,
     DEGREE,
 )
-from custom_components.wswr_weather.sensor import get_sensor_properties, WeatherStationSensor
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.wswr_weather.const import (
+    CONF_INTERVAL,
+    DOMAIN,
+    SENSOR_DEADBANDS,
+)
+from custom_components.wswr_weather.coordinator import WeatherStationCoordinator
+from custom_components.wswr_weather.sensor import (
+    get_sensor_properties,
+    WeatherStationSensor,
+)
+
+from .const import MOCK_CONFIG, MOCK_RECORD
 
 @pytest.mark.parametrize(
     "sensor_key,expected_props",
@@ -32,7 +53,7 @@ from custom_components.wswr_weather.sensor import get_sensor_properties, Weather
         ("power_v_01mnavg", {"device_class": SensorDeviceClass.VOLTAGE, "unit": UnitOfElectricPotential.VOLT, "state_class": SensorStateClass.MEASUREMENT}),
         ("windrun_01hracc", {"device_class": "distance", "unit": UnitOfLength.KILOMETERS, "state_class": SensorStateClass.TOTAL_INCREASING}),
         # Specific cases
-        ("windgst_01hrtim", {}),  # Time string
+        ("windgst_01hrtim", {"device_class": SensorDeviceClass.TIMESTAMP}),  # Event time
         ("windgst_01hrdir", {"device_class": "wind_direction", "unit": DEGREE}),
         ("windcw__10mnmax", {"device_class": "wind_speed", "unit": UnitOfSpeed.KNOTS, "state_class": SensorStateClass.MEASUREMENT}),
         ("unknown_sensor", {}),
@@ -56,3 +77,251 @@ async def test_sensor_entity(hass):
     assert sensor.device_class == SensorDeviceClass.TEMPERATURE
     assert sensor.native_unit_of_measurement == UnitOfTemperature.CELSIUS
     assert sensor.state_class == SensorStateClass.MEASUREMENT
+
+
+async def test_one_fetch_per_interval(hass):
+    """Test setup and each interval cost a single fetch regardless of sensor count."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=[dict(MOCK_RECORD)],
+    ) as mock_fetch:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        sensor_count = len(hass.states.async_entity_ids("sensor"))
+        # Plus the diagnostic sensors enabled by default.
+        assert sensor_count == len(MOCK_RECORD) - 4 + 2
+        assert mock_fetch.call_count == 1
+
+        for interval in range(1, 6):
+            async_fire_time_changed(
+                hass, dt_util.utcnow() + timedelta(seconds=CONF_INTERVAL * interval)
+            )
+            await hass.async_block_till_done()
+
+        assert mock_fetch.call_count == 6
+
+
+async def test_only_changed_sensors_write_state(hass):
+    """Test a cycle only writes state for the sensors whose value changed."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+
+    next_record = dict(
+        MOCK_RECORD, id=1001, record_time="2024-05-01T10:01:00", airtemp_01mnavg=12.6
+    )
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        side_effect=[[dict(MOCK_RECORD)], [next_record], [next_record]],
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        events = async_capture_events(hass, EVENT_STATE_CHANGED)
+        for interval in (1, 2):
+            async_fire_time_changed(
+                hass, dt_util.utcnow() + timedelta(seconds=CONF_INTERVAL * interval)
+            )
+            await hass.async_block_till_done()
+
+    # The weather entity reads the air temperature too; the diagnostic sensors
+    # move with every publish.
+    assert [
+        event.data["entity_id"]
+        for event in events
+        if not event.data["entity_id"].startswith("sensor.weather_station_")
+    ] == [
+        "sensor.air_temperature_1_min_avg",
+        "weather.weather_station",
+    ]
+    assert hass.states.get("sensor.air_temperature_1_min_avg").state == "12.6"
+
+
+async def test_deadband_suppresses_small_changes(hass):
+    """Test a deadband hides changes smaller than the configured step."""
+    coordinator = WeatherStationCoordinator(
+        hass, MagicMock(), CONF_INTERVAL, {"presqnh_01hrmax": 0.5}
+    )
+    previous = dict(MOCK_RECORD)
+
+    assert coordinator._changed_values(
+        previous, dict(previous, presqnh_01hrmax=1013.4), False
+    ) == {}
+    assert coordinator._changed_values(
+        previous, dict(previous, presqnh_01hrmax=1013.8, relhumd_01mnavg=74.0), False
+    ) == {"presqnh_01hrmax": 1013.8, "relhumd_01mnavg": 74.0}
+    # Keys that disappeared are published as None.
+    current = dict(previous)
+    del current["airtemp_01mnavg"]
+    assert coordinator._changed_values(previous, current, True) == {
+        "airtemp_01mnavg": None
+    }
+
+
+async def test_default_deadbands(hass):
+    """Test the shipped deadbands hide a flicker of the 1-minute averages only."""
+    coordinator = WeatherStationCoordinator(
+        hass, MagicMock(), CONF_INTERVAL, SENSOR_DEADBANDS
+    )
+    previous = dict(MOCK_RECORD)
+
+    assert coordinator._changed_values(
+        previous, dict(previous, airtemp_01mnavg=12.5), False
+    ) == {}
+    # A move of exactly one deadband is published.
+    assert coordinator._changed_values(
+        previous, dict(previous, airtemp_01mnavg=12.6, presqnh_01hrmax=1013.3), False
+    ) == {"airtemp_01mnavg": 12.6, "presqnh_01hrmax": 1013.3}
+
+
+async def test_deadband_from_options(hass):
+    """Test a configured deadband holds back smaller changes and publishes larger ones."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data=MOCK_CONFIG,
+        options={"sensor_deadbands": "airtemp_01mnavg:0.5"},
+    )
+    entry.add_to_hass(hass)
+
+    records = [
+        dict(
+            MOCK_RECORD,
+            id=1000 + minute,
+            record_time=f"2024-05-01T10:0{minute}:00",
+            airtemp_01mnavg=value,
+        )
+        for minute, value in enumerate((12.4, 12.7, 13.0))
+    ]
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        side_effect=[[record] for record in records],
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        states = []
+        for interval in (1, 2):
+            async_fire_time_changed(
+                hass, dt_util.utcnow() + timedelta(seconds=CONF_INTERVAL * interval)
+            )
+            await hass.async_block_till_done()
+            states.append(hass.states.get("sensor.air_temperature_1_min_avg").state)
+
+    # 0.3 from the published 12.4 is held back; 0.6 is published.
+    assert states == ["12.4", "13.0"]
+
+
+async def test_publish_interval_holds_back_slow_groups(hass):
+    """Test hour-level keys publish at most once per their group's interval."""
+    coordinator = WeatherStationCoordinator(
+        hass, MagicMock(), CONF_INTERVAL, publish_intervals={"hr": 600}
+    )
+
+    def throttled(now: float, changed: dict) -> dict:
+        with patch.object(hass.loop, "time", return_value=now):
+            coordinator._throttle(changed)
+        return changed
+
+    # Keys count as published at the last notification of every listener.
+    assert throttled(60, {"presqnh_01hrmax": 1013.4, "airtemp_01mnavg": 12.6}) == {
+        "airtemp_01mnavg": 12.6
+    }
+    assert throttled(600, {"presqnh_01hrmax": 1013.6}) == {"presqnh_01hrmax": 1013.6}
+    assert throttled(660, {"presqnh_01hrmax": 1013.8}) == {}
+    # Keys that disappeared are published at once.
+    assert throttled(720, {"presqnh_01hrmax": None}) == {"presqnh_01hrmax": None}
+
+
+async def test_sensor_groups_from_options(hass):
+    """Test only the selected groups get sensors, following option changes."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data=MOCK_CONFIG,
+        options={"quantities": ["rainfal", "airtemp"], "windows": ["hr", "dy"]},
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=[dict(MOCK_RECORD)],
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        assert hass.states.get("sensor.rainfall_1_hr_accum").state == "0.2"
+        assert hass.states.get("sensor.rainfall_24_hr_accum") is not None
+        assert hass.states.get("sensor.air_temperature_1_min_avg") is None
+
+        hass.config_entries.async_update_entry(
+            entry, options={"quantities": ["airtemp"], "windows": ["mn"]}
+        )
+        await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.air_temperature_1_min_avg").state == "12.4"
+    assert hass.states.get("sensor.rainfall_1_hr_accum") is None
+    assert er.async_get(hass).async_get("sensor.rainfall_1_hr_accum") is None
+
+
+async def test_new_keys_add_sensors(hass):
+    """Test keys that appear in a later record get sensors without a reload."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+
+    next_record = dict(
+        MOCK_RECORD, id=1001, record_time="2024-05-01T10:01:00", solradn_01mnavg=512.0
+    )
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        side_effect=[[dict(MOCK_RECORD)], [next_record]],
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert hass.states.get("sensor.solar_radiation_1_min_avg") is None
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=CONF_INTERVAL))
+        await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.solar_radiation_1_min_avg").state == "512.0"
+    assert hass.states.get("sensor.air_temperature_1_min_avg").state == "12.4"
+    # Event times are published as timestamps in the station's time zone.
+    assert (
+        hass.states.get("sensor.wind_gust_time_1_hr").state
+        == "2024-05-01T16:42:00+00:00"
+    )
+
+
+@pytest.mark.parametrize("disable_long_tail", [True, False])
+async def test_long_tail_sensors_disabled_by_default(hass, disable_long_tail):
+    """Test long-tail keys are only registered, disabled, unless opted in."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data=MOCK_CONFIG,
+        options={"disable_long_tail": disable_long_tail},
+    )
+    entry.add_to_hass(hass)
+
+    record = dict(MOCK_RECORD, wnddirm_01mnavg=305, windspd_10mnavg=8.0)
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=[record],
+    ), patch(
+        "custom_components.wswr_weather.sensor.WeatherStationSensor",
+        wraps=WeatherStationSensor,
+    ) as sensor_class:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    for entity_id in ("sensor.wind_dir_mean_1_min_avg", "sensor.wind_speed_10_min_avg"):
+        assert registry.async_get(entity_id).disabled is disable_long_tail
+        assert (hass.states.get(entity_id) is None) is disable_long_tail
+    # Disabled sensors are never built.
+    built = {call.args[1] for call in sensor_class.call_args_list}
+    assert ("wnddirm_01mnavg" in built) is not disable_long_tail
+    assert "airtemp_01mnavg" in built
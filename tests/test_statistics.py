@@ -0,0 +1,133 @@
+"""Tests for backfilling WSWR records into long-term statistics."""
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.wswr_weather.const import DOMAIN
+from custom_components.wswr_weather.statistics import (
+    covered_hours,
+    measurement_statistics,
+    total_increasing_statistics,
+)
+
+from .const import MOCK_CONFIG, MOCK_RECORD
+
+HOUR = datetime(2024, 5, 1, 10, tzinfo=dt_util.UTC)
+
+
+def test_measurement_statistics():
+    """Test hourly mean, min and max of a measurement sensor."""
+    buckets = {HOUR: [{"airtemp_01mnavg": value} for value in (10.0, 12.0, 14.0)]}
+
+    assert measurement_statistics(buckets, "airtemp_01mnavg") == [
+        {"start": HOUR, "mean": 12.0, "min": 10.0, "max": 14.0}
+    ]
+
+
+def test_total_increasing_statistics_handles_reset():
+    """Test the running sum continues from the previous hour across a reset."""
+    buckets = {
+        HOUR: [{"rainfal_01hracc": value} for value in (1.0, 1.5)],
+        HOUR + timedelta(hours=1): [{"rainfal_01hracc": value} for value in (0.0, 0.4)],
+    }
+
+    assert total_increasing_statistics(buckets, "rainfal_01hracc", 0.5, 10.0) == [
+        {"start": HOUR, "state": 1.5, "sum": 11.0},
+        {"start": HOUR + timedelta(hours=1), "state": 0.4, "sum": 11.4},
+    ]
+
+
+def test_covered_hours():
+    """Test only hours with records from start to end count as covered."""
+    hours = {HOUR, HOUR + timedelta(hours=1)}
+    records = [
+        {"record_time": (HOUR + timedelta(minutes=minute)).isoformat()}
+        for minute in range(0, 60, 2)
+    ] + [
+        {"record_time": (HOUR + timedelta(minutes=minute)).isoformat()}
+        for minute in range(91, 120)
+    ]
+
+    assert covered_hours(records, hours, timedelta(minutes=2)) == {HOUR}
+    assert covered_hours(records, hours, None) == set()
+
+
+async def _async_backfill(hass, freezer, cadence: timedelta, recorded: dict):
+    """Set up an entry whose first refresh fetches 60 records, returning the imports."""
+    hass.config.components.add("recorder")
+    now = dt_util.utcnow().replace(minute=30, second=0, microsecond=0)
+    freezer.move_to(now)
+    records = [
+        dict(
+            MOCK_RECORD,
+            id=1000 - index,
+            record_time=dt_util.as_local(now - cadence * index)
+            .replace(tzinfo=None)
+            .isoformat(),
+        )
+        for index in range(60)
+    ]
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        return_value=records,
+    ), patch(
+        "custom_components.wswr_weather.statistics.get_instance"
+    ) as mock_recorder, patch(
+        "custom_components.wswr_weather.statistics.async_import_statistics"
+    ) as mock_import:
+        mock_recorder.return_value.async_add_executor_job = AsyncMock(
+            return_value=recorded
+        )
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    imported = {call.args[1]["statistic_id"]: call.args[2] for call in mock_import.mock_calls}
+    assert len(mock_import.mock_calls) == len(imported)
+    return now.replace(minute=0) - timedelta(hours=1), imported
+
+
+async def test_backfill_imports_one_job_per_sensor(
+    hass, freezer: FrozenDateTimeFactory
+):
+    """Test history covering a whole hour is imported in one batch per sensor."""
+    previous_hour = dt_util.utcnow().replace(
+        minute=0, second=0, microsecond=0
+    ) - timedelta(hours=1)
+    recorded = {
+        # The hour before, which the running sum continues from.
+        "sensor.rainfall_24_hr_accum": {previous_hour - timedelta(hours=1): (4.0, 10.0)},
+        # An hour compiled from states is kept.
+        "sensor.dew_point_1_min_avg": {previous_hour: (None, None)},
+    }
+    previous_hour, imported = await _async_backfill(
+        hass, freezer, timedelta(minutes=2), recorded
+    )
+
+    temperature = imported["sensor.air_temperature_1_min_avg"]
+    assert [row["start"] for row in temperature] == [previous_hour]
+    assert "mean" in temperature[0]
+    rainfall = imported["sensor.rainfall_24_hr_accum"]
+    assert [row["start"] for row in rainfall] == [previous_hour]
+    assert rainfall[0]["sum"] == pytest.approx(10.6)
+    assert "sensor.dew_point_1_min_avg" not in imported
+    # Without a previous sum, totals are not imported rather than restarted.
+    assert "sensor.rainfall_1_hr_accum" not in imported
+    # Sensors without a state class have no statistics.
+    assert "sensor.wind_direction_1_min_avg" not in imported
+
+
+async def test_backfill_skips_partly_buffered_hours(
+    hass, freezer: FrozenDateTimeFactory
+):
+    """Test an hour the buffer only holds the end of is left to the recorder."""
+    _, imported = await _async_backfill(hass, freezer, timedelta(minutes=1), {})
+
+    assert imported == {}
@@ -0,0 +1,66 @@
+"""Tests for the WSWR Weather Station weather entity."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.util import dt as dt_util
+
+from custom_components.wswr_weather.const import CONF_INTERVAL, DOMAIN
+
+from .const import MOCK_CONFIG, MOCK_RECORD
+
+
+async def test_weather_entity(hass):
+    """Test the conditions are read from the record, updating only when they change."""
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+    record = dict(MOCK_RECORD, presqnh_01mnavg=1012.8, rainfal_01mnacc=0.0)
+    records = [
+        record,
+        # Only a key the weather entity does not read changes.
+        dict(record, id=1001, power_v_01mnavg=13.0),
+        dict(record, id=1002, rainfal_01mnacc=0.2, windspd_01mnavg=9.0),
+    ]
+
+    with patch(
+        "custom_components.wswr_weather.client.WeatherStationClient.async_get_data",
+        side_effect=[[dict(value)] for value in records],
+    ) as get_data:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        state = hass.states.get("weather.weather_station")
+        assert state.state == "unknown"
+        assert state.attributes["temperature"] == 12.4
+        assert state.attributes["dew_point"] == 8.1
+        assert state.attributes["humidity"] == 75
+        assert state.attributes["pressure"] == 1012.8
+        # Knots are shown in the metric system's km/h.
+        assert state.attributes["wind_speed"] == 15.74
+        assert state.attributes["wind_gust_speed"] == 25.93
+        assert state.attributes["wind_speed_unit"] == "km/h"
+        assert state.attributes["wind_bearing"] == 310
+
+        events = async_capture_events(hass, EVENT_STATE_CHANGED)
+        for interval in (1, 2):
+            async_fire_time_changed(
+                hass, dt_util.utcnow() + timedelta(seconds=CONF_INTERVAL * interval)
+            )
+            await hass.async_block_till_done()
+
+    # The conditions cost no requests of their own.
+    assert get_data.await_count == 3
+    weather_events = [
+        event for event in events if event.data["entity_id"] == "weather.weather_station"
+    ]
+    # Written once, although two of its keys changed together.
+    assert len(weather_events) == 1
+    state = hass.states.get("weather.weather_station")
+    assert state.state == "rainy"
+    assert state.attributes["wind_speed"] == 16.67